@@ -37,7 +37,8 @@ from .jobs.utils import (generate_job_id,
 # adapter imports jobs, jobs need to import execute_job
 # adapter imports RunningJob, RunningJob needs to import get_adapter_for_version
 from .adapter.adapter import (execute_job,
-                              get_adapter_for_version)
+                              get_adapter_for_version,
+                              submit_many)
 from .jobs import core
 from .jobs import running
 
@@ -2,3 +2,4 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from .genie_2 import Genie2Adapter
 from .genie_3 import Genie3Adapter
+from .genie_3_async import AsyncGenie3Adapter
@@ -11,6 +11,10 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import logging
 
+from concurrent.futures import ThreadPoolExecutor
+
+from ..conf import GenieConf
+from ..jobs.journal import get_job_journal, payload_hash
 from ..jobs.running import RunningJob
 
 from ..exceptions import (GenieAdapterError,
@@ -23,6 +27,8 @@ from .genie_3 import Genie3Adapter
 
 logger = logging.getLogger('com.netflix.genie.jobs.adapter.adapter')
 
+DEFAULT_SUBMIT_MAX_IN_FLIGHT = 10
+
 
 def get_adapter_for_version(version):
     """Given a version string, return a client object."""
@@ -40,6 +46,10 @@ def execute_job(job, **kwargs):
     Take a job and convert it to a JSON payload based on the job's
     configuration object's Genie version value and execute.
 
+    If the job journal is enabled (the "genie.journal_path" option), the
+    submitted job is recorded and a job already in the journal with the same
+    configuration is not submitted again.
+
     Returns:
         response: HTTP response.
     """
@@ -48,17 +58,96 @@ def execute_job(job, **kwargs):
     adapter = get_adapter_for_version(version)(conf=job._conf)
 
     if adapter is not None:
+        job_id = job.get('job_id')
+        journal = get_job_journal(job._conf)
+        job_hash = payload_hash(job) if journal is not None else None
+        entry = journal.get(job_id) if journal is not None else None
+
+        if entry is not None and entry['payload_hash'] == job_hash:
+            logger.debug("job id '%s' already submitted (journal), reattaching",
+                         job_id)
+            return RunningJob(job_id, adapter=adapter, conf=job._conf)
+
+        reattached = False
         try:
             adapter.submit_job(job, **kwargs)
         except GenieHTTPError as err:
             if err.response.status_code == 409:
-                logger.debug("reattaching to job id '%s'", job.get('job_id'))
+                logger.debug("reattaching to job id '%s'", job_id)
+                reattached = True
             else:
                 raise
         except NotImplementedError:
             pass
 
-        return RunningJob(job.get('job_id'), adapter=adapter, conf=job._conf)
+        if journal is not None and reattached:
+            journal.record_reattach(job_id, job_hash)
+        elif journal is not None:
+            journal.record_submit(job_id, job_hash)
+
+        return RunningJob(job_id, adapter=adapter, conf=job._conf)
 
     raise GenieAdapterError("no adapter for '{}' to version '{}'" \
         .format(job.__class__.__name__, version))
+
+
+def submit_many(jobs, max_in_flight=None, **kwargs):
+    """
+    Submit multiple jobs concurrently.
+
+    Each job is submitted with :py:meth:`GenieJob.execute` (so a job which was
+    already submitted is reattached to like :py:func:`execute_job` does) from
+    a pool of at most max_in_flight threads sharing pooled HTTP connections.
+    An error submitting one job does not stop the other jobs from being
+    submitted.
+
+    Example:
+        >>> running_jobs, errors = submit_many(jobs, max_in_flight=20)
+        >>> for index, error in errors.items():
+        ...     print(jobs[index].get('job_id'), error)
+
+    Args:
+        jobs (list): The jobs to submit.
+        max_in_flight (int, optional): The maximum number of submissions in
+            flight at once (default: the "genie.submit_max_in_flight" option
+            or 10). Should not be more than the "genie.session_pool_maxsize"
+            option to reuse connections.
+        **kwargs: Keyword arguments passed to :py:meth:`GenieJob.execute`
+            (for example, retry=True).
+
+    Returns:
+        tuple: A list of :py:class:`RunningJob` in the same order as jobs
+            (None for jobs which failed to submit) and a dict of the index
+            of each job which failed to submit to its exception.
+    """
+
+    jobs = list(jobs)
+    if not jobs:
+        return list(), dict()
+
+    if max_in_flight is None:
+        conf = getattr(jobs[0], '_conf', None) or GenieConf()
+        max_in_flight = conf.genie.get('submit_max_in_flight',
+                                       DEFAULT_SUBMIT_MAX_IN_FLIGHT)
+    max_in_flight = max(1, min(int(max_in_flight), len(jobs)))
+
+    logger.debug('submitting %s jobs (max in flight: %s)',
+                 len(jobs),
+                 max_in_flight)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = [executor.submit(job.execute, **kwargs) for job in jobs]
+
+    running_jobs = list()
+    errors = dict()
+    for index, future in enumerate(futures):
+        try:
+            running_jobs.append(future.result())
+        except Exception as err:
+            logger.warning("error submitting job '%s': %s",
+                           jobs[index].get('job_id'),
+                           err)
+            running_jobs.append(None)
+            errors[index] = err
+
+    return running_jobs, errors
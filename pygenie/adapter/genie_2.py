@@ -106,6 +106,13 @@ class Genie2Adapter(GenieBaseAdapter):
 
     JOBS_ENDPOINT = 'genie/v2/jobs'
 
+    # log names to paths relative to the job's output directory
+    LOG_PATHS = {
+        'stderr': 'stderr.log',
+        'stdout': 'stdout.log',
+        'genie.log': 'cmd.log'
+    }
+
     def __init__(self, conf=None):
         super(Genie2Adapter, self).__init__(conf=conf)
 
@@ -121,6 +128,20 @@ class Genie2Adapter(GenieBaseAdapter):
                 raise GenieLogNotFoundError("log not found at {}".format(url))
             raise
 
+    def get_log_response(self, job_id, log, **kwargs):
+        url = '{}/{}'.format(self.__url_for_job(job_id), log) \
+            .replace('/genie/v2/jobs/', '/genie-jobs/', 1)
+
+        try:
+            return self.call(method='get', url=url, failure_codes=[404, 416],
+                             **kwargs)
+        except GenieHTTPError as err:
+            if err.response.status_code == 416:
+                return err.response
+            if err.response.status_code == 404:
+                raise GenieLogNotFoundError("log not found at {}".format(url))
+            raise
+
     def __url_for_job(self, job_id):
         return '{}/{}/{}'.format(self._conf.genie.url,
                                  Genie2Adapter.JOBS_ENDPOINT,
@@ -8,13 +8,17 @@ This module implements Genie 3 adapter.
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import gzip
+import io
 import json
 import logging
 import os
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from multipledispatch import dispatch
+from six.moves import shlex_quote
 try:
     from urlparse import urlparse
 except ImportError:
@@ -28,6 +32,8 @@ from ..jobs.utils import (is_attachment,
 
 from .genie_x import (GenieBaseAdapter,
                       substitute)
+from .multipart import AttachmentFile, MultipartEncoder, to_bytes
+from .staging import get_attachment_stager
 
 from ..exceptions import (GenieAttachmentError,
                           GenieHTTPError,
@@ -37,6 +43,7 @@ from ..exceptions import (GenieAttachmentError,
 
 #jobs
 from ..jobs.core import GenieJob
+from ..jobs.running import RUNNING_STATUSES
 from ..jobs.hadoop import HadoopJob
 from ..jobs.hive import HiveJob
 from ..jobs.pig import PigJob
@@ -48,6 +55,8 @@ logger = logging.getLogger('com.netflix.genie.jobs.adapter.genie_3')
 
 dispatch_ns = dict()
 
+DEFAULT_INFO_MAX_WORKERS = 7
+
 
 def set_jobname(func):
     """Decorator to update job name with script."""
@@ -82,7 +91,7 @@ def set_jobname(func):
 
 def to_attachment(att):
     if is_str(att) and os.path.isfile(att):
-        return (os.path.basename(att), open(att, 'rb'))
+        return (os.path.basename(att), AttachmentFile(att))
     elif is_str(att) and os.path.isdir(att):
         _files = list()
         for local_file in [os.path.join(att, d) for d in os.listdir(att)]:
@@ -90,7 +99,7 @@ def to_attachment(att):
                     os.path.getsize(local_file) > 0 and \
                     not os.path.basename(local_file).startswith('.'):
                 _files.append(
-                    (os.path.basename(local_file), open(local_file, 'rb'))
+                    (os.path.basename(local_file), AttachmentFile(local_file))
                 )
         return _files
     elif isinstance(att, dict):
@@ -101,11 +110,207 @@ def to_attachment(att):
     raise GenieAttachmentError("cannot handle attachment '{}'".format(att))
 
 
+def compress_attachments(attachments, command_args, min_size):
+    """
+    Gzip in-line attachments of at least min_size bytes (generated scripts,
+    parameter files...) and prepend their decompression to the command line.
+
+    The command line is run by a shell on the Genie node so the command
+    substitutions ("$(gzip -df script.hive.gz)") decompress the attachments
+    (and expand to nothing) before the command is executed.
+
+    Returns:
+        tuple: (list of attachments, command line)
+    """
+
+    compressed = list()
+    names = list()
+    for name, data in attachments:
+        if not isinstance(data, AttachmentFile):
+            data = to_bytes(data)
+            if len(data) >= min_size:
+                out = io.BytesIO()
+                # mtime=0 so identical content compresses identically
+                with gzip.GzipFile(filename='', mode='wb', fileobj=out,
+                                   mtime=0) as gz:
+                    gz.write(data)
+                logger.debug("compressed attachment '%s' (%s -> %s bytes)",
+                             name, len(data), len(out.getvalue()))
+                name = '{}.gz'.format(name)
+                data = out.getvalue()
+                names.append(name)
+        compressed.append((name, data))
+
+    if not names:
+        return compressed, command_args
+
+    decompress = ' '.join('$(gzip -df {})'.format(shlex_quote(name))
+                          for name in names)
+    return compressed, '{} {}'.format(decompress, command_args or '').strip()
+
+
+def get_criteria(job):
+    """
+    Get the criteria Genie uses to pick a job's cluster and command.
+
+    Returns:
+        tuple: (list of cluster criterias in priority order, list of command
+            tags).
+    """
+
+    cluster_tag_mapping = job.get('cluster_tag_mapping')
+    clusters = [
+        dict(tags=cluster_tag_mapping.get(priority))
+        for priority in sorted(cluster_tag_mapping.keys())
+    ]
+    return [i for i in clusters if i.get('tags')], \
+        job.get('command_tags') or job.default_command_tags
+
+
+def info_sections_to_get(**sections):
+    """
+    Return the info sections to get (in order) given the section flags passed
+    to get_info_for_rj. If no section flags are set, all sections are returned.
+    """
+
+    requested = [name for name in INFO_SECTION_ORDER if sections.get(name)]
+    return requested or list(INFO_SECTION_ORDER)
+
+
+def info_section_kwargs(section):
+    """Return the kwargs for Genie3Adapter.get() to get an info section."""
+
+    if section == 'job':
+        return dict()
+
+    kwargs = {'path': section}
+    if section == 'applications':
+        kwargs['if_not_found'] = list()
+    elif section != 'request':
+        kwargs['if_not_found'] = dict()
+    if section == 'output':
+        kwargs['headers'] = {'Accept': 'application/json'}
+    return kwargs
+
+
+def _parse_job_info(data):
+    link = data.get('_links', {}).get('self', {}).get('href')
+    link_parts = urlparse(link)
+    output_link = '{scheme}://{netloc}/output/{job_id}/output' \
+        .format(scheme=link_parts.scheme,
+                netloc=link_parts.netloc,
+                job_id=data.get('id'))
+    job_link = '{scheme}://{netloc}/jobs?id={job_id}&rowId={job_id}' \
+        .format(scheme=link_parts.scheme,
+                netloc=link_parts.netloc,
+                job_id=data.get('id'))
+
+    ret = dict()
+    ret['archive_location'] = data.get('archiveLocation')
+    ret['attachments'] = None
+    ret['command_args'] = data.get('commandArgs')
+    ret['command_name'] = data.get('commandName')
+    ret['cluster_name'] = data.get('clusterName')
+    ret['created'] = data.get('created')
+    ret['description'] = data.get('description')
+    ret['finished'] = data.get('finished')
+    ret['genie_grouping'] = data.get('grouping')
+    ret['genie_grouping_instance'] = data.get('groupingInstance')
+    ret['id'] = data.get('id')
+    ret['job_link'] = job_link
+    ret['json_link'] = link
+    ret['kill_uri'] = link
+    ret['metadata'] = data.get('metadata') or dict()
+    ret['name'] = data.get('name')
+    ret['output_uri'] = output_link
+    ret['started'] = data.get('started')
+    ret['status'] = data.get('status')
+    ret['status_msg'] = data.get('statusMsg')
+    ret['tags'] = data.get('tags')
+    ret['updated'] = data.get('updated')
+    ret['user'] = data.get('user')
+    ret['version'] = data.get('version')
+    return ret
+
+
+def _parse_request_info(request_data):
+    ret = dict()
+    ret['disable_archive'] = request_data.get('disableLogArchival')
+    ret['email'] = request_data.get('email')
+    ret['file_dependencies'] = request_data.get('dependencies')
+    ret['group'] = request_data.get('group')
+    ret['request_data'] = request_data
+    return ret
+
+
+def _parse_applications_info(application_data):
+    return {'application_name': ','.join(a.get('id') for a in application_data)}
+
+
+def _parse_cluster_info(cluster_data):
+    return {'cluster_id': cluster_data.get('id'),
+            'cluster_name': cluster_data.get('name')}
+
+
+def _parse_command_info(command_data):
+    return {'command_id': command_data.get('id'),
+            'command_name': command_data.get('name'),
+            'command_data': command_data}
+
+
+def _parse_execution_info(execution_data):
+    return {'client_host': execution_data.get('hostName')}
+
+
+def _parse_output_info(output_data):
+    ret = dict()
+    ret['output_data'] = output_data
+    output_files = output_data.get('files') or []
+    for entry in output_files:
+        if entry.get('name') == 'stderr':
+            # TODO: Should the default size be None to signify unknown vs 0 byte file?
+            ret['stderr_size'] = entry.get('size') or 0
+        if entry.get('name') == 'stdout':
+            # TODO: Should the default size be None to signify unknown vs 0 byte file?
+            ret['stdout_size'] = entry.get('size') or 0
+        if entry.get('name') == 'spark.log':
+            # TODO: Should the default size be None to signify unknown vs 0 byte file?
+            ret['spark_log_size'] = entry.get('size') or 0
+    return ret
+
+
+INFO_SECTION_ORDER = ('job',
+                      'request',
+                      'applications',
+                      'cluster',
+                      'command',
+                      'execution',
+                      'output')
+
+INFO_SECTION_PARSERS = {
+    'job': _parse_job_info,
+    'request': _parse_request_info,
+    'applications': _parse_applications_info,
+    'cluster': _parse_cluster_info,
+    'command': _parse_command_info,
+    'execution': _parse_execution_info,
+    'output': _parse_output_info
+}
+
+
 class Genie3Adapter(GenieBaseAdapter):
     """Genie server 3"""
 
     JOBS_ENDPOINT = 'api/v3/jobs'
 
+    # log names to paths relative to the job's output directory
+    LOG_PATHS = {
+        'stderr': 'stderr',
+        'stdout': 'stdout',
+        'spark.log': 'spark.log',
+        'genie.log': 'genie/logs/genie.log'
+    }
+
     def __init__(self, conf=None):
         super(Genie3Adapter, self).__init__(conf=conf)
         self.auth_handler = AuthHandler(conf=conf)
@@ -129,6 +334,25 @@ class Genie3Adapter(GenieBaseAdapter):
                 raise GenieLogNotFoundError("log not found at {}".format(url))
             raise
 
+    def get_log_response(self, job_id, log, **kwargs):
+        url = '{}/output/{}'.format(self.__url_for_job(job_id), log)
+
+        if self.disable_timeout and 'timeout' in kwargs:
+            del kwargs['timeout']
+
+        try:
+            return self.call(method='get',
+                             url=url,
+                             auth_handler=self.auth_handler,
+                             failure_codes=[404,406,416],
+                             **kwargs)
+        except GenieHTTPError as err:
+            if err.response.status_code == 416:
+                return err.response
+            if err.response.status_code in {404, 406}:
+                raise GenieLogNotFoundError("log not found at {}".format(url))
+            raise
+
     def __url_for_job(self, job_id):
         return '{}/{}/{}'.format(self._conf.genie.url,
                                  Genie3Adapter.JOBS_ENDPOINT,
@@ -166,18 +390,14 @@ class Genie3Adapter(GenieBaseAdapter):
         if isinstance(description, dict):
             description = json.dumps(description)
 
-        cluster_tag_mapping = job.get('cluster_tag_mapping')
-        clusters = [
-            dict(tags=cluster_tag_mapping.get(priority))
-            for priority in sorted(cluster_tag_mapping.keys())
-        ]
+        cluster_criterias, command_criteria = get_criteria(job)
 
         payload = {
             'applications': job.get('application_ids'),
             'attachments': attachments,
-            'clusterCriterias': [i for i in clusters if i.get('tags')],
+            'clusterCriterias': cluster_criterias,
             'commandArgs': job.get('command_arguments') or command_args,
-            'commandCriteria': job.get('command_tags') or job.default_command_tags,
+            'commandCriteria': command_criteria,
             'dependencies': [d for d in dependencies if d not in {'', None}],
             'description': description,
             'disableLogArchival': not job.get('archive'),
@@ -251,122 +471,57 @@ class Genie3Adapter(GenieBaseAdapter):
                         execution=False, output=False, timeout=30, *args, **kwargs):
         """
         Get information for RunningJob object.
+
+        Sections are requested concurrently using up to "genie.info_max_workers"
+        threads (default: 7). If any section fails, the first error (in section
+        order) is raised after all requests are done.
         """
 
-        get_all = all([not job,
-                       not request,
-                       not applications,
-                       not cluster,
-                       not command,
-                       not execution,
-                       not output])
+        sections = info_sections_to_get(job=job,
+                                        request=request,
+                                        applications=applications,
+                                        cluster=cluster,
+                                        command=command,
+                                        execution=execution,
+                                        output=output)
 
         timeout = None if self.disable_timeout else timeout
 
+        def get_section(section):
+            return self.get(job_id, timeout=timeout, **info_section_kwargs(section))
+
+        max_workers = min(len(sections),
+                          int(self._conf.genie.get('info_max_workers',
+                                                   DEFAULT_INFO_MAX_WORKERS)))
+
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(get_section, section)
+                           for section in sections]
+            results = [(f.exception(), None if f.exception() else f.result())
+                       for f in futures]
+        else:
+            results = list()
+            for section in sections:
+                try:
+                    results.append((None, get_section(section)))
+                except Exception as err:
+                    results.append((err, None))
+
+        # each section is fetched independently, report the first error (in
+        # section order) once all requests are done
+        errors = [(section, err) for section, (err, _) in zip(sections, results)
+                  if err is not None]
+        for section, err in errors[1:]:
+            logger.debug("error getting '%s' info for job '%s': %s",
+                         section, job_id, err)
+        if errors:
+            raise errors[0][1]
+
         ret = dict()
+        for section, (_, data) in zip(sections, results):
+            ret.update(INFO_SECTION_PARSERS[section](data))
 
-        if job or get_all:
-            data = self.get(job_id, timeout=timeout)
-
-            link = data.get('_links', {}).get('self', {}).get('href')
-            link_parts = urlparse(link)
-            output_link = '{scheme}://{netloc}/output/{job_id}/output' \
-                .format(scheme=link_parts.scheme,
-                        netloc=link_parts.netloc,
-                        job_id=data.get('id'))
-            job_link = '{scheme}://{netloc}/jobs?id={job_id}&rowId={job_id}' \
-                .format(scheme=link_parts.scheme,
-                        netloc=link_parts.netloc,
-                        job_id=data.get('id'))
-
-            ret['archive_location'] = data.get('archiveLocation')
-            ret['attachments'] = None
-            ret['command_args'] = data.get('commandArgs')
-            ret['command_name'] = data.get('commandName')
-            ret['cluster_name'] = data.get('clusterName')
-            ret['created'] = data.get('created')
-            ret['description'] = data.get('description')
-            ret['finished'] = data.get('finished')
-            ret['genie_grouping'] = data.get('grouping')
-            ret['genie_grouping_instance'] = data.get('groupingInstance')
-            ret['id'] = data.get('id')
-            ret['job_link'] = job_link
-            ret['json_link'] = link
-            ret['kill_uri'] = link
-            ret['metadata'] = data.get('metadata') or dict()
-            ret['name'] = data.get('name')
-            ret['output_uri'] = output_link
-            ret['started'] = data.get('started')
-            ret['status'] = data.get('status')
-            ret['status_msg'] = data.get('statusMsg')
-            ret['tags'] = data.get('tags')
-            ret['updated'] = data.get('updated')
-            ret['user'] = data.get('user')
-            ret['version'] = data.get('version')
-
-        if request or get_all:
-            request_data = self.get(job_id, path='request', timeout=timeout)
-
-            ret['disable_archive'] = request_data.get('disableLogArchival')
-            ret['email'] = request_data.get('email')
-            ret['file_dependencies'] = request_data.get('dependencies')
-            ret['group'] = request_data.get('group')
-            ret['request_data'] = request_data
-
-        if applications or get_all:
-            application_data = self.get(job_id,
-                                        path='applications',
-                                        if_not_found=list(),
-                                        timeout=timeout)
-
-            ret['application_name'] = ','.join(a.get('id') for a in application_data)
-
-        if cluster or get_all:
-            cluster_data = self.get(job_id,
-                                    path='cluster',
-                                    if_not_found=dict(),
-                                    timeout=timeout)
-
-            ret['cluster_id'] = cluster_data.get('id')
-            ret['cluster_name'] = cluster_data.get('name')
-
-        if command or get_all:
-            command_data = self.get(job_id,
-                                    path='command',
-                                    if_not_found=dict(),
-                                    timeout=timeout)
-
-            ret['command_id'] = command_data.get('id')
-            ret['command_name'] = command_data.get('name')
-            ret['command_data'] = command_data
-
-        if execution or get_all:
-            execution_data = self.get(job_id,
-                                      path='execution',
-                                      if_not_found=dict(),
-                                      timeout=timeout)
-
-            ret['client_host'] = execution_data.get('hostName')
-
-        if output or get_all:
-            output_data = self.get(job_id,
-                                   path='output',
-                                   if_not_found=dict(),
-                                   timeout=timeout,
-                                   headers={'Accept': 'application/json'})
-
-            ret['output_data'] = output_data
-            output_files = output_data.get('files') or []
-            for entry in output_files:
-                if entry.get('name') == 'stderr':
-                    # TODO: Should the default size be None to signify unknown vs 0 byte file?
-                    ret['stderr_size'] = entry.get('size') or 0
-                if entry.get('name') == 'stdout':
-                    # TODO: Should the default size be None to signify unknown vs 0 byte file?
-                    ret['stdout_size'] = entry.get('size') or 0
-                if entry.get('name') == 'spark.log':
-                    # TODO: Should the default size be None to signify unknown vs 0 byte file?
-                    ret['spark_log_size'] = entry.get('size') or 0
         return ret
 
     def get_genie_log(self, job_id, **kwargs):
@@ -382,6 +537,103 @@ class Genie3Adapter(GenieBaseAdapter):
                         timeout=None if self.disable_timeout else timeout) \
                .get('status').upper()
 
+    def _search_statuses(self, params, timeout, max_results=None):
+        """
+        Page through the jobs search results (job id -> status), or None if
+        there are more than max_results.
+        """
+
+        url = '{}/{}'.format(self._conf.genie.url, Genie3Adapter.JOBS_ENDPOINT)
+        timeout = None if self.disable_timeout else timeout
+
+        statuses = dict()
+        page = 0
+        while True:
+            params['page'] = page
+            data = self.call(method='get',
+                             url=url,
+                             params=params,
+                             timeout=timeout,
+                             auth_handler=self.auth_handler) \
+                       .json()
+            for result in (data.get('_embedded') or {}).get('jobSearchResultList', []):
+                if result.get('id') and result.get('status'):
+                    statuses[result['id']] = result['status'].upper()
+            if max_results is not None and len(statuses) > max_results:
+                return None
+            page_info = data.get('page') or {}
+            page += 1
+            if page >= page_info.get('totalPages', 0):
+                break
+
+        return statuses
+
+    def search_statuses(self, id_pattern, timeout=10, page_size=1000,
+                        max_results=None):
+        """
+        Get the statuses of the jobs with ids matching a pattern ("%" matches
+        any characters) with one search request per page.
+
+        Args:
+            id_pattern (str): The job id pattern (for example "my-job%").
+            timeout (int, optional): Timeout (seconds) for each request.
+            page_size (int, optional): Number of jobs per search page.
+            max_results (int, optional): Stop searching (and return None) if
+                more jobs match (a single request if page_size is larger).
+
+        Returns:
+            dict: A mapping of job id to status (or None if more than
+                max_results jobs match).
+        """
+
+        if max_results is not None:
+            page_size = min(page_size, int(max_results) + 1)
+        return self._search_statuses({'id': id_pattern, 'size': page_size},
+                                     timeout,
+                                     max_results=max_results)
+
+    def get_statuses(self, job_ids, filters=None, timeout=10, page_size=1000):
+        """
+        Get the statuses for multiple jobs with as few requests as possible.
+
+        Jobs which have not finished are found by paging through the jobs search
+        endpoint filtered by the running statuses, the filters (for example,
+        the user that submitted the jobs) and the common prefix of the job ids.
+        Only the jobs missing from the search results (typically the ones which
+        just finished) have their status requested individually.
+
+        Args:
+            job_ids (list): The job ids.
+            filters (dict, optional): Additional jobs search filters.
+            timeout (int, optional): Timeout (seconds) for each request.
+            page_size (int, optional): Number of jobs per search page.
+
+        Returns:
+            dict: A mapping of job id to status. Jobs which are not found are
+                not included.
+        """
+
+        job_ids = list(job_ids)
+        if len(job_ids) < 2:
+            return super(Genie3Adapter, self).get_statuses(job_ids)
+
+        wanted = set(job_ids)
+        params = dict(filters or dict())
+        params['status'] = sorted(RUNNING_STATUSES)
+        params['size'] = page_size
+        prefix = os.path.commonprefix(job_ids)
+        if prefix:
+            params['id'] = '{}%'.format(prefix)
+
+        statuses = {job_id: status for job_id, status
+                    in self._search_statuses(params, timeout).items()
+                    if job_id in wanted}
+
+        missing = [job_id for job_id in job_ids if job_id not in statuses]
+        statuses.update(super(Genie3Adapter, self).get_statuses(missing))
+
+        return statuses
+
     def get_stderr(self, job_id, **kwargs):
         """Get a stderr log for a job."""
 
@@ -420,24 +672,19 @@ class Genie3Adapter(GenieBaseAdapter):
     def submit_job(self, job, timeout=30, **kwargs):
         """Submit a job execution to the server."""
 
-        payload = {
-            key: value for key, value in get_payload(job).items() \
-            if value is not None \
-                and value != [] \
-                and value != {} \
-                and value != ''
-        }
-
-        attachments = payload.get('attachments', [])
-        if 'attachments' in payload:
-            del payload['attachments']
+        payload, attachments = get_submit_payload(job)
 
-        files = [('request', ('', json.dumps(payload), 'application/json'))]
+        fields = [('request', ('', json.dumps(payload), 'application/json'))]
 
         for att in attachments:
-            files.append(('attachment', att))
+            fields.append(('attachment', att))
             logger.debug('adding attachment: %s', att)
 
+        # attachments are streamed from disk while the request is sent
+        body = MultipartEncoder(fields)
+        headers = dict(kwargs.pop('headers', None) or dict(),
+                       **{'Content-Type': body.content_type})
+
         logger.debug('payload to genie 3:')
         logger.debug(json.dumps(payload,
                                 sort_keys=True,
@@ -446,13 +693,54 @@ class Genie3Adapter(GenieBaseAdapter):
 
         self.call(method='post',
                   url='{}/{}'.format(job._conf.genie.url, Genie3Adapter.JOBS_ENDPOINT),
-                  files=files,
+                  data=body,
+                  headers=headers,
                   timeout=None if self.disable_timeout else timeout,
                   auth_handler=self.auth_handler,
                   failure_codes=409,
                   **kwargs)
 
 
+def get_submit_payload(job):
+    """
+    Construct the payload to submit for the job.
+
+    Empty values are removed from the payload and the attachments are split
+    out since they are sent as separate parts of the multipart request. If
+    "genie.compress_attachments_min_size" is set, large in-line attachments are
+    gzipped and decompressed by the command line on the Genie node. If
+    attachment staging is enabled ("genie.attachment_store"), attachments are
+    uploaded to the dependency store once per content and referenced as
+    dependencies instead.
+
+    Returns:
+        tuple: (payload dict, list of attachments)
+    """
+
+    payload = {
+        key: value for key, value in get_payload(job).items() \
+        if value is not None \
+            and value != [] \
+            and value != {} \
+            and value != ''
+    }
+
+    attachments = payload.pop('attachments', [])
+
+    min_size = job._conf.genie.get('compress_attachments_min_size')
+    if min_size not in {None, ''} and attachments:
+        attachments, payload['commandArgs'] = \
+            compress_attachments(attachments, payload.get('commandArgs'),
+                                 int(min_size))
+
+    stager = get_attachment_stager(job._conf)
+    if stager is not None and attachments:
+        attachments, staged = stager.stage(attachments)
+        payload['dependencies'] = (payload.get('dependencies') or []) + staged
+
+    return payload, attachments
+
+
 @dispatch(GenieJob, namespace=dispatch_ns)
 def get_payload(job):
     """Construct payload for GenieJob -> Genie 3."""
@@ -0,0 +1,329 @@
+"""
+genie.jobs.adapter.genie_3_async
+
+This module implements the asyncio Genie 3 adapter.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import json
+import logging
+
+from ..async_utils import (DEFAULT_ASYNC_POOL_MAXSIZE,
+                           aiohttp,
+                           call_async,
+                           create_session,
+                           require_aiohttp)
+from ..auth import AuthHandler
+from ..circuit import get_circuit_breakers
+from ..throttling import get_throttler
+
+from .genie_x import GenieBaseAdapter
+from .multipart import AttachmentFile
+from .genie_3 import (Genie3Adapter,
+                      INFO_SECTION_PARSERS,
+                      get_submit_payload,
+                      info_section_kwargs,
+                      info_sections_to_get)
+
+from ..exceptions import (GenieHTTPError,
+                          GenieJobNotFoundError,
+                          GenieLogNotFoundError)
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.adapter.genie_3_async')
+
+
+class AsyncGenie3Adapter(GenieBaseAdapter):
+    """
+    Genie server 3 (asyncio).
+
+    All HTTP methods are coroutines. Requests share one aiohttp session (and its
+    connection pool) which is created on first use in the running event loop.
+    The maximum number of connections is set with the
+    "genie.async_pool_maxsize" option (default: 100).
+
+    Example:
+        >>> async with AsyncGenie3Adapter() as adapter:
+        ...     status = await adapter.get_status('1234-abcd')
+    """
+
+    JOBS_ENDPOINT = Genie3Adapter.JOBS_ENDPOINT
+
+    construct_base_payload = staticmethod(Genie3Adapter.construct_base_payload)
+
+    def __init__(self, conf=None):
+        require_aiohttp()
+        super(AsyncGenie3Adapter, self).__init__(conf=conf)
+        self.auth_handler = AuthHandler(conf=conf)
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def session(self):
+        """The aiohttp session used for requests (created on first use)."""
+
+        if self._session is None or self._session.closed:
+            self._session = create_session(self._conf)
+        return self._session
+
+    async def close(self):
+        """Close the aiohttp session."""
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def call(self, *args, **kwargs):
+        kwargs.setdefault('session', self.session)
+        if 'throttler' not in kwargs:
+            kwargs['throttler'] = get_throttler(self._conf)
+        if 'circuit_breakers' not in kwargs:
+            kwargs['circuit_breakers'] = get_circuit_breakers(self._conf)
+        return await call_async(*args, **kwargs)
+
+    def __url_for_job(self, job_id):
+        return '{}/{}/{}'.format(self._conf.genie.url,
+                                 AsyncGenie3Adapter.JOBS_ENDPOINT,
+                                 job_id)
+
+    async def get(self, job_id, path=None, if_not_found=None, **kwargs):
+        """
+        Get information for a job.
+
+        Args:
+            job_id (str): The job id.
+            path (str, optional): Path to more job information (cluster, requests,
+                etc)
+            if_not_found (optional): If the job id is to a job that cannot be
+                found, if if_not_found is not None will return if_not_found
+                instead of raising error.
+
+        Returns:
+            json: JSON response data.
+        """
+
+        url = self.__url_for_job(job_id)
+        if path:
+            url = '{}/{}'.format(url, path.lstrip('/'))
+
+        if self.disable_timeout and 'timeout' in kwargs:
+            del kwargs['timeout']
+
+        try:
+            resp = await self.call(method='get',
+                                   url=url,
+                                   auth_handler=self.auth_handler,
+                                   failure_codes=404,
+                                   **kwargs)
+            return resp.json()
+        except GenieHTTPError as err:
+            if err.response.status_code in {404, 500}:
+                msg = "job not found at {}".format(url) \
+                    if err.response.status_code == 404 \
+                    else 'issues getting job at {}'.format(url)
+                if if_not_found is not None:
+                    return if_not_found
+                raise GenieJobNotFoundError(msg)
+            raise
+
+    async def get_info_for_rj(self, job_id, job=False, request=False,
+                              applications=False, cluster=False, command=False,
+                              execution=False, output=False, timeout=30,
+                              *args, **kwargs):
+        """
+        Get information for AsyncRunningJob object. Sections are requested
+        concurrently.
+        """
+
+        sections = info_sections_to_get(job=job,
+                                        request=request,
+                                        applications=applications,
+                                        cluster=cluster,
+                                        command=command,
+                                        execution=execution,
+                                        output=output)
+
+        timeout = None if self.disable_timeout else timeout
+
+        results = await asyncio.gather(*[
+            self.get(job_id, timeout=timeout, **info_section_kwargs(section))
+            for section in sections
+        ])
+
+        ret = dict()
+        for section, data in zip(sections, results):
+            ret.update(INFO_SECTION_PARSERS[section](data))
+        return ret
+
+    async def get_log(self, job_id, log, iterator=False, **kwargs):
+        url = '{}/output/{}'.format(self.__url_for_job(job_id), log)
+
+        if self.disable_timeout and 'timeout' in kwargs:
+            del kwargs['timeout']
+
+        try:
+            response = await self.call(method='get',
+                                       url=url,
+                                       auth_handler=self.auth_handler,
+                                       failure_codes=[404, 406, 416],
+                                       **kwargs)
+            return response.text.splitlines() if iterator else response.text
+        except GenieHTTPError as err:
+            if err.response.status_code in {404, 406}:
+                raise GenieLogNotFoundError("log not found at {}".format(url))
+            raise
+
+    async def get_log_response(self, job_id, log, **kwargs):
+        url = '{}/output/{}'.format(self.__url_for_job(job_id), log)
+
+        if self.disable_timeout and 'timeout' in kwargs:
+            del kwargs['timeout']
+
+        try:
+            return await self.call(method='get',
+                                   url=url,
+                                   auth_handler=self.auth_handler,
+                                   failure_codes=[404, 406, 416],
+                                   **kwargs)
+        except GenieHTTPError as err:
+            if err.response.status_code == 416:
+                return err.response
+            if err.response.status_code in {404, 406}:
+                raise GenieLogNotFoundError("log not found at {}".format(url))
+            raise
+
+    async def get_genie_log(self, job_id, **kwargs):
+        """Get a genie log for a job."""
+
+        return await self.get_log(job_id, 'genie/logs/genie.log', **kwargs)
+
+    async def get_status(self, job_id, timeout=10):
+        """Get job status."""
+
+        data = await self.get(job_id,
+                              path='status',
+                              timeout=None if self.disable_timeout else timeout)
+        return data.get('status').upper()
+
+    async def get_statuses(self, job_ids, **kwargs):
+        """
+        Get the statuses for multiple jobs (requested concurrently).
+
+        Returns:
+            dict: A mapping of job id to status. Jobs which are not found are
+                not included.
+        """
+
+        job_ids = list(job_ids)
+        results = await asyncio.gather(*[self.get_status(job_id)
+                                         for job_id in job_ids],
+                                       return_exceptions=True)
+        statuses = dict()
+        for job_id, result in zip(job_ids, results):
+            if isinstance(result, GenieJobNotFoundError):
+                logger.debug("job id '%s' not found", job_id)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                statuses[job_id] = result
+        return statuses
+
+    async def get_stderr(self, job_id, **kwargs):
+        """Get a stderr log for a job."""
+
+        return await self.get_log(job_id, 'stderr', **kwargs)
+
+    async def get_stdout(self, job_id, **kwargs):
+        """Get a stdout log for a job."""
+
+        return await self.get_log(job_id, 'stdout', **kwargs)
+
+    async def kill_job(self, job_id=None, kill_uri=None, timeout=30):
+        """Kill a job."""
+
+        url = kill_uri if kill_uri is not None else self.__url_for_job(job_id)
+
+        try:
+            return await self.call(method='delete',
+                                   url=url,
+                                   timeout=None if self.disable_timeout else timeout,
+                                   auth_handler=self.auth_handler)
+        except GenieHTTPError as err:
+            if err.response.status_code == 404:
+                raise GenieJobNotFoundError("job not found at {}".format(url))
+            raise
+
+    async def submit_job(self, job, timeout=30, **kwargs):
+        """Submit a job execution to the server."""
+
+        payload, attachments = get_submit_payload(job)
+
+        for name, _ in attachments:
+            logger.debug('adding attachment: %s', name)
+
+        opened = list()
+
+        def form():
+            # a new form (and open files) for each attempt: aiohttp consumes
+            # the form and streams the files while sending it
+            data = aiohttp.FormData()
+            data.add_field('request',
+                           json.dumps(payload),
+                           content_type='application/json')
+            for name, content in attachments:
+                if isinstance(content, AttachmentFile):
+                    content = open(content.path, 'rb')
+                    opened.append(content)
+                data.add_field('attachment', content, filename=name)
+            return data
+
+        logger.debug('payload to genie 3:')
+        logger.debug(json.dumps(payload,
+                                sort_keys=True,
+                                indent=4,
+                                separators=(',', ': ')))
+
+        try:
+            await self.call(method='post',
+                            url='{}/{}'.format(job._conf.genie.url,
+                                               AsyncGenie3Adapter.JOBS_ENDPOINT),
+                            data=form,
+                            timeout=None if self.disable_timeout else timeout,
+                            auth_handler=self.auth_handler,
+                            failure_codes=409,
+                            **kwargs)
+        finally:
+            for attachment_file in opened:
+                attachment_file.close()
+
+
+async def execute_job_async(job, adapter=None, **kwargs):
+    """
+    Submit a job using the asyncio adapter.
+
+    Returns:
+        :py:class:`AsyncRunningJob`: The running job.
+    """
+
+    from ..jobs.running_async import AsyncRunningJob
+
+    adapter = adapter or AsyncGenie3Adapter(conf=job._conf)
+
+    try:
+        await adapter.submit_job(job, **kwargs)
+    except GenieHTTPError as err:
+        if err.response.status_code == 409:
+            logger.debug("reattaching to job id '%s'", job.get('job_id'))
+        else:
+            raise
+
+    return AsyncRunningJob(job.get('job_id'), adapter=adapter, conf=job._conf)
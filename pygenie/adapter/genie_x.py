@@ -12,7 +12,11 @@ import logging
 
 from functools import wraps
 
+from ..circuit import get_circuit_breakers
 from ..conf import GenieConf
+from ..exceptions import GenieJobNotFoundError
+from ..sessions import get_session_pool
+from ..throttling import get_throttler
 from ..utils import call
 
 logger = logging.getLogger('com.netflix.genie.jobs.adapter.genie_x')
@@ -83,6 +87,15 @@ class GenieBaseAdapter(object):
         Return the job's specified log.
         """
 
+    @raise_not_implemented
+    def get_log_response(self, *args, **kwargs):
+        """
+        This needs to be implemented by adapter.
+
+        Return the HTTP response for the job's specified log (used for Range
+        requests, 416 responses are returned instead of raised).
+        """
+
     @raise_not_implemented
     def get_genie_log(self, *args, **kwargs):
         """
@@ -99,6 +112,37 @@ class GenieBaseAdapter(object):
         Return job's status.
         """
 
+    @raise_not_implemented
+    def search_statuses(self, *args, **kwargs):
+        """
+        This needs to be implemented by adapter.
+
+        Return the statuses of the jobs matching an id pattern.
+        """
+
+    def get_statuses(self, job_ids, **kwargs):
+        """
+        Get the statuses for multiple jobs.
+
+        Adapters can override this to batch requests, the default implementation
+        gets each job's status individually.
+
+        Args:
+            job_ids (list): The job ids.
+
+        Returns:
+            dict: A mapping of job id to status. Jobs which are not found are
+                not included.
+        """
+
+        statuses = dict()
+        for job_id in job_ids:
+            try:
+                statuses[job_id] = self.get_status(job_id).upper()
+            except GenieJobNotFoundError:
+                logger.debug("job id '%s' not found", job_id)
+        return statuses
+
     @raise_not_implemented
     def get_stderr(self, *args, **kwargs):
         """
@@ -134,4 +178,10 @@ class GenieBaseAdapter(object):
     def call(self, *args, **kwargs):
         if not 'session_adapters' in kwargs:
             kwargs['session_adapters'] = self._conf.session_adapters
+        if not 'session_pool' in kwargs:
+            kwargs['session_pool'] = get_session_pool(self._conf)
+        if not 'throttler' in kwargs:
+            kwargs['throttler'] = get_throttler(self._conf)
+        if not 'circuit_breakers' in kwargs:
+            kwargs['circuit_breakers'] = get_circuit_breakers(self._conf)
         return call(*args, **kwargs)
@@ -0,0 +1,141 @@
+"""
+genie.adapter.multipart
+
+This module implements a streaming multipart/form-data request body.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import binascii
+import logging
+import os
+
+from ..utils import is_str
+
+
+logger = logging.getLogger('com.netflix.genie.adapter.multipart')
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class AttachmentFile(object):
+    """A local file attachment (opened only while it is sent)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __eq__(self, other):
+        return isinstance(other, AttachmentFile) and self.path == other.path
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __len__(self):
+        return os.path.getsize(self.path)
+
+    def __repr__(self):
+        return '{}("{}")'.format(self.__class__.__name__, self.path)
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Read the file in chunks (the file is closed when done)."""
+
+        with open(self.path, 'rb') as att_file:
+            while True:
+                chunk = att_file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+
+def _quote(value):
+    return value.replace('\\', '\\\\').replace('"', '%22')
+
+
+def to_bytes(data):
+    """Encode in-line attachment data (str) to bytes."""
+
+    return data.encode('utf-8') if is_str(data) and not isinstance(data, bytes) \
+        else data
+
+
+class MultipartEncoder(object):
+    """
+    Streaming multipart/form-data body.
+
+    Parts are generated as the body is iterated so attachment files are read
+    from disk in chunks (and closed) while they are sent instead of the whole
+    body being built in memory. The body can be iterated again (files are
+    reopened) so requests can be retried, and its length is computed up front
+    so it is sent with a Content-Length.
+
+    Example:
+        >>> body = MultipartEncoder([
+        ...     ('request', ('', json.dumps(payload), 'application/json')),
+        ...     ('attachment', ('udfs.jar', AttachmentFile('/path/udfs.jar'))),
+        ...     ('attachment', ('script.hql', 'SELECT 1'))])
+        >>> requests.post(url, data=body,
+        ...               headers={'Content-Type': body.content_type})
+    """
+
+    def __init__(self, fields, boundary=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            fields (list): (field name, (file name, data[, content type]))
+                tuples. data is str/bytes (in-line) or an
+                :py:class:`AttachmentFile`.
+            boundary (str, optional): The multipart boundary (random by
+                default).
+            chunk_size (int, optional): Bytes read from files per chunk.
+        """
+
+        self.boundary = boundary or binascii.hexlify(os.urandom(16)).decode('ascii')
+        self.chunk_size = int(chunk_size)
+        self._parts = list()
+        for name, value in fields:
+            filename, data = value[0], value[1]
+            content_type = value[2] if len(value) > 2 else None
+            if not isinstance(data, AttachmentFile):
+                data = to_bytes(data)
+            self._parts.append((self._part_header(name, filename, content_type),
+                                data))
+        self._end = '--{}--\r\n'.format(self.boundary).encode('utf-8')
+        self._length = sum(len(header) + len(data) + 2
+                           for header, data in self._parts) + len(self._end)
+
+    def _part_header(self, name, filename, content_type):
+        disposition = 'form-data; name="{}"'.format(_quote(name))
+        if filename is not None:
+            disposition += '; filename="{}"'.format(_quote(filename))
+        lines = ['--{}'.format(self.boundary),
+                 'Content-Disposition: {}'.format(disposition)]
+        if content_type:
+            lines.append('Content-Type: {}'.format(content_type))
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8')
+
+    @property
+    def content_type(self):
+        """The Content-Type header value (with the boundary)."""
+
+        return 'multipart/form-data; boundary={}'.format(self.boundary)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for header, data in self._parts:
+            yield header
+            if isinstance(data, AttachmentFile):
+                logger.debug('streaming attachment %s', data.path)
+                for chunk in data.iter_chunks(self.chunk_size):
+                    yield chunk
+            elif data:
+                yield data
+            yield b'\r\n'
+        yield self._end
+
+    def to_bytes(self):
+        """Get the whole body (for small bodies and tests)."""
+
+        return b''.join(self)
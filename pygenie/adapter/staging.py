@@ -0,0 +1,211 @@
+"""
+genie.adapter.staging
+
+This module implements staging job attachments in a content-addressed
+dependency store so identical attachments are uploaded once and referenced
+as dependencies by every job using them.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from .multipart import AttachmentFile, to_bytes
+
+
+logger = logging.getLogger('com.netflix.genie.adapter.staging')
+
+DEFAULT_STORE_CLASS = 'pygenie.adapter.staging.LocalDependencyStore'
+
+
+class DependencyStore(object):
+    """
+    Base class for dependency stores.
+
+    Blobs are stored under "<sha256>/<name>" keys (the name is kept so the
+    file has its original name in the job's working directory). Subclasses
+    implement exists(), upload() and uri() for a storage system readable by
+    the Genie nodes (S3, HDFS, a shared file system...).
+    """
+
+    def __init__(self, location, conf=None):
+        self.location = location
+        self._conf = conf
+
+    def exists(self, key):
+        """Is the blob already stored?"""
+
+        raise NotImplementedError
+
+    def upload(self, key, chunks):
+        """Store a blob from bytes chunks."""
+
+        raise NotImplementedError
+
+    def uri(self, key):
+        """Get the dependency URI of a blob."""
+
+        raise NotImplementedError
+
+
+class LocalDependencyStore(DependencyStore):
+    """
+    Dependency store in a local (or shared, mounted) directory.
+
+    Blobs are referenced with file:// URIs so the directory has to be
+    readable by the Genie nodes at the same path.
+    """
+
+    def __init__(self, location, conf=None):
+        super(LocalDependencyStore, self).__init__(
+            os.path.abspath(os.path.expanduser(location)), conf=conf)
+
+    def _path(self, key):
+        return os.path.join(self.location, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def upload(self, key, chunks):
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # created concurrently
+                if not os.path.isdir(directory):
+                    raise
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                for chunk in chunks:
+                    tmp_file.write(chunk)
+            os.rename(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def uri(self, key):
+        return 'file://{}'.format(self._path(key))
+
+
+# digests of local files keyed by (path, size, modification time)
+_file_digests = dict()
+_file_digests_lock = threading.Lock()
+
+
+def _file_digest(att):
+    stat = os.stat(att.path)
+    cache_key = (os.path.abspath(att.path), stat.st_size, stat.st_mtime)
+    with _file_digests_lock:
+        digest = _file_digests.get(cache_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        for chunk in att.iter_chunks():
+            sha.update(chunk)
+        digest = sha.hexdigest()
+        with _file_digests_lock:
+            _file_digests[cache_key] = digest
+    return digest
+
+
+class AttachmentStager(object):
+    """
+    Stage attachments in a :py:class:`DependencyStore`.
+
+    Attachments are hashed (local files once per size/modification time),
+    uploaded only if the store does not have the content yet and replaced by
+    their dependency URIs.
+    """
+
+    def __init__(self, store, min_size=0):
+        """
+        Args:
+            store (DependencyStore): The dependency store.
+            min_size (int, optional): Smaller attachments are sent as is
+                (default: 0, stage every attachment).
+        """
+
+        self.store = store
+        self.min_size = int(min_size)
+
+    def stage(self, attachments):
+        """
+        Stage attachments.
+
+        Args:
+            attachments (list): (name, data) tuples (data is in-line str/bytes
+                or an :py:class:`AttachmentFile`).
+
+        Returns:
+            tuple: (list of attachments to send as is, list of dependency
+                URIs).
+        """
+
+        remaining = list()
+        dependencies = list()
+        for name, data in attachments:
+            if not isinstance(data, AttachmentFile):
+                data = to_bytes(data)
+            if len(data) < self.min_size:
+                remaining.append((name, data))
+                continue
+
+            if isinstance(data, AttachmentFile):
+                digest = _file_digest(data)
+                chunks = data.iter_chunks
+            else:
+                digest = hashlib.sha256(data).hexdigest()
+                chunks = lambda data=data: [data]
+
+            key = '{}/{}'.format(digest, name)
+            if self.store.exists(key):
+                logger.debug("attachment '%s' already staged (%s)", name, digest)
+            else:
+                logger.debug("staging attachment '%s' (%s)", name, digest)
+                self.store.upload(key, chunks())
+            dependencies.append(self.store.uri(key))
+
+        return remaining, dependencies
+
+
+def get_attachment_stager(conf=None):
+    """
+    Get the :py:class:`AttachmentStager` for the settings in conf, or None if
+    attachment staging is not enabled.
+
+    The following options in the "genie" section are used:
+        attachment_store: the store location (staging is disabled if not
+            set), a directory for the default local store.
+        attachment_store_class: import path of the :py:class:`DependencyStore`
+            class (default: pygenie.adapter.staging.LocalDependencyStore).
+        attachment_stage_min_size: attachments smaller than this (bytes) are
+            sent as is (default: 0).
+
+    Args:
+        conf (GenieConf, optional): The configuration to read settings from.
+
+    Returns:
+        :py:class:`AttachmentStager`: The attachment stager (or None).
+    """
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    location = get('attachment_store')
+    if not location:
+        return None
+
+    mod_name, _, cls_name = get('attachment_store_class', DEFAULT_STORE_CLASS) \
+        .rpartition('.')
+    store_cls = getattr(__import__(mod_name, fromlist=[cls_name]), cls_name)
+
+    return AttachmentStager(store_cls(location, conf=conf),
+                            min_size=get('attachment_stage_min_size', 0))
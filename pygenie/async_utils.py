@@ -0,0 +1,246 @@
+"""
+genie.async_utils
+
+This module contains utility functions for making asyncio HTTP requests to the
+Genie server. It requires the optional aiohttp dependency
+(pip install nflx-genie-client[async]).
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import json
+import logging
+
+import requests
+
+from .auth import AuthHandler
+from .exceptions import GenieError, GenieHTTPError
+from .throttling import get_throttler
+from .utils import USER_AGENT_HEADER
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+logger = logging.getLogger('com.netflix.genie.async_utils')
+
+DEFAULT_ASYNC_POOL_MAXSIZE = 100
+
+
+def require_aiohttp():
+    """Raise GenieError if aiohttp is not installed."""
+
+    if aiohttp is None:
+        raise GenieError('aiohttp is required for asyncio support ' \
+                         '(pip install nflx-genie-client[async])')
+
+
+class AsyncResponse(object):
+    """
+    A fully read aiohttp response exposing the parts of the
+    :py:class:`requests.Response` interface used by pygenie (status_code,
+    reason, headers, content, text, json(), ok).
+    """
+
+    def __init__(self, method, url, status_code, reason, headers, content,
+                 encoding=None):
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+
+    def __repr__(self):
+        return '<AsyncResponse [{}]>'.format(self.status_code)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def create_session(conf=None):
+    """
+    Create an aiohttp session with a connection pool sized by the
+    "genie.async_pool_maxsize" option (default: 100).
+    """
+
+    require_aiohttp()
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+    limit = int(get('async_pool_maxsize', DEFAULT_ASYNC_POOL_MAXSIZE))
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit))
+
+
+def auth_headers(auth, method, url, headers):
+    """
+    Apply a requests auth object to the request headers.
+
+    Auth objects loaded by :py:class:`AuthHandler` operate on
+    :py:class:`requests.PreparedRequest` objects, so the request is prepared
+    with requests and the resulting headers are reused for aiohttp.
+    """
+
+    if auth is None:
+        return headers
+    prepared = requests.Request(method=method.upper(),
+                                url=url,
+                                headers=headers).prepare()
+    prepared = auth(prepared) or prepared
+    return dict(prepared.headers)
+
+
+async def call_async(url, method='get', headers=None, raise_not_status=None,
+                     none_on_404=False, auth_handler=None, failure_codes=None,
+                     attempts=7, backoff=5, session=None, **kwargs):
+    """
+    Wrap asyncio HTTP request calls to the Genie server.
+
+    Behaves the same as :py:func:`pygenie.utils.call` but awaits the request
+    on the running event loop and returns an :py:class:`AsyncResponse`.
+
+    Args:
+        method (str): the HTTP method to make
+        headers (dict): headers to pass in during the request
+        raise_not_status (int): raise GenieHTTPError if this status is not
+            returned by genie.
+        none_on_404 (bool): return None if a 404 if returned instead of raising
+            GenieHTTPError (will not retry requests with 404 response).
+        failure_codes (list, optional): list of status codes to break retries and
+            return Response.
+        session (aiohttp.ClientSession, optional): the session to make the
+            request with. A temporary session is used if not specified.
+        data (optional): the request body, or a callable returning a new body
+            for each attempt (aiohttp consumes multipart forms and files).
+        throttler (Throttler, optional): rate limiter and retry policy (see
+            :py:func:`pygenie.utils.call`). Waits are awaited, never blocking
+            the event loop.
+        circuit_breakers (CircuitBreakers, optional): per-host circuit
+            breakers (see :py:func:`pygenie.utils.call`).
+    """
+
+    require_aiohttp()
+
+    failure_codes = failure_codes or list()
+
+    assert isinstance(failure_codes, (list, int)), \
+        'failure_codes should be an int or list of ints'
+
+    if isinstance(failure_codes, int):
+        failure_codes = [failure_codes]
+
+    failure_codes = [str(f) for f in failure_codes]
+
+    if none_on_404 and '404' not in failure_codes:
+        failure_codes.append('404')
+
+    auth_handler = auth_handler or AuthHandler()
+
+    headers = USER_AGENT_HEADER if headers is None \
+        else dict(headers, **USER_AGENT_HEADER)
+    headers = auth_headers(auth_handler.auth, method, url, headers)
+
+    timeout = kwargs.pop('timeout', None)
+    if timeout is not None:
+        kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+
+    logger.debug('"%s %s"', method.upper(), url)
+    logger.debug('headers: %s', headers)
+
+    data = kwargs.pop('data', None)
+    throttler = kwargs.pop('throttler', None) or get_throttler()
+    circuit_breakers = kwargs.pop('circuit_breakers', None)
+    breaker = circuit_breakers.get(url) if circuit_breakers is not None else None
+
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession()
+
+    errors = list()
+    resp = None
+
+    try:
+        for i in range(attempts):
+            if breaker is not None:
+                breaker.before_request()
+            wait = throttler.reserve(url, retry=i > 0)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with session.request(method.upper(),
+                                           url,
+                                           headers=headers,
+                                           data=data() if callable(data) else data,
+                                           **kwargs) as raw:
+                    resp = AsyncResponse(method=method.upper(),
+                                         url=str(raw.url),
+                                         status_code=raw.status,
+                                         reason=raw.reason,
+                                         headers=raw.headers,
+                                         content=await raw.read(),
+                                         encoding=raw.charset)
+                if breaker is not None:
+                    if resp.status_code >= 500 \
+                            and str(resp.status_code) not in failure_codes:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if (int(resp.status_code/100) == 2) or (str(resp.status_code) in failure_codes):
+                    break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if breaker is not None:
+                    breaker.record_failure()
+                errors.append(err)
+                resp = None
+            except BaseException:
+                # including cancellation
+                if breaker is not None:
+                    breaker.release_probe()
+                raise
+
+            if i < attempts - 1:
+                delay = throttler.retry_delay(url, i, backoff, resp)
+                if delay is None:
+                    logger.warning('retry budget exhausted, not retrying "%s %s"',
+                                   method.upper(), url)
+                    break
+                msg = ''
+                if resp is not None:
+                    msg = '-> {method} {url} ({code}): {text}'\
+                        .format(method=resp.method,
+                                url=resp.url,
+                                code=resp.status_code,
+                                text=resp.content)
+                logger.warning('attempt %s %s', i + 1, msg)
+                await asyncio.sleep(delay)
+    finally:
+        if own_session:
+            await session.close()
+
+    if resp is not None:
+        # Allow us to return None if we receive a 404
+        if resp.status_code == 404 and none_on_404:
+            return None
+
+        if not resp.ok:
+            raise GenieHTTPError(resp)
+
+        # Raise GenieHTTPError if a particular status code was not returned
+        if raise_not_status and resp.status_code != raise_not_status:
+            raise GenieHTTPError(resp)
+
+        return resp
+    elif len(errors) > 0:
+        raise errors[-1]
@@ -0,0 +1,214 @@
+"""
+genie.circuit
+
+This module implements per-host circuit breakers for requests to the Genie
+server so that callers fail fast while the server is down instead of spending
+every attempt (and backoff sleep) on each request.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import threading
+import time
+
+try:
+    from urlparse import urlparse
+except ImportError:
+    from urllib.parse import urlparse
+
+from .exceptions import GenieCircuitOpenError
+
+
+logger = logging.getLogger('com.netflix.genie.circuit')
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 30
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def _now():
+    return getattr(time, 'monotonic', time.time)()
+
+
+class CircuitBreaker(object):
+    """
+    Thread-safe circuit breaker for one host.
+
+    The circuit starts closed. After failure_threshold consecutive failures
+    (connection errors, timeouts or 5xx responses) it opens and requests fail
+    immediately with :py:class:`GenieCircuitOpenError`. After recovery_timeout
+    seconds it is half-open: a single probe request is let through while other
+    requests keep failing fast. If the probe succeeds the circuit closes,
+    otherwise it opens again for another recovery_timeout.
+
+    Args:
+        host (str): The host the circuit breaker is for (used in errors).
+        failure_threshold (int, optional): Consecutive failures before the
+            circuit opens (default: 5).
+        recovery_timeout (float, optional): Seconds the circuit stays open
+            before probing (default: 30).
+    """
+
+    def __init__(self, host, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 recovery_timeout=DEFAULT_RECOVERY_TIMEOUT):
+        self.host = host
+        self.failure_threshold = int(failure_threshold)
+        self.recovery_timeout = float(recovery_timeout)
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '{}(host={}, state={})'.format(self.__class__.__name__,
+                                              self.host,
+                                              self.state)
+
+    @property
+    def state(self):
+        """The circuit state ('closed', 'open' or 'half-open')."""
+
+        with self._lock:
+            if self._state == OPEN \
+                    and _now() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """
+        Check that a request is allowed.
+
+        Raises:
+            GenieCircuitOpenError: If the circuit is open (or half-open with
+                a probe request already in flight).
+        """
+
+        with self._lock:
+            if self._state == CLOSED:
+                return
+
+            retry_in = self._opened_at + self.recovery_timeout - _now()
+            if self._state == OPEN and retry_in <= 0:
+                logger.info('circuit for %s half-open, probing', self.host)
+                self._state = HALF_OPEN
+
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+
+            raise GenieCircuitOpenError(self.host, max(retry_in, 0))
+
+    def record_success(self):
+        """Record a successful request (closes the circuit)."""
+
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info('circuit for %s closed', self.host)
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release_probe(self):
+        """
+        Release the probe of a half-open circuit without recording a result
+        (for requests which failed for reasons unrelated to the host, e.g.
+        errors preparing the request or cancellation), so the next request
+        probes.
+        """
+
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        """Record a failed request (may open the circuit)."""
+
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN \
+                    or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning('circuit for %s open after %s failures',
+                                   self.host,
+                                   self._failures)
+                self._state = OPEN
+                self._opened_at = _now()
+                self._probing = False
+
+
+class CircuitBreakers(object):
+    """
+    Thread-safe registry of :py:class:`CircuitBreaker` objects by host
+    (scheme and netloc).
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 recovery_timeout=DEFAULT_RECOVERY_TIMEOUT):
+        self.failure_threshold = int(failure_threshold)
+        self.recovery_timeout = float(recovery_timeout)
+        self._breakers = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '{}(failure_threshold={}, recovery_timeout={})' \
+            .format(self.__class__.__name__,
+                    self.failure_threshold,
+                    self.recovery_timeout)
+
+    def get(self, url):
+        """Get the circuit breaker for the host of url."""
+
+        parts = urlparse(url)
+        host = '{}://{}'.format(parts.scheme, parts.netloc).lower()
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(host,
+                                                      self.failure_threshold,
+                                                      self.recovery_timeout)
+            return self._breakers[host]
+
+
+_registries = dict()
+_registries_lock = threading.Lock()
+
+
+def get_circuit_breakers(conf=None):
+    """
+    Get the shared :py:class:`CircuitBreakers` for the settings in conf, or
+    None if circuit breaking is not enabled.
+
+    The following options in the "genie" section are used:
+        circuit_breaker: set to true to enable circuit breaking (default:
+            false).
+        circuit_failure_threshold: consecutive failures before a host's
+            circuit opens (default: 5).
+        circuit_recovery_timeout: seconds before an open circuit lets a probe
+            request through (default: 30).
+
+    Args:
+        conf (GenieConf, optional): The configuration to read settings from.
+
+    Returns:
+        :py:class:`CircuitBreakers`: The shared circuit breakers (or None).
+    """
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    if get('circuit_breaker') not in {'True', 'TRUE', 'true', True, '1', 1}:
+        return None
+
+    settings = (
+        int(get('circuit_failure_threshold', DEFAULT_FAILURE_THRESHOLD)),
+        float(get('circuit_recovery_timeout', DEFAULT_RECOVERY_TIMEOUT))
+    )
+
+    with _registries_lock:
+        if settings not in _registries:
+            _registries[settings] = CircuitBreakers(*settings)
+        return _registries[settings]
@@ -7,13 +7,23 @@ from __future__ import absolute_import, print_function, unicode_literals
 import json
 import logging
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .circuit import get_circuit_breakers
 from .conf import GenieConf
 from .exceptions import GenieError
+from .export import export_jobs
+from .metadata_cache import get_metadata_cache
+from .sessions import get_session_pool
+from .throttling import get_throttler
 from .utils import call, DotDict
 
 
 logger = logging.getLogger('com.netflix.pygenie.client')
 
+DEFAULT_PAGE_PREFETCH = 4
+
 
 def _check_patch_operation(operation):
     "Helper function for checking HTTP patch methods"
@@ -33,9 +43,19 @@ def _call(url, *args, **kwargs):
         kwargs['data'] = json.dumps(kwargs['data'])
 
     header = {'Content-Type': 'application/json'}
+    header.update(kwargs.pop('headers', None) or {})
 
     resp = call(url, headers=header, *args, **kwargs)
 
+    return _format_response(resp)
+
+
+def _format_response(resp):
+    """
+    Format a Genie HTTP response into a dict with the response data, headers
+    and page information.
+    """
+
     if not hasattr(resp, 'content'):
         return None
 
@@ -52,6 +72,7 @@ def _call(url, *args, **kwargs):
         response['response'] = content
 
     response['headers'] = resp.headers
+    response['status_code'] = resp.status_code
     if isinstance(content, dict):
         response['page'] = content.get('page')
 
@@ -116,15 +137,134 @@ class Genie(object):
     def call(self, *args, **kwargs):
         if not 'session_adapters' in kwargs:
             kwargs['session_adapters'] = self.conf.session_adapters
+        if not 'session_pool' in kwargs:
+            kwargs['session_pool'] = get_session_pool(self.conf)
+        if not 'throttler' in kwargs:
+            kwargs['throttler'] = get_throttler(self.conf)
+        if not 'circuit_breakers' in kwargs:
+            kwargs['circuit_breakers'] = get_circuit_breakers(self.conf)
+
+        cache = get_metadata_cache(self.conf)
+        if cache is not None and self._is_config_url(args[0]):
+            if kwargs.get('method', 'get').upper() == 'GET':
+                return self._cached_call(cache, *args, **kwargs)
+            try:
+                return _call(*args, **kwargs)
+            finally:
+                # configs can reference each other (commands of a cluster...)
+                cache.clear()
         return _call(*args, **kwargs)
 
-    def get_applications(self, filters=None, req_size=1000):
+    def _is_config_url(self, url):
+        """Is the url for an application, command or cluster resource?"""
+
+        return any(url == path or url.startswith(path + '/')
+                   for path in (self.path_application,
+                                self.path_cluster,
+                                self.path_command))
+
+    def _cached_call(self, cache, url, *args, **kwargs):
+        """
+        GET through the metadata cache (revalidating stale entries with their
+        ETag).
+        """
+
+        key = cache.key(url, kwargs.get('params'))
+        value, fresh, etag = cache.get(key)
+        if fresh:
+            logger.debug('"GET %s" from cache', key)
+            return value
+
+        if value is not None and etag:
+            kwargs['headers'] = dict(kwargs.get('headers') or {},
+                                     **{'If-None-Match': etag})
+            failure_codes = kwargs.get('failure_codes') or list()
+            if isinstance(failure_codes, int):
+                failure_codes = [failure_codes]
+            kwargs['failure_codes'] = list(failure_codes) + [304]
+
+        resp = _call(url, *args, **kwargs)
+        if resp is None:
+            return None
+
+        if value is not None and etag and resp.get('status_code') == 304:
+            logger.debug('"GET %s" not modified', key)
+            cache.put(key, value, etag=etag)
+            return value
+
+        value = {'response': resp['response'],
+                 'headers': dict(resp['headers']),
+                 'page': resp.get('page')}
+        cache.put(key, value, etag=resp['headers'].get('ETag'))
+        return value
+
+    def _paginate(self, url, params, list_key, name, req_size, prefetch=None):
+        """
+        Page through a list endpoint, yielding the items in order.
+
+        Once the first page tells the number of pages, up to prefetch of the
+        following pages are requested concurrently. The pages still in flight
+        are cancelled if the consumer stops iterating (closes the generator).
+        """
+
+        if prefetch is None:
+            prefetch = self.conf.genie.get('client_page_prefetch',
+                                           DEFAULT_PAGE_PREFETCH)
+        prefetch = int(prefetch)
+
+        params = dict(params)
+        params['size'] = req_size
+
+        def fetch(page):
+            return self.call(url, method='GET', params=dict(params, page=page))
+
+        resp = fetch(0)
+        executor = None
+        pending = deque()
+        next_page = 1
+        try:
+            while True:
+                if not resp:
+                    yield None
+                    return
+                for item in resp['response'].get(list_key, []):
+                    yield DotDict(item)
+
+                # the number of pages can grow while paging
+                total_pages = resp['page']['totalPages']
+                if not pending and total_pages <= next_page:
+                    break
+
+                while prefetch > 0 and next_page < total_pages \
+                        and len(pending) < prefetch:
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=prefetch)
+                    pending.append(executor.submit(fetch, next_page))
+                    next_page += 1
+
+                logger.info('Fetching additional %s from genie [%s/%s]',
+                            name, next_page - len(pending), total_pages - 1)
+                if pending:
+                    resp = pending.popleft().result()
+                else:
+                    resp = fetch(next_page)
+                    next_page += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def get_applications(self, filters=None, req_size=1000, prefetch=None):
         """
         Get a list of applications.
 
         Args:
             filters (dict): a dictionary of filters to use in the query.
             req_size (int): the number of items to return per request.
+            prefetch (int): the number of pages to request concurrently ahead
+                of the consumer (default: the "genie.client_page_prefetch"
+                option or 4, 0 to request pages one at a time).
 
         Yields:
            dict: an application
@@ -138,26 +278,10 @@ class Genie(object):
         _verify_filters(params, ['name', 'user', 'size', 'status', 'tag',
                                  'type', 'page'])
 
-        # Iterate through any responses until we get to the end
-        params['page'] = 0
-        params['size'] = req_size
-        while True:
-            resp = self.call(self.path_application, method='GET', params=params)
-
-            if resp:
-                for app in resp['response'].get('applicationList', []):
-                    yield DotDict(app)
-            else:
-                yield None
-
-            # Break if we're at the end
-            if (resp['page']['totalPages']) <= (resp['page']['number'] + 1):
-                break
-
-            # Get the next result
-            params['page'] += 1
-            logger.info('Fetching additional applications from genie [%s/%s]',
-                         params['page'], resp['page']['totalPages'] - 1)
+        return self._paginate(self.path_application, params, 'applicationList',
+                              'applications',
+                              req_size=req_size,
+                              prefetch=prefetch)
 
     def get_application(self, application_id):
         """
@@ -671,7 +795,7 @@ class Genie(object):
         self.call(self.path_command, method='DELETE', raise_not_status=204)
 
     # TODO: Page and size should be separate arguments
-    def get_commands(self, filters=None, req_size=1000):
+    def get_commands(self, filters=None, req_size=1000, prefetch=None):
         """
         Get all of the commands in a cluster.
 
@@ -684,6 +808,9 @@ class Genie(object):
             filters (dict): a dictionary of filters to use. Valid key parameters
                 are: name, user, status, tag
             req_size (int): the number of items to return per request.
+            prefetch (int): the number of pages to request concurrently ahead
+                of the consumer (default: the "genie.client_page_prefetch"
+                option or 4, 0 to request pages one at a time).
 
         Yields:
             dict: a command dictionary
@@ -702,27 +829,9 @@ class Genie(object):
         params = filters or {}
         _verify_filters(params, ['name', 'user', 'size', 'status', 'tag'])
 
-        # Iterate through any responses until we get to the end
-        params['page'] = 0
-        params['size'] = req_size
-        while True:
-            resp = self.call(self.path_command, method='GET', params=params)
-
-            # TODO: Check to see if _imbedded key is missing, then break
-            if resp:
-                for command in resp['response'].get('commandList', []):
-                    yield DotDict(command)
-            else:
-                yield None
-
-            # Break if we're at the end
-            if (resp['page']['totalPages']) <= (resp['page']['number'] + 1):
-                break
-
-            # On to the next iteration
-            params['page'] += 1
-            logger.info('Fetching additional commands from genie [%s/%s]',
-                         params['page'], resp['page']['totalPages'])
+        return self._paginate(self.path_command, params, 'commandList', 'commands',
+                              req_size=req_size,
+                              prefetch=prefetch)
 
     def remove_all_configs_for_command(self, command_id):
         """
@@ -1085,7 +1194,7 @@ class Genie(object):
 
         return resp.get('response')
 
-    def get_clusters(self, filters=None, req_size=1000):
+    def get_clusters(self, filters=None, req_size=1000, prefetch=None):
         """
         Get all of the clusters.
 
@@ -1098,6 +1207,9 @@ class Genie(object):
             filters (optional[dict]): a dictionary of filters to use. Valid key parameters
                 are: name, status, tag
             req_size (int): the number of items to return per request.
+            prefetch (int): the number of pages to request concurrently ahead
+                of the consumer (default: the "genie.client_page_prefetch"
+                option or 4, 0 to request pages one at a time).
 
         Yields:
             dict: a cluster configuration
@@ -1113,26 +1225,9 @@ class Genie(object):
         params = filters or {}
         _verify_filters(params, ['name', 'size', 'status', 'tag', 'page'])
 
-        # Iterate through any responses until we get to the end
-        params['page'] = 0
-        params['size'] = req_size
-        while True:
-            resp = self.call(self.path_cluster, method='GET', params=params)
-
-            if resp:
-                for cluster in resp['response'].get('clusterList', []):
-                    yield DotDict(cluster)
-            else:
-                yield None
-
-            # Break if we're at the end
-            if (resp['page']['totalPages']) <= (resp['page']['number'] + 1):
-                break
-
-            # On to the next iteration
-            params['page'] += 1
-            logger.info('Fetching additional clusters from genie [%s/%s]',
-                         params['page'], resp['page']['totalPages'])
+        return self._paginate(self.path_cluster, params, 'clusterList', 'clusters',
+                              req_size=req_size,
+                              prefetch=prefetch)
 
     def get_cluster(self, cluster_id):
         """
@@ -1604,7 +1699,7 @@ class Genie(object):
         path = self.path_cluster + '/' + cluster_id + '/tags/' + tag
         self.call(path, method='DELETE', raise_not_status=204)
 
-    def get_jobs(self, filters=None, req_size=1000):
+    def get_jobs(self, filters=None, req_size=1000, prefetch=None):
         """
         Get jobs. This command makes pages through results from Genie and will
         make multiple API calls until all of the results have been returned.
@@ -1613,6 +1708,9 @@ class Genie(object):
             filters (dict): filter the jobs by these value(s). Valid parameters
                 are id, clusterName, user, status, and tag.
             req_size (int): the number of items to return per request.
+            prefetch (int): the number of pages to request concurrently ahead
+                of the consumer (default: the "genie.client_page_prefetch"
+                option or 4, 0 to request pages one at a time).
 
         Yields:
             dict: a job
@@ -1627,27 +1725,28 @@ class Genie(object):
         """
         params = filters or {}
 
-        # Iterate through any responses until we get to the end
-        params['page'] = 0
-        params['size'] = req_size
-        while True:
-            resp = self.call(self.path_job, method='GET', params=params)
+        return self._paginate(self.path_job, params, 'jobSearchResultList', 'jobs',
+                              req_size=req_size,
+                              prefetch=prefetch)
 
-            if resp:
-                for job in resp['response'].get('jobSearchResultList', []):
-                    yield DotDict(job)
-            else:
-                yield None
+    def export_jobs(self, dest, start, end=None, **kwargs):
+        """
+        Export the jobs started between start and end (epoch seconds) to a
+        newline-delimited JSON file (or Parquet files), walking the history
+        by time windows and checkpointing to a resumable cursor file.
 
+        See :py:func:`pygenie.export.export_jobs` for the arguments.
 
-            # Break if we're at the end
-            if (resp['page']['totalPages']) <= (resp['page']['number'] + 1):
-                break
+        Returns:
+            int: The number of jobs exported.
 
-            # On to the next iteration
-            params['page'] += 1
-            logger.info('Fetching additional jobs from genie [%s/%s]',
-                         params['page'], resp['page']['totalPages'])
+        Example:
+            >>> genie.export_jobs('/data/jobs.ndjson', start=1500000000,
+            ...                   end=1500086400, filters={'user': 'etl'})
+            1234
+
+        """
+        return export_jobs(self, dest, start, end=end, **kwargs)
 
     def get_job(self, job_id):
         """
@@ -0,0 +1,243 @@
+"""
+Genie python client library (asyncio)
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import logging
+
+from .async_utils import call_async, create_session, require_aiohttp
+from .circuit import get_circuit_breakers
+from .client import _format_response, _verify_filters
+from .conf import GenieConf
+from .throttling import get_throttler
+from .utils import DotDict
+
+
+logger = logging.getLogger('com.netflix.pygenie.client_async')
+
+
+class AsyncGenie(object):
+    """
+    Genie client object for use with asyncio.
+
+    List methods are async generators which page through Genie results.
+    Requests share one aiohttp session which is created on first use in the
+    running event loop (its maximum number of connections is set with the
+    "genie.async_pool_maxsize" option), and go through the throttler and
+    circuit breakers for the conf like :py:class:`pygenie.client.Genie`.
+
+    Args:
+        conf (optional[object]): custom GenieConf object
+
+    Example:
+        >>> async with AsyncGenie() as genie:
+        ...     async for job in genie.get_jobs(filters={'user': 'jdoe'}):
+        ...         print(job.id)
+
+    """
+
+    def __init__(self, conf=None):
+        require_aiohttp()
+        self.conf = conf or GenieConf()
+        self.host = self.conf.genie.url
+        self.version = self.conf.genie.version
+        self._session = None
+
+        self.path_application = self.host \
+            + self.conf.genie.get('application_url', '/api/v3/applications')
+        self.path_cluster = self.host \
+            + self.conf.genie.get('cluster_url', '/api/v3/clusters')
+        self.path_command = self.host \
+            + self.conf.genie.get('command_url', '/api/v3/commands')
+        self.path_job = self.host \
+            + self.conf.genie.get('job_url', '/api/v3/jobs')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the aiohttp session."""
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def session(self):
+        """The aiohttp session used for requests (created on first use)."""
+
+        if self._session is None or self._session.closed:
+            self._session = create_session(self.conf)
+        return self._session
+
+    async def call(self, url, *args, **kwargs):
+        kwargs.setdefault('session', self.session)
+        if not 'throttler' in kwargs:
+            kwargs['throttler'] = get_throttler(self.conf)
+        if not 'circuit_breakers' in kwargs:
+            kwargs['circuit_breakers'] = get_circuit_breakers(self.conf)
+
+        if kwargs.get('data'):
+            kwargs['data'] = json.dumps(kwargs['data'])
+
+        resp = await call_async(url,
+                                headers={'Content-Type': 'application/json'},
+                                *args,
+                                **kwargs)
+
+        return _format_response(resp)
+
+    async def _paginate(self, path, list_key, params, req_size, name):
+        # Iterate through any responses until we get to the end
+        params['page'] = 0
+        params['size'] = req_size
+        while True:
+            resp = await self.call(path, method='GET', params=params)
+
+            if not resp:
+                yield None
+                return
+
+            for item in resp['response'].get(list_key, []):
+                yield DotDict(item)
+
+            # Break if we're at the end
+            if (resp['page']['totalPages']) <= (resp['page']['number'] + 1):
+                break
+
+            # On to the next iteration
+            params['page'] += 1
+            logger.info('Fetching additional %s from genie [%s/%s]',
+                        name, params['page'], resp['page']['totalPages'])
+
+    def get_applications(self, filters=None, req_size=1000):
+        """
+        Get a list of applications (async generator).
+
+        Args:
+            filters (dict): a dictionary of filters to use in the query.
+            req_size (int): the number of items to return per request.
+
+        Yields:
+           dict: an application
+        """
+
+        params = filters or {}
+        _verify_filters(params, ['name', 'user', 'size', 'status', 'tag',
+                                 'type', 'page'])
+
+        return self._paginate(self.path_application, 'applicationList', params,
+                              req_size, 'applications')
+
+    def get_clusters(self, filters=None, req_size=1000):
+        """
+        Get all of the clusters (async generator).
+
+        Args:
+            filters (optional[dict]): a dictionary of filters to use. Valid key parameters
+                are: name, status, tag
+            req_size (int): the number of items to return per request.
+
+        Yields:
+            dict: a cluster configuration
+
+        Examples:
+            >>> [i async for i in genie.get_clusters(filters={'status':'UP'})]
+            >>> [{...}, {...}, {...}]
+        """
+
+        params = filters or {}
+        _verify_filters(params, ['name', 'size', 'status', 'tag', 'page'])
+
+        return self._paginate(self.path_cluster, 'clusterList', params,
+                              req_size, 'clusters')
+
+    def get_commands(self, filters=None, req_size=1000):
+        """
+        Get all of the commands (async generator).
+
+        Args:
+            filters (optional[dict]): a dictionary of filters to use. Valid key parameters
+                are: name, user, status, tag
+            req_size (int): the number of items to return per request.
+
+        Yields:
+            dict: a command
+        """
+
+        params = filters or {}
+        _verify_filters(params, ['name', 'user', 'size', 'status', 'tag'])
+
+        return self._paginate(self.path_command, 'commandList', params,
+                              req_size, 'commands')
+
+    def get_jobs(self, filters=None, req_size=1000):
+        """
+        Get jobs (async generator).
+
+        Args:
+            filters (dict): filter the jobs by these value(s). Valid parameters
+                are id, clusterName, user, status, and tag.
+            req_size (int): the number of items to return per request.
+
+        Yields:
+            dict: a job
+
+        Examples:
+            >>> [i async for i in genie.get_jobs(filters={'user': 'testuser'})]
+            >>> [{'id': 'testjob'}]
+        """
+
+        params = filters or {}
+
+        return self._paginate(self.path_job, 'jobSearchResultList', params,
+                              req_size, 'jobs')
+
+    async def get_application(self, application_id):
+        """Get an application. Returns None if the application is not found."""
+
+        path = self.path_application + '/' + application_id
+        resp = await self.call(path, none_on_404=True) or {}
+
+        return resp.get('response')
+
+    async def get_cluster(self, cluster_id):
+        """Get a cluster. Returns None if the cluster is not found."""
+
+        path = self.path_cluster + '/' + cluster_id
+        resp = await self.call(path, none_on_404=True) or {}
+
+        if resp.get('response'):
+            return DotDict(resp.get('response'))
+
+    async def get_command(self, command_id):
+        """Get a command. Returns None if the command is not found."""
+
+        path = self.path_command + '/' + command_id
+        resp = await self.call(path, none_on_404=True) or {}
+
+        if resp.get('response'):
+            return DotDict(resp.get('response'))
+
+    async def get_job(self, job_id):
+        """Get a job. Returns None if the job is not found."""
+
+        path = self.path_job + '/' + job_id
+        resp = await self.call(path, none_on_404=True) or {}
+
+        if resp.get('response'):
+            return DotDict(resp.get('response'))
+
+    async def get_job_status(self, job_id):
+        """Get job status. Returns None if the job is not found."""
+
+        path = self.path_job + '/' + job_id + '/status'
+        resp = await self.call(path, none_on_404=True)
+
+        if resp:
+            return resp.get('response')
@@ -29,6 +29,16 @@ class GenieAttachmentError(GenieError):
     pass
 
 
+class GenieCircuitOpenError(GenieError):
+    """Error when requests to a host are not sent because its circuit is open."""
+
+    def __init__(self, host, retry_in):
+        super(GenieCircuitOpenError, self).__init__(
+            'circuit open for {} (retry in {:.1f}s)'.format(host, retry_in))
+        self.host = host
+        self.retry_in = retry_in
+
+
 class GenieConfigError(GenieError):
     """A Genie config error occurred."""
     pass
@@ -45,6 +55,11 @@ class GenieConfigOptionError(GenieConfigError):
     pass
 
 
+class GenieDownloadError(GenieError):
+    """Error when downloading a file from a job's output directory."""
+    pass
+
+
 class GenieHTTPError(GenieError):
     """Error when sending a request to the server."""
 
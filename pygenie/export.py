@@ -0,0 +1,232 @@
+"""
+genie.export
+
+This module implements exporting the job history by time windows to
+newline-delimited JSON or Parquet files, resumable from a cursor file.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+import time
+
+from .exceptions import GenieError
+from .utils import is_str
+
+
+logger = logging.getLogger('com.netflix.pygenie.export')
+
+DEFAULT_WINDOW = 3600
+
+OUTPUT_FORMATS = {'ndjson', 'parquet'}
+
+
+def _write_atomic(path, data):
+    """Write a file through a temporary file (readers never see it partial)."""
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.rename(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _load_cursor(cursor_path):
+    if not os.path.exists(cursor_path):
+        return None
+    with open(cursor_path) as cursor_file:
+        return json.load(cursor_file)
+
+
+def _save_cursor(cursor_path, cursor):
+    _write_atomic(cursor_path, json.dumps(cursor, sort_keys=True).encode('utf-8'))
+
+
+def _started_ms(job):
+    """Get a job's start time in epoch milliseconds (None if unknown)."""
+
+    started = job.get('started')
+    if isinstance(started, (int, float)) and not isinstance(started, bool):
+        return int(started)
+    if is_str(started):
+        frmt = '%Y-%m-%dT%H:%M:%S.%fZ' if '.' in started else '%Y-%m-%dT%H:%M:%SZ'
+        try:
+            delta = datetime.datetime.strptime(started, frmt) \
+                - datetime.datetime(1970, 1, 1)
+        except ValueError:
+            return None
+        return int(round(delta.total_seconds() * 1000))
+    return None
+
+
+def _to_record(job):
+    return {key: value for key, value in job.items() if key != '_links'}
+
+
+def _write_parquet(path, records):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('pyarrow is required for the parquet format '
+                          '(pip install pyarrow)')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        pyarrow.parquet.write_table(pyarrow.Table.from_pylist(records), tmp_path)
+        os.rename(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def export_jobs(genie, dest, start, end=None, window=DEFAULT_WINDOW,
+                cursor_path=None, output_format='ndjson', filters=None,
+                req_size=1000, prefetch=None):
+    """
+    Export the jobs started between start and end.
+
+    The history is walked one time window at a time (with the minStarted and
+    maxStarted search filters) instead of paging through all the jobs, so jobs
+    submitted during the export do not shift the pages being read. Jobs are
+    deduplicated by id (including across window boundaries) and the progress
+    is saved to a cursor file after every window: calling export_jobs() again
+    with the same arguments after a failure resumes from the last completed
+    window.
+
+    Only jobs with a start time are exported: jobs which never started (e.g.
+    still queued, or failed or killed before running) do not match the
+    minStarted/maxStarted filters and Genie has no other time filter to
+    window them by.
+
+    Example:
+        >>> export_jobs(Genie(), '/data/jobs.ndjson',
+        ...             start=1500000000, end=1500086400,
+        ...             filters={'user': 'etl'})
+        1234
+
+    Args:
+        genie (:py:class:`pygenie.client.Genie`): The Genie client.
+        dest (str): The newline-delimited JSON file (ndjson format) or the
+            directory of "part-<window start>.parquet" files (parquet
+            format).
+        start (int): Export jobs started at or after this time (epoch
+            seconds).
+        end (int, optional): Export jobs started before this time (epoch
+            seconds, default: the end of the export being resumed or now).
+        window (int, optional): Seconds of history per window (default:
+            3600). Smaller windows make smaller checkpoints.
+        cursor_path (str, optional): The cursor file (default:
+            "<dest>.cursor").
+        output_format (str, optional): "ndjson" (default) or "parquet"
+            (requires pyarrow).
+        filters (dict, optional): Additional jobs search filters.
+        req_size (int, optional): Number of jobs per search page.
+        prefetch (int, optional): Pages requested concurrently, see
+            :py:meth:`pygenie.client.Genie.get_jobs`.
+
+    Returns:
+        int: The number of jobs exported by this call.
+    """
+
+    if output_format not in OUTPUT_FORMATS:
+        raise GenieError("invalid output format '{}' (should be one of {})"
+                         .format(output_format, sorted(OUTPUT_FORMATS)))
+
+    cursor_path = cursor_path or dest.rstrip('/') + '.cursor'
+    cursor = _load_cursor(cursor_path)
+    start_ms = int(start * 1000)
+    if cursor is not None:
+        if cursor['start'] != start_ms \
+                or cursor['format'] != output_format \
+                or (end is not None and cursor['end'] != int(end * 1000)):
+            raise GenieError("cursor file '{}' is for a different export "
+                             "(remove it to start over)".format(cursor_path))
+        logger.info('resuming export to %s from %s', dest, cursor['next'])
+    else:
+        end_ms = int((end if end is not None else time.time()) * 1000)
+        cursor = {'start': start_ms,
+                  'end': end_ms,
+                  'format': output_format,
+                  'next': start_ms,
+                  'offset': 0,
+                  'ids': [],
+                  'count': 0}
+
+    if output_format == 'ndjson':
+        out = open(dest, 'r+b' if os.path.exists(dest) else 'wb')
+        # drop what was written after the last checkpoint
+        out.truncate(cursor['offset'])
+        out.seek(cursor['offset'])
+    else:
+        out = None
+        if not os.path.isdir(dest):
+            os.makedirs(dest)
+
+    window_ms = int(window * 1000)
+    exported = 0
+    try:
+        while cursor['next'] < cursor['end']:
+            window_start = cursor['next']
+            window_end = min(window_start + window_ms, cursor['end'])
+
+            params = dict(filters or dict())
+            params['minStarted'] = window_start
+            params['maxStarted'] = window_end
+
+            previous_ids = set(cursor['ids'])
+            ids = set()
+            # jobs started at window_end are also in the next window
+            boundary_ids = set()
+            records = list()
+            for job in genie.get_jobs(filters=params, req_size=req_size,
+                                      prefetch=prefetch):
+                if job is None or job['id'] in ids or job['id'] in previous_ids:
+                    continue
+                ids.add(job['id'])
+                started = _started_ms(job)
+                if started is None or started >= window_end:
+                    boundary_ids.add(job['id'])
+                if out is not None:
+                    out.write(json.dumps(_to_record(job), sort_keys=True)
+                              .encode('utf-8') + b'\n')
+                else:
+                    records.append(_to_record(job))
+
+            if out is not None:
+                out.flush()
+                os.fsync(out.fileno())
+                cursor['offset'] = out.tell()
+            elif records:
+                _write_parquet(os.path.join(dest,
+                                            'part-{}.parquet'.format(window_start)),
+                               records)
+
+            logger.info('exported %s jobs started in [%s, %s)',
+                        len(ids), window_start, window_end)
+            exported += len(ids)
+            cursor['count'] += len(ids)
+            cursor['ids'] = sorted(boundary_ids)
+            cursor['next'] = window_end
+            _save_cursor(cursor_path, cursor)
+    finally:
+        if out is not None:
+            out.close()
+
+    return exported
@@ -0,0 +1,261 @@
+"""
+genie.jobs.cache
+
+This module implements an on-disk cache of finished jobs' output files.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.cache')
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+READ_SIZE = 64 * 1024
+
+# suffix of files being written (ignored by lookups and eviction)
+TMP_SUFFIX = '.tmp'
+
+
+def _replace(src, dest):
+    if hasattr(os, 'replace'):
+        os.replace(src, dest)
+    else:
+        # os.rename() does not overwrite on Windows
+        if os.path.exists(dest):
+            os.remove(dest)
+        os.rename(src, dest)
+
+
+class OutputCache(object):
+    """
+    Size-bounded on-disk cache of job output files keyed by job id and path.
+
+    Output files of finished jobs never change so they are cached as is.
+    Files are written to a temporary file and renamed into place (readers
+    never see partial files, also across processes sharing the directory).
+    The least recently used files are evicted when the total size goes over
+    max_size.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = os.path.expanduser(directory)
+        self.max_size = int(max_size)
+        self._lock = threading.Lock()
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # created concurrently
+                if not os.path.isdir(self.directory):
+                    raise
+
+    def filename(self, job_id, path):
+        """Get the cache file name for a job's output file."""
+
+        key = '{}/{}'.format(job_id, path.strip('/')).encode('utf-8')
+        return os.path.join(self.directory, hashlib.sha1(key).hexdigest())
+
+    def get(self, job_id, path, size=None):
+        """
+        Get the cached file for a job's output file.
+
+        Args:
+            job_id (str): The job id.
+            path (str): The path relative to the job's output directory.
+            size (int, optional): The expected size (from the job's output
+                listing); cached files with a different size are removed.
+
+        Returns:
+            str: The cache file name (or None if not cached).
+        """
+
+        filename = self.filename(job_id, path)
+        try:
+            actual = os.path.getsize(filename)
+            if size is not None and actual != int(size):
+                logger.warning("cached '%s' for job '%s' is %s bytes, expected %s",
+                               path, job_id, actual, size)
+                os.remove(filename)
+                return None
+            # the modification time is the last access time for eviction
+            os.utime(filename, None)
+        except OSError:
+            return None
+        logger.debug("cache hit for '%s' of job '%s'", path, job_id)
+        return filename
+
+    def put(self, job_id, path, chunks, size=None):
+        """
+        Write a job's output file to the cache.
+
+        Args:
+            job_id (str): The job id.
+            path (str): The path relative to the job's output directory.
+            chunks (iterator): The file content as bytes chunks.
+            size (int, optional): The expected size; the file is not cached
+                if the written size differs.
+
+        Returns:
+            str: The cache file name (or None if the size did not match).
+        """
+
+        filename = self.filename(job_id, path)
+        fd, tmp_filename = tempfile.mkstemp(suffix=TMP_SUFFIX, dir=self.directory)
+        try:
+            written = 0
+            with os.fdopen(fd, 'wb') as tmp_file:
+                for chunk in chunks:
+                    tmp_file.write(chunk)
+                    written += len(chunk)
+            if size is not None and written != int(size):
+                logger.warning("not caching '%s' for job '%s' (read %s bytes, "
+                               "expected %s)", path, job_id, written, size)
+                os.remove(tmp_filename)
+                return None
+            _replace(tmp_filename, filename)
+        except BaseException:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            raise
+
+        self.evict(keep=filename)
+        return filename
+
+    def evict(self, keep=None):
+        """
+        Remove the least recently used files until under max_size.
+
+        Args:
+            keep (str, optional): A file name never to evict (the file being
+                read).
+        """
+
+        with self._lock:
+            entries = list()
+            for name in os.listdir(self.directory):
+                if name.endswith(TMP_SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+            total = sum(e[1] for e in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_size:
+                    break
+                if os.path.join(self.directory, name) == keep:
+                    continue
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    total -= size
+                    logger.debug("evicted '%s' from the output cache", name)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Remove all cached files."""
+
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+def read_text(filename, encoding='utf-8'):
+    """Read a cached file as text."""
+
+    with open(filename, 'rb') as cached:
+        return cached.read().decode(encoding, 'replace')
+
+
+def _iter_chunks(cached):
+    return iter(lambda: cached.read(READ_SIZE), b'')
+
+
+def iter_lines(filename):
+    """
+    Iterate over the lines of a cached file (read in chunks) as bytes, split
+    like requests' Response.iter_lines() (the uncached stdout and logs).
+    """
+
+    with open(filename, 'rb') as cached:
+        pending = None
+        for chunk in _iter_chunks(cached):
+            if pending is not None:
+                chunk = pending + chunk
+            lines = chunk.splitlines()
+            if lines and lines[-1] and lines[-1][-1:] == chunk[-1:]:
+                pending = lines.pop()
+            else:
+                pending = None
+            for line in lines:
+                yield line
+        if pending is not None:
+            yield pending
+
+
+def iter_text_lines(filename, encoding='utf-8'):
+    """
+    Iterate over the lines of a cached file (read in chunks) as text, split
+    like :py:meth:`pygenie.jobs.log_buffer.LogBuffer.iter_lines` (the
+    uncached stderr).
+    """
+
+    with open(filename, 'rb') as cached:
+        pending = b''
+        for chunk in _iter_chunks(cached):
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode(encoding, 'replace')
+        yield pending.decode(encoding, 'replace')
+
+
+_caches = dict()
+_caches_lock = threading.Lock()
+
+
+def get_output_cache(conf=None):
+    """
+    Get the :py:class:`OutputCache` for the settings in conf, or None if
+    output caching is not enabled.
+
+    The following options in the "genie" section are used:
+        output_cache_dir: the cache directory (caching is disabled if not
+            set).
+        output_cache_max_size: maximum total bytes of cached files (default:
+            1 GiB).
+
+    The same cache (and its eviction lock) is returned for the same
+    directory and maximum size.
+
+    Args:
+        conf (GenieConf, optional): The configuration to read settings from.
+
+    Returns:
+        :py:class:`OutputCache`: The output cache (or None).
+    """
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    directory = get('output_cache_dir')
+    if not directory:
+        return None
+    key = (os.path.abspath(os.path.expanduser(directory)),
+           int(get('output_cache_max_size', DEFAULT_MAX_SIZE)))
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = OutputCache(key[0], max_size=key[1])
+        return _caches[key]
@@ -0,0 +1,246 @@
+"""
+genie.jobs.download
+
+This module implements downloading files from a job's output directory with
+concurrent HTTP Range requests.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import logging
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .tailer import parse_content_range
+
+from ..exceptions import GenieDownloadError
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.download')
+
+DEFAULT_PARALLELISM = 4
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_CHUNK_ATTEMPTS = 3
+
+# size of the pieces streamed from responses and written to the file
+WRITE_SIZE = 1024 * 1024
+
+
+def _pwrite(fd, data, offset):
+    if hasattr(os, 'pwrite'):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+    else:
+        # positional writes are not available on every platform
+        with _pwrite.lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            os.write(fd, data)
+
+
+_pwrite.lock = threading.Lock()
+
+
+class _DownloadState(object):
+    """Completed chunks of a partial download (stored next to the file)."""
+
+    def __init__(self, path, size, chunk_size):
+        self.path = path
+        self.size = size
+        self.chunk_size = chunk_size
+        self.done = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load completed chunks if the state matches the download."""
+
+        try:
+            with open(self.path) as state_file:
+                state = json.load(state_file)
+        except (IOError, OSError, ValueError):
+            return
+        if state.get('size') == self.size \
+                and state.get('chunk_size') == self.chunk_size:
+            self.done = set(state.get('done') or [])
+
+    def add(self, chunk):
+        """Mark a chunk as completed."""
+
+        with self._lock:
+            self.done.add(chunk)
+            with open(self.path, 'w') as state_file:
+                json.dump({'size': self.size,
+                           'chunk_size': self.chunk_size,
+                           'done': sorted(self.done)},
+                          state_file)
+
+    def remove(self):
+        """Remove the state file."""
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _stream_to(response, fd, offset, length=None):
+    written = 0
+    for data in response.iter_content(WRITE_SIZE):
+        if length is not None:
+            data = data[:length - written]
+        _pwrite(fd, data, offset + written)
+        written += len(data)
+        if length is not None and written >= length:
+            break
+    response.close()
+    return written
+
+
+def _download_chunk(adapter, job_id, path, fd, start, end, attempts, **kwargs):
+    length = end - start + 1
+    for attempt in range(attempts):
+        response = adapter.get_log_response(job_id,
+                                            path,
+                                            headers={'Range': 'bytes={}-{}'.format(start, end)},
+                                            stream=True,
+                                            **kwargs)
+        range_start, _, _ = parse_content_range(response.headers.get('Content-Range'))
+        if response.status_code != 206 or range_start != start:
+            response.close()
+            raise GenieDownloadError(
+                "unexpected response for '{}' bytes {}-{} ({}, Content-Range: {})" \
+                    .format(path, start, end, response.status_code,
+                            response.headers.get('Content-Range')))
+        written = _stream_to(response, fd, start, length)
+        if written == length:
+            return written
+        logger.warning("short read for '%s' bytes %s-%s (%s bytes, attempt %s)",
+                       path, start, end, written, attempt + 1)
+    raise GenieDownloadError("could not download '{}' bytes {}-{}" \
+        .format(path, start, end))
+
+
+def _download_stream(adapter, job_id, path, dest, size=None, **kwargs):
+    tmp_dest = dest + '.part'
+    response = adapter.get_log_response(job_id, path, stream=True, **kwargs)
+    fd = os.open(tmp_dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        written = _stream_to(response, fd, 0)
+    finally:
+        os.close(fd)
+    if size is not None and written != size:
+        # a streamed download cannot be resumed
+        os.remove(tmp_dest)
+        raise GenieDownloadError("downloaded {} bytes of '{}', expected {}" \
+            .format(written, path, size))
+    os.rename(tmp_dest, dest)
+    return written
+
+
+def download_output(adapter, job_id, path, dest, size=None,
+                    parallelism=DEFAULT_PARALLELISM,
+                    chunk_size=DEFAULT_CHUNK_SIZE,
+                    attempts=DEFAULT_CHUNK_ATTEMPTS, **kwargs):
+    """
+    Download a file from a job's output directory.
+
+    The file is split into chunk_size byte chunks which are downloaded with
+    up to parallelism concurrent Range requests and written at their offset
+    into a preallocated "<dest>.part" file. Completed chunks are recorded in
+    "<dest>.part.json" so an interrupted download resumes with the missing
+    chunks only. Once the size of the file is verified, it is renamed to
+    dest.
+
+    If size is None (unknown) or the server does not support Range requests,
+    the file is downloaded with a single streamed request.
+
+    Args:
+        adapter: The adapter to download with (get_log_response()).
+        job_id (str): The job id.
+        path (str): The path relative to the job's output directory.
+        dest (str): The local file path to write to.
+        size (int, optional): The file size in bytes.
+        parallelism (int, optional): Maximum concurrent requests (default: 4).
+        chunk_size (int, optional): Bytes per request (default: 8 MiB).
+        attempts (int, optional): Attempts per chunk on short reads
+            (default: 3).
+        **kwargs: Keyword arguments passed to get_log_response().
+
+    Returns:
+        int: The number of bytes downloaded.
+
+    Raises:
+        GenieDownloadError: If a chunk or the downloaded file size is wrong.
+    """
+
+    parallelism = max(1, int(parallelism))
+    chunk_size = max(1, int(chunk_size))
+
+    if size is None:
+        logger.debug("size of '%s' unknown, downloading with one request", path)
+        return _download_stream(adapter, job_id, path, dest, **kwargs)
+
+    size = int(size)
+    tmp_dest = dest + '.part'
+    state = _DownloadState(tmp_dest + '.json', size, chunk_size)
+    if os.path.exists(tmp_dest):
+        state.load()
+
+    chunks = [(i, i * chunk_size, min(size, (i + 1) * chunk_size) - 1)
+              for i in range((size + chunk_size - 1) // chunk_size)]
+    todo = [c for c in chunks if c[0] not in state.done]
+
+    logger.debug("downloading '%s' (%s bytes, %s of %s chunks, parallelism %s)",
+                 path, size, len(todo), len(chunks), parallelism)
+
+    fd = os.open(tmp_dest, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != size:
+            os.ftruncate(fd, size)
+            if hasattr(os, 'posix_fallocate') and size > 0:
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except OSError:
+                    # not supported by every file system, the file is sparse
+                    pass
+
+        def download(chunk):
+            index, start, end = chunk
+            _download_chunk(adapter, job_id, path, fd, start, end, attempts,
+                            **kwargs)
+            state.add(index)
+
+        if todo and not state.done:
+            # the first chunk checks the server supports Range requests
+            try:
+                download(todo.pop(0))
+            except GenieDownloadError:
+                logger.warning("ranged download of '%s' failed, "
+                               "downloading with one request", path)
+                os.close(fd)
+                fd = None
+                state.remove()
+                return _download_stream(adapter, job_id, path, dest,
+                                        size=size, **kwargs)
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(parallelism, len(todo))) as executor:
+                # list() to raise the first error
+                list(executor.map(download, todo))
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+    actual = os.path.getsize(tmp_dest)
+    if actual != size or len(state.done) != len(chunks):
+        raise GenieDownloadError("downloaded {} bytes of '{}', expected {}" \
+            .format(actual, path, size))
+
+    os.rename(tmp_dest, dest)
+    state.remove()
+
+    return size
@@ -0,0 +1,216 @@
+"""
+genie.jobs.journal
+
+This module implements a local journal of submitted jobs so a restarted
+process can find the jobs it already submitted (and their last known
+statuses) without probing Genie for every job id.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.journal')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    payload_hash TEXT,
+    submitted REAL,
+    status TEXT,
+    updated REAL
+)
+"""
+
+
+def payload_hash(job):
+    """
+    Get the hash of a job's configuration (its repr without the job id) to
+    tell a re-submit of the same job from a different job with the same id.
+    """
+
+    lines = [line for line in job.repr_obj.repr_list
+             if not line.startswith('job_id(')]
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+class JobJournal(object):
+    """
+    Journal of submitted jobs in a local SQLite database.
+
+    Every job submitted with :py:func:`pygenie.adapter.adapter.execute_job` is
+    recorded with the hash of its payload, its submit time and its last known
+    status. The journal is safe to share between threads and processes
+    (SQLite locking) and a connection is only open during each operation.
+
+    Example:
+        >>> journal = JobJournal('~/.genie/journal.db')
+        >>> for job_id in journal.unfinished():
+        ...     reattach_job(job_id).wait()
+    """
+
+    def __init__(self, path, timeout=30):
+        """
+        Args:
+            path (str): The database file.
+            timeout (int, optional): Seconds to wait for another process
+                holding the database lock (default: 30).
+        """
+
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        with self._lock:
+            if not self._initialized:
+                directory = os.path.dirname(self.path)
+                if not os.path.isdir(directory):
+                    try:
+                        os.makedirs(directory)
+                    except OSError:
+                        # created concurrently
+                        if not os.path.isdir(directory):
+                            raise
+                conn = sqlite3.connect(self.path, timeout=self.timeout)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(SCHEMA)
+                conn.commit()
+                self._initialized = True
+                return conn
+        return sqlite3.connect(self.path, timeout=self.timeout)
+
+    def _execute(self, sql, params=()):
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def record_submit(self, job_id, payload_hash, status='INIT'):
+        """Record a submitted job (replaces any previous entry for the id)."""
+
+        now = time.time()
+        self._execute('INSERT OR REPLACE INTO jobs '
+                      '(job_id, payload_hash, submitted, status, updated) '
+                      'VALUES (?, ?, ?, ?, ?)',
+                      (job_id, payload_hash, now, status, now))
+
+    def record_reattach(self, job_id, payload_hash, status='INIT'):
+        """
+        Record a job which already existed in Genie when submitted: an entry
+        already in the journal keeps its submit time and last known status.
+        """
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('INSERT OR IGNORE INTO jobs '
+                             '(job_id, payload_hash, submitted, status, updated) '
+                             'VALUES (?, ?, ?, ?, ?)',
+                             (job_id, payload_hash, now, status, now))
+                conn.execute('UPDATE jobs SET payload_hash = ? WHERE job_id = ?',
+                             (payload_hash, job_id))
+        finally:
+            conn.close()
+
+    def update_status(self, job_id, status):
+        """Record the last known status of a job (if it is in the journal)."""
+
+        self._execute('UPDATE jobs SET status = ?, updated = ? WHERE job_id = ?',
+                      (status.upper(), time.time(), job_id))
+
+    def get(self, job_id):
+        """
+        Get a job's entry.
+
+        Returns:
+            dict: job_id, payload_hash, submitted, status and updated (or None
+                if the job is not in the journal).
+        """
+
+        rows = self._execute('SELECT job_id, payload_hash, submitted, status, '
+                             'updated FROM jobs WHERE job_id = ?', (job_id,))
+        if not rows:
+            return None
+        return dict(zip(('job_id', 'payload_hash', 'submitted', 'status',
+                         'updated'),
+                        rows[0]))
+
+    def attempts(self, prefix):
+        """
+        Get the last known statuses of the attempts of a job id ("<prefix>" and
+        "<prefix>-N").
+
+        Returns:
+            dict: A mapping of job id to status.
+        """
+
+        pattern = prefix.replace('\\', '\\\\').replace('%', '\\%') \
+            .replace('_', '\\_') + '-%'
+        rows = self._execute("SELECT job_id, status FROM jobs "
+                             "WHERE job_id = ? OR job_id LIKE ? ESCAPE '\\'",
+                             (prefix, pattern))
+        return {job_id: status for job_id, status in rows
+                if job_id == prefix or job_id[len(prefix) + 1:].isdigit()}
+
+    def unfinished(self):
+        """Get the ids of the jobs not known to be finished (oldest first)."""
+
+        from .running import RUNNING_STATUSES
+
+        rows = self._execute('SELECT job_id, status FROM jobs ORDER BY submitted')
+        return [job_id for job_id, status in rows
+                if status in RUNNING_STATUSES]
+
+    def prune(self, older_than):
+        """Remove finished jobs last updated more than older_than seconds ago."""
+
+        from .running import RUNNING_STATUSES
+
+        statuses = sorted(RUNNING_STATUSES)
+        self._execute('DELETE FROM jobs WHERE updated < ? AND status NOT IN ({})'
+                      .format(', '.join('?' * len(statuses))),
+                      [time.time() - older_than] + statuses)
+
+
+_journals = dict()
+_journals_lock = threading.Lock()
+
+
+def get_job_journal(conf=None):
+    """
+    Get the :py:class:`JobJournal` for the settings in conf, or None if the
+    journal is not enabled.
+
+    The following options in the "genie" section are used:
+        journal_path: the SQLite database file (the journal is disabled if
+            not set).
+
+    Args:
+        conf (GenieConf, optional): The configuration to read settings from.
+
+    Returns:
+        :py:class:`JobJournal`: The job journal (or None).
+    """
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    path = get('journal_path')
+    if not path:
+        return None
+    with _journals_lock:
+        if path not in _journals:
+            _journals[path] = JobJournal(path)
+        return _journals[path]
@@ -0,0 +1,229 @@
+"""
+genie.jobs.log_buffer
+
+This module implements an append-only buffer for job logs which are fetched
+incrementally (for example, tailing a running job's stderr).
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import tempfile
+import threading
+
+from array import array
+from bisect import bisect_right
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.log_buffer')
+
+DEFAULT_SPILL_SIZE = 64 * 1024 * 1024
+
+# size of blocks read when iterating over the buffer
+READ_SIZE = 1024 * 1024
+
+
+class LogBuffer(object):
+    """
+    Append-only log buffer.
+
+    Appended data is kept as a list of byte segments (appending is O(len(data))
+    instead of copying the whole log like str concatenation) with an index of
+    the byte offset of each newline. Once the buffer is larger than spill_size
+    bytes, the segments are moved to a temporary file and later data is
+    appended to the file so that large logs are not held in memory.
+
+    The length of the buffer is its size in bytes (the offset to use in a
+    Range header to get the rest of the log).
+
+    Example:
+        >>> buf = LogBuffer()
+        >>> buf.append('line1\\nline2\\n')
+        >>> len(buf)
+        12
+        >>> list(buf.iter_lines(start=1))
+        ['line2', '']
+
+    Args:
+        spill_size (int, optional): Size in bytes after which the buffer is
+            moved to a temporary file (default: 64 MiB). None keeps the buffer
+            in memory.
+        encoding (str, optional): Encoding used to encode str data and decode
+            text (default: 'utf-8').
+    """
+
+    def __init__(self, spill_size=DEFAULT_SPILL_SIZE, encoding='utf-8'):
+        self.spill_size = int(spill_size) if spill_size not in {None, ''} else None
+        self.encoding = encoding
+        self._segments = list()
+        self._starts = array(str('Q'))
+        self._file = None
+        self._size = 0
+        self._newlines = array(str('Q'))
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return '{}(size={}, lines={}, spilled={})'.format(self.__class__.__name__,
+                                                          self._size,
+                                                          self.line_count,
+                                                          self.spilled)
+
+    def __len__(self):
+        return self._size
+
+    def __str__(self):
+        return self.getvalue()
+
+    @property
+    def size(self):
+        """Size of the buffer in bytes."""
+
+        return self._size
+
+    @property
+    def line_count(self):
+        """Number of lines (as returned by :py:meth:`iter_lines`)."""
+
+        return len(self._newlines) + 1
+
+    @property
+    def spilled(self):
+        """True if the buffer has been moved to a temporary file."""
+
+        return self._file is not None
+
+    def append(self, data):
+        """
+        Append data to the buffer.
+
+        Args:
+            data (bytes or str): The data (str is encoded with the buffer's
+                encoding).
+
+        Returns:
+            int: The number of bytes appended.
+        """
+
+        if not data:
+            return 0
+        if not isinstance(data, bytes):
+            data = data.encode(self.encoding)
+
+        with self._lock:
+            start = 0
+            while True:
+                index = data.find(b'\n', start)
+                if index < 0:
+                    break
+                self._newlines.append(self._size + index)
+                start = index + 1
+
+            if self._file is not None:
+                self._file.seek(0, 2)
+                self._file.write(data)
+            else:
+                self._starts.append(self._size)
+                self._segments.append(data)
+            self._size += len(data)
+
+            if self._file is None and self.spill_size is not None \
+                    and self._size > self.spill_size:
+                self._spill()
+
+        return len(data)
+
+    def _spill(self):
+        logger.debug('spilling %s byte log buffer to disk', self._size)
+        self._file = tempfile.TemporaryFile(prefix='pygenie-log-')
+        for segment in self._segments:
+            self._file.write(segment)
+        self._segments = list()
+        self._starts = array(str('Q'))
+
+    def read(self, offset=0, length=None):
+        """
+        Read bytes from the buffer.
+
+        Args:
+            offset (int, optional): Byte offset to start reading from.
+            length (int, optional): Maximum number of bytes to read (default:
+                to the end of the buffer).
+
+        Returns:
+            bytes: The data.
+        """
+
+        with self._lock:
+            end = self._size if length is None else min(self._size, offset + length)
+            if offset >= end:
+                return b''
+
+            if self._file is not None:
+                self._file.seek(offset)
+                return self._file.read(end - offset)
+
+            parts = list()
+            index = bisect_right(self._starts, offset) - 1
+            while index < len(self._segments) and self._starts[index] < end:
+                position = self._starts[index]
+                parts.append(self._segments[index][offset - position:end - position])
+                offset = position + len(self._segments[index])
+                index += 1
+            return b''.join(parts)
+
+    def _iter_blocks(self, offset):
+        while True:
+            block = self.read(offset, READ_SIZE)
+            if not block:
+                return
+            offset += len(block)
+            yield block
+
+    def line_offset(self, line):
+        """Return the byte offset of the start of a line (0-based)."""
+
+        if line <= 0:
+            return 0
+        if line > len(self._newlines):
+            return self._size
+        return self._newlines[line - 1] + 1
+
+    def iter_lines(self, start=0):
+        """
+        Iterate over the lines in the buffer without reading the whole buffer
+        into memory. Lines are split like str.split('\\n') (so a buffer ending
+        with a newline ends with an empty line).
+
+        Args:
+            start (int, optional): The line to start from (0-based).
+
+        Yields:
+            str: Decoded lines (without the newline).
+        """
+
+        pending = b''
+        for block in self._iter_blocks(self.line_offset(start)):
+            lines = (pending + block).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode(self.encoding, 'replace')
+        yield pending.decode(self.encoding, 'replace')
+
+    def getvalue(self):
+        """Return the whole buffer as decoded text."""
+
+        return self.read().decode(self.encoding, 'replace')
+
+    def close(self):
+        """Release the buffer (removes the temporary file if spilled)."""
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._segments = list()
+            self._starts = array(str('Q'))
+            self._newlines = array(str('Q'))
+            self._size = 0
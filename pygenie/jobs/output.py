@@ -0,0 +1,148 @@
+"""
+genie.jobs.output
+
+This module implements listing a job's output directory tree and fetching
+selected files from it.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import fnmatch
+import logging
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .download import DEFAULT_CHUNK_SIZE, download_output
+
+from ..utils import is_str
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.output')
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def _get_listing(adapter, job_id, path):
+    url_path = 'output/{}/'.format(path) if path else 'output/'
+    return adapter.get(job_id,
+                       path=url_path,
+                       if_not_found=dict(),
+                       headers={'Accept': 'application/json'}) or dict()
+
+
+def _entries(listing, key, directory):
+    for entry in listing.get(key) or []:
+        name = (entry.get('name') or '').strip('/')
+        if not name:
+            continue
+        entry = dict(entry)
+        entry['name'] = name.rpartition('/')[2]
+        entry['path'] = '{}/{}'.format(directory, entry['name']) if directory \
+            else entry['name']
+        yield entry
+
+
+def list_output(adapter, job_id, path='', recursive=True, pattern=None,
+                max_workers=DEFAULT_MAX_WORKERS):
+    """
+    List the files in a job's output directory.
+
+    Directories of the same depth are listed concurrently.
+
+    Args:
+        adapter: The adapter to list with (get()).
+        job_id (str): The job id.
+        path (str, optional): The directory relative to the job's output
+            directory (default: the output directory).
+        recursive (bool, optional): List subdirectories (default: True).
+        pattern (str or list, optional): Glob pattern(s) matched against the
+            file paths (relative to the output directory, "*" also matches
+            "/").
+        max_workers (int, optional): Maximum concurrent listing requests.
+
+    Returns:
+        list: The file entries (dicts with the "path", "name", "size" and
+            "lastModified" of each file) sorted by path.
+    """
+
+    patterns = [pattern] if is_str(pattern) else pattern
+
+    files = list()
+    directories = [path.strip('/')]
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        while directories:
+            listings = executor.map(lambda d: _get_listing(adapter, job_id, d),
+                                    directories)
+            next_directories = list()
+            for directory, listing in zip(directories, listings):
+                files.extend(_entries(listing, 'files', directory))
+                if recursive:
+                    next_directories.extend(e['path'] for e in
+                                            _entries(listing, 'directories',
+                                                     directory))
+            directories = next_directories
+
+    if patterns:
+        files = [f for f in files
+                 if any(fnmatch.fnmatchcase(f['path'], p) for p in patterns)]
+
+    return sorted(files, key=lambda f: f['path'])
+
+
+def fetch_output(adapter, job_id, dest_dir, files,
+                 max_workers=DEFAULT_MAX_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE,
+                 **kwargs):
+    """
+    Download files from a job's output directory concurrently into a local
+    directory (keeping their relative paths).
+
+    Args:
+        adapter: The adapter to download with (get_log_response()).
+        job_id (str): The job id.
+        dest_dir (str): The local directory to write to.
+        files (list): The file entries to download (from list_output()).
+        max_workers (int, optional): Maximum concurrent downloads.
+        chunk_size (int, optional): Bytes per Range request for large files.
+        **kwargs: Keyword arguments passed to get_log_response().
+
+    Returns:
+        dict: The local file names keyed by path.
+
+    Raises:
+        GenieDownloadError: If a file could not be downloaded.
+    """
+
+    dest_dir = os.path.abspath(dest_dir)
+
+    def fetch(entry):
+        dest = os.path.abspath(os.path.join(dest_dir, entry['path']))
+        if not dest.startswith(dest_dir + os.sep):
+            raise ValueError("invalid output path '{}'".format(entry['path']))
+        directory = os.path.dirname(dest)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # created concurrently
+                if not os.path.isdir(directory):
+                    raise
+        # files are fetched concurrently, the chunks of a file sequentially
+        download_output(adapter, job_id, entry['path'], dest,
+                        size=entry.get('size'),
+                        parallelism=1,
+                        chunk_size=chunk_size,
+                        **kwargs)
+        return entry['path'], dest
+
+    logger.debug("fetching %s files of job '%s' to %s", len(files), job_id,
+                 dest_dir)
+
+    if not files:
+        return dict()
+
+    with ThreadPoolExecutor(max_workers=min(max(1, int(max_workers)),
+                                            len(files))) as executor:
+        return dict(executor.map(fetch, files))
@@ -0,0 +1,223 @@
+"""
+genie.jobs.poll_schedules
+
+This module implements schedules for how long to sleep between job status
+polls while waiting for a job.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import random
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.poll_schedules')
+
+DEFAULT_MIN_INTERVAL = 1
+DEFAULT_MAX_INTERVAL = 60
+
+PENDING_STATUSES = {
+    'INIT',
+    'RESERVED',
+    'ACCEPTED',
+    'RESOLVED',
+    'CLAIMED'
+}
+
+
+class PollSchedule(object):
+    """
+    Base poll schedule.
+
+    Subclasses implement :py:meth:`next_interval` which is called after every
+    status poll with the following arguments:
+
+        attempt (int): number of polls since the job status last changed
+            (0 for the first poll in a status).
+        status (str): the job status returned by the last poll.
+        elapsed (float): seconds since waiting started.
+        previous (float): the previous interval (None for the first poll).
+    """
+
+    def __repr__(self):
+        return '{}()'.format(self.__class__.__name__)
+
+    def next_interval(self, attempt, status=None, elapsed=0, previous=None):
+        """Return the number of seconds to sleep before the next poll."""
+
+        raise NotImplementedError
+
+    def __call__(self, attempt, status=None, elapsed=0, previous=None,
+                 remaining=None):
+        """
+        Return the number of seconds to sleep before the next poll, tightened
+        so the sleep does not run past the remaining time before a deadline
+        (for example, the job_timeout passed to :py:meth:`RunningJob.wait`).
+        """
+
+        interval = self.next_interval(attempt,
+                                      status=status,
+                                      elapsed=elapsed,
+                                      previous=previous)
+        if remaining is not None:
+            interval = min(interval, max(remaining, 0))
+        return max(interval, 0)
+
+
+class FixedSchedule(PollSchedule):
+    """Poll at a fixed interval."""
+
+    def __init__(self, interval=10):
+        self.interval = float(interval)
+
+    def __repr__(self):
+        return '{}(interval={})'.format(self.__class__.__name__, self.interval)
+
+    def next_interval(self, attempt, status=None, elapsed=0, previous=None):
+        return self.interval
+
+
+class ExponentialBackoffSchedule(PollSchedule):
+    """
+    Poll with exponentially increasing intervals (initial * factor ** attempt)
+    capped at max_interval. If jitter is True, a random interval between 0 and
+    the computed interval is used ("full jitter").
+    """
+
+    def __init__(self, initial=DEFAULT_MIN_INTERVAL, factor=2,
+                 max_interval=DEFAULT_MAX_INTERVAL, jitter=False):
+        self.initial = float(initial)
+        self.factor = float(factor)
+        self.max_interval = float(max_interval)
+        self.jitter = jitter
+
+    def __repr__(self):
+        return '{}(initial={}, factor={}, max_interval={}, jitter={})' \
+            .format(self.__class__.__name__,
+                    self.initial,
+                    self.factor,
+                    self.max_interval,
+                    self.jitter)
+
+    def next_interval(self, attempt, status=None, elapsed=0, previous=None):
+        # cap the exponent to avoid overflows for very long waits
+        interval = min(self.max_interval,
+                       self.initial * self.factor ** min(attempt, 64))
+        return random.uniform(0, interval) if self.jitter else interval
+
+
+class DecorrelatedJitterSchedule(PollSchedule):
+    """
+    Poll with "decorrelated jitter" backoff: each interval is a random value
+    between base and three times the previous interval, capped at
+    max_interval. Spreads out polls from many waiters started at the same time.
+    """
+
+    def __init__(self, base=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL):
+        self.base = float(base)
+        self.max_interval = float(max_interval)
+
+    def __repr__(self):
+        return '{}(base={}, max_interval={})'.format(self.__class__.__name__,
+                                                     self.base,
+                                                     self.max_interval)
+
+    def next_interval(self, attempt, status=None, elapsed=0, previous=None):
+        previous = previous or self.base
+        return min(self.max_interval,
+                   random.uniform(self.base, max(self.base, previous * 3)))
+
+
+class StatusAwareSchedule(PollSchedule):
+    """
+    Use a different schedule depending on the job status.
+
+    By default, jobs which have not started running yet (INIT, ACCEPTED, etc)
+    are polled every min_interval seconds, and running jobs are polled with an
+    exponential backoff from min_interval up to max_interval, so short jobs
+    are detected quickly and long jobs are polled less often.
+
+    Args:
+        schedules (dict, optional): Mapping of status to schedule (overrides
+            the defaults).
+        default (:py:class:`PollSchedule`, optional): Schedule for statuses
+            without a specific schedule.
+    """
+
+    def __init__(self, schedules=None, default=None,
+                 min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL):
+        pending = FixedSchedule(min_interval)
+        self.schedules = {status: pending for status in PENDING_STATUSES}
+        self.schedules['RUNNING'] = ExponentialBackoffSchedule(
+            initial=min_interval,
+            max_interval=max_interval)
+        self.schedules.update(schedules or dict())
+        self.default = default or FixedSchedule(min_interval)
+
+    def __repr__(self):
+        return '{}(schedules={}, default={})'.format(self.__class__.__name__,
+                                                     self.schedules,
+                                                     self.default)
+
+    def next_interval(self, attempt, status=None, elapsed=0, previous=None):
+        schedule = self.schedules.get((status or '').upper(), self.default)
+        return schedule.next_interval(attempt,
+                                      status=status,
+                                      elapsed=elapsed,
+                                      previous=previous)
+
+
+POLL_SCHEDULES = {
+    'fixed': FixedSchedule,
+    'exponential': ExponentialBackoffSchedule,
+    'decorrelated': DecorrelatedJitterSchedule,
+    'status': StatusAwareSchedule
+}
+
+
+def get_poll_schedule(schedule=None, conf=None, sleep_seconds=10):
+    """
+    Get a poll schedule.
+
+    If schedule is None, the "genie.poll_schedule" option is used (fixed,
+    exponential, decorrelated or status) with the "genie.poll_min_interval"
+    and "genie.poll_max_interval" options. Without configuration a
+    :py:class:`FixedSchedule` polling every sleep_seconds is returned.
+
+    Args:
+        schedule (:py:class:`PollSchedule` or str, optional): A schedule or the
+            name of a schedule.
+        conf (GenieConf, optional): The configuration.
+        sleep_seconds (int or float, optional): Interval for the fixed schedule.
+
+    Returns:
+        :py:class:`PollSchedule`: The poll schedule.
+    """
+
+    if isinstance(schedule, PollSchedule):
+        return schedule
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    name = (schedule or get('poll_schedule') or 'fixed').lower()
+    if name not in POLL_SCHEDULES:
+        raise ValueError("invalid poll schedule '{}' (should be one of {})" \
+            .format(name, sorted(POLL_SCHEDULES)))
+
+    if name == 'fixed':
+        return FixedSchedule(sleep_seconds)
+
+    min_interval = float(get('poll_min_interval', DEFAULT_MIN_INTERVAL))
+    max_interval = float(get('poll_max_interval', DEFAULT_MAX_INTERVAL))
+
+    if name == 'exponential':
+        return ExponentialBackoffSchedule(initial=min_interval,
+                                          max_interval=max_interval)
+    if name == 'decorrelated':
+        return DecorrelatedJitterSchedule(base=min_interval,
+                                          max_interval=max_interval)
+    return StatusAwareSchedule(min_interval=min_interval,
+                               max_interval=max_interval)
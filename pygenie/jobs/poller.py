@@ -0,0 +1,210 @@
+"""
+genie.jobs.poller
+
+This module implements a status poller shared by RunningJob objects so that
+waiting on many jobs uses one polling thread and batched status requests.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import threading
+
+from concurrent.futures import Future, InvalidStateError
+
+from ..conf import GenieConf
+from .running import RUNNING_STATUSES
+
+from ..exceptions import GenieJobNotFoundError
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.poller')
+
+DEFAULT_POLL_INTERVAL = 10
+
+
+class _Registration(object):
+    """A job registered with the poller and the statuses it is waiting on."""
+
+    def __init__(self, job_id, statuses):
+        self.job_id = job_id
+        self.statuses = statuses
+        self.future = Future()
+
+
+class StatusPoller(object):
+    """
+    Polls the status of all registered jobs from a single background thread.
+
+    Each poll gets the statuses of all registered jobs with
+    :py:meth:`get_statuses` on the adapter (the Genie 3 adapter pages through
+    the jobs search endpoint instead of requesting each job's status). When a
+    job leaves the statuses it is waiting on, its future is resolved with the
+    job's status and any done callbacks are run.
+
+    The polling thread is started when a job is registered and exits when no
+    jobs are registered.
+
+    Example:
+        >>> poller = StatusPoller(interval=5)
+        >>> future = poller.register(running_job)
+        >>> future.add_done_callback(lambda f: print(f.result()))
+        >>> future.result()
+        u'SUCCEEDED'
+
+    Args:
+        adapter (optional): The adapter to get job statuses with.
+        conf (GenieConf, optional): The conf used to create the adapter.
+        interval (int or float, optional): Seconds between polls (default: 10).
+        filters (dict, optional): Jobs search filters used when getting statuses
+            (default: jobs submitted by the "genie.username" user).
+    """
+
+    def __init__(self, adapter=None, conf=None, interval=DEFAULT_POLL_INTERVAL,
+                 filters=None):
+        self._conf = conf or GenieConf()
+        self._adapter = adapter
+        self._filters = filters if filters is not None \
+            else {'user': self._conf.genie.username}
+        self._interval = float(interval)
+        self._lock = threading.Lock()
+        self._registrations = list()
+        self._thread = None
+        self._wake = threading.Event()
+
+    def __repr__(self):
+        return '{}(interval={})'.format(self.__class__.__name__, self._interval)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._registrations)
+
+    @property
+    def adapter(self):
+        if self._adapter is None:
+            # imported here to avoid circular imports (adapter imports jobs)
+            from ..adapter.adapter import get_adapter_for_version
+            self._adapter = get_adapter_for_version(self._conf.genie.version)(
+                conf=self._conf)
+        return self._adapter
+
+    def register(self, running_job, until_running=False):
+        """
+        Register a job to be polled.
+
+        Args:
+            running_job (:py:class:`RunningJob` or str): The job (or job id).
+            until_running (bool, optional): If True, the future is resolved
+                once the job status becomes 'RUNNING' (default: False).
+
+        Returns:
+            :py:class:`concurrent.futures.Future`: Resolved with the job status
+                once the job is done (or running if until_running is True).
+        """
+
+        job_id = getattr(running_job, '_job_id', running_job)
+        statuses = {s for s in RUNNING_STATUSES \
+            if not until_running or s != 'RUNNING'}
+
+        registration = _Registration(job_id, statuses)
+
+        with self._lock:
+            self._registrations.append(registration)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run,
+                                                name='genie-status-poller')
+                self._thread.daemon = True
+                self._thread.start()
+
+        return registration.future
+
+    def unregister(self, future):
+        """Stop polling for the registration of the future (cancels it)."""
+
+        with self._lock:
+            self._registrations = [r for r in self._registrations
+                                   if r.future is not future]
+        future.cancel()
+
+    def poll(self):
+        """Get the statuses of the registered jobs and resolve finished ones."""
+
+        with self._lock:
+            registrations = [r for r in self._registrations
+                             if not r.future.done()]
+        if not registrations:
+            return
+
+        job_ids = sorted({r.job_id for r in registrations})
+        logger.debug('polling status for %s jobs', len(job_ids))
+
+        try:
+            statuses = self.adapter.get_statuses(job_ids, filters=self._filters)
+        except Exception as err:
+            # keep polling, the error may be transient
+            logger.warning('error polling job statuses: %s', err)
+            return
+
+        finished = list()
+        for registration in registrations:
+            status = statuses.get(registration.job_id)
+            try:
+                if status is None:
+                    registration.future.set_exception(GenieJobNotFoundError(
+                        "job '{}' not found".format(registration.job_id)))
+                elif status not in registration.statuses:
+                    registration.future.set_result(status)
+                else:
+                    continue
+            except InvalidStateError:
+                # unregistered (cancelled) while polling
+                pass
+            finished.append(registration)
+
+        with self._lock:
+            self._registrations = [r for r in self._registrations
+                                   if r not in finished and not r.future.done()]
+
+    def _run(self):
+        while True:
+            self.poll()
+            with self._lock:
+                if not self._registrations:
+                    self._thread = None
+                    return
+            self._wake.wait(self._interval)
+            self._wake.clear()
+
+    def wakeup(self):
+        """Poll now instead of waiting for the rest of the interval."""
+
+        self._wake.set()
+
+
+_pollers = dict()
+_pollers_lock = threading.Lock()
+
+
+def get_shared_poller(conf=None):
+    """
+    Get the process-wide :py:class:`StatusPoller` for the Genie server and
+    user in conf. The poll interval is set with the "genie.poll_interval"
+    option (default: 10).
+
+    Args:
+        conf (GenieConf, optional): The configuration.
+
+    Returns:
+        :py:class:`StatusPoller`: The shared poller.
+    """
+
+    conf = conf or GenieConf()
+    interval = float(conf.genie.get('poll_interval', DEFAULT_POLL_INTERVAL))
+    key = (conf.genie.url, conf.genie.version, conf.genie.username, interval)
+
+    with _pollers_lock:
+        if key not in _pollers:
+            _pollers[key] = StatusPoller(conf=conf, interval=interval)
+        return _pollers[key]
@@ -0,0 +1,397 @@
+"""
+genie.jobs.results
+
+This module implements reading tabular query results (Presto/Hive output)
+from a job's output as typed record batches.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import csv
+import itertools
+import logging
+import re
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.results')
+
+DEFAULT_SAMPLE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_NULL_VALUES = frozenset(['', 'NULL', 'null', '\\N'])
+
+BATCH_FORMATS = {'tuples', 'dicts', 'numpy', 'pandas', 'arrow'}
+
+TRUE_VALUES = frozenset(['true', 'True', 'TRUE'])
+FALSE_VALUES = frozenset(['false', 'False', 'FALSE'])
+
+
+class PrestoDialect(csv.Dialect):
+    """Presto CLI CSV output (every value double quoted)."""
+
+    delimiter = str(',')
+    quotechar = str('"')
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = str('\n')
+    quoting = csv.QUOTE_MINIMAL
+
+
+class HiveDialect(csv.Dialect):
+    """Hive CLI output (tab separated, no quoting)."""
+
+    delimiter = str('\t')
+    quotechar = None
+    escapechar = None
+    doublequote = False
+    skipinitialspace = False
+    lineterminator = str('\n')
+    quoting = csv.QUOTE_NONE
+
+
+class TSVDialect(HiveDialect):
+    """Presto CLI TSV output."""
+
+
+OUTPUT_FORMATS = {
+    'CSV': (PrestoDialect, False),
+    'CSV_HEADER': (PrestoDialect, True),
+    'CSV_UNQUOTED': (PrestoDialect, False),
+    'CSV_HEADER_UNQUOTED': (PrestoDialect, True),
+    'TSV': (TSVDialect, False),
+    'TSV_HEADER': (TSVDialect, True),
+}
+
+
+def detect_format(command_name=None, command_args=None, tags=None):
+    """
+    Detect the output dialect and whether the output has a header row from a
+    job's command, command arguments and tags.
+
+    Returns:
+        tuple: (dialect or None if unknown, header (True/False) or None if
+            unknown).
+    """
+
+    command_name = (command_name or '').lower()
+    command_args = command_args or ''
+    has_header_tag = 'headers' in (tags or [])
+
+    match = re.search(r'--output-format[ =]+(\w+)', command_args)
+    if match and match.group(1).upper() in OUTPUT_FORMATS:
+        return OUTPUT_FORMATS[match.group(1).upper()]
+
+    if 'hive' in command_name:
+        header = has_header_tag \
+            or 'hive.cli.print.header=true' in command_args.replace(' ', '')
+        return HiveDialect, header
+    if 'presto' in command_name or 'trino' in command_name:
+        # batch mode CLI output is quoted CSV
+        return PrestoDialect, has_header_tag
+
+    return None, True if has_header_tag else None
+
+
+def _to_bool(value):
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+# tried in order, str always succeeds
+CONVERTERS = [('bool', _to_bool), ('int', int), ('float', float), ('str', None)]
+
+
+def _lenient(convert):
+    """Wrap a converter to keep values it cannot convert as str."""
+
+    def lenient_convert(value):
+        try:
+            return convert(value)
+        except (TypeError, ValueError):
+            return value
+    return lenient_convert
+
+
+def infer_types(rows, ncols, null_values=DEFAULT_NULL_VALUES):
+    """
+    Infer column types from sample rows. A column gets the first type of
+    bool, int, float and str all its non null values convert to.
+
+    Returns:
+        list: The type names per column.
+    """
+
+    types = list()
+    for col in range(ncols):
+        values = [row[col] for row in rows
+                  if col < len(row) and row[col] not in null_values]
+        for name, convert in CONVERTERS:
+            if convert is None:
+                types.append(name)
+                break
+            if not values:
+                continue
+            try:
+                for value in values:
+                    convert(value)
+            except ValueError:
+                continue
+            types.append(name)
+            break
+    return types
+
+
+def unique_names(names):
+    """
+    Make column names unique by suffixing repeated names with "_1", "_2"...
+    (e.g. "SELECT a.id, b.id" outputs two "id" columns).
+
+    Returns:
+        list: The unique names.
+    """
+
+    seen = set(names)
+    counts = dict()
+    unique = list()
+    for name in names:
+        if name in counts:
+            count = counts[name]
+            while '{}_{}'.format(name, count) in seen:
+                count += 1
+            counts[name] = count + 1
+            name = '{}_{}'.format(name, count)
+            seen.add(name)
+        else:
+            counts[name] = 1
+        unique.append(name)
+    return unique
+
+
+class ResultReader(object):
+    """
+    Read tabular job output as typed records.
+
+    Only the sample (used for dialect sniffing, header detection and type
+    inference) and one batch are held in memory at a time.
+
+    Example:
+        >>> reader = ResultReader(running_job.stream(lines=True),
+        ...                       dialect=PrestoDialect, header=True)
+        >>> reader.columns
+        ['dateint', 'country', 'hours']
+        >>> for batch in reader.batches(10000, format='pandas'):
+        ...     process(batch)
+    """
+
+    def __init__(self, lines, dialect=None, header=None, columns=None,
+                 types=None, infer=True, sample_size=DEFAULT_SAMPLE_SIZE,
+                 null_values=DEFAULT_NULL_VALUES):
+        """
+        Args:
+            lines (iterator): The output lines (without line endings).
+            dialect (csv.Dialect, optional): The dialect (sniffed from the
+                sample if None).
+            header (bool, optional): Whether the first row is a header
+                (sniffed from the sample if None).
+            columns (list, optional): Column names (overrides the header).
+                Repeated names are made unique (see :py:func:`unique_names`).
+            types (list, optional): Column type names ('bool', 'int', 'float'
+                or 'str'), inferred from the sample if None.
+            infer (bool, optional): If False, all values are str (default:
+                True).
+            sample_size (int, optional): Lines read to sniff and infer types
+                (default: 1000).
+            null_values (set, optional): Values read as None.
+        """
+
+        self._lines = iter(lines)
+        self._dialect = dialect
+        self._header = header
+        self._columns = list(columns) if columns else None
+        self._types = list(types) if types else None
+        self._infer = infer
+        self._sample_size = int(sample_size)
+        self._null_values = null_values
+        self._rows = None
+
+    def _prepare(self):
+        if self._rows is not None:
+            return
+
+        sample = list(itertools.islice(self._lines, self._sample_size))
+        text = '\n'.join(sample[:100])
+
+        if self._dialect is None:
+            try:
+                self._dialect = csv.Sniffer().sniff(text, delimiters=',\t|;')
+            except csv.Error:
+                self._dialect = PrestoDialect
+            logger.debug('sniffed delimiter %r', self._dialect.delimiter)
+        if self._header is None:
+            try:
+                self._header = csv.Sniffer().has_header(text)
+            except csv.Error:
+                self._header = False
+
+        rows = csv.reader((line + '\n' for line in
+                           itertools.chain(sample, self._lines)),
+                          self._dialect)
+        header_row = next(rows, None) if self._header else None
+
+        sample_rows = list(itertools.islice(rows, len(sample)))
+        ncols = max([len(r) for r in sample_rows]
+                    + [len(header_row or self._columns or [])])
+
+        if self._columns is None:
+            self._columns = list(header_row) if header_row is not None \
+                else ['c{}'.format(i) for i in range(ncols)]
+        self._columns = unique_names(self._columns)
+        if self._types is None:
+            self._types = infer_types(sample_rows, len(self._columns),
+                                      self._null_values) \
+                if self._infer else ['str'] * len(self._columns)
+
+        self._rows = itertools.chain(sample_rows, rows)
+
+    @property
+    def columns(self):
+        """The column names."""
+
+        self._prepare()
+        return self._columns
+
+    @property
+    def types(self):
+        """The column type names."""
+
+        self._prepare()
+        return self._types
+
+    @property
+    def dialect(self):
+        """The csv dialect."""
+
+        self._prepare()
+        return self._dialect
+
+    def _converters(self):
+        converters = dict(CONVERTERS)
+        return [_lenient(converters[t]) if converters.get(t) else None
+                for t in self._types]
+
+    def tuples(self):
+        """
+        Values of a column which do not convert to its type (inferred from
+        the sample, so later rows may not conform) are kept as str.
+
+        Yields:
+            tuple: The typed rows (missing values are None).
+        """
+
+        self._prepare()
+        converters = self._converters()
+        ncols = len(self._columns)
+        null_values = self._null_values
+        for row in self._rows:
+            if not row:
+                continue
+            if len(row) < ncols:
+                row = row + [''] * (ncols - len(row))
+            yield tuple(None if value in null_values
+                        else convert(value) if convert else value
+                        for value, convert in zip(row, converters))
+
+    __iter__ = tuples
+
+    def dicts(self):
+        """
+        Yields:
+            dict: The typed rows keyed by column name.
+        """
+
+        columns = self.columns
+        for row in self.tuples():
+            yield dict(zip(columns, row))
+
+    def batches(self, size=DEFAULT_BATCH_SIZE, format='tuples'):
+        """
+        Read the rows in batches.
+
+        Args:
+            size (int, optional): Rows per batch (default: 10000).
+            format (str, optional): 'tuples' or 'dicts' (lists of rows),
+                'numpy' (dict of column name to numpy.ndarray), 'pandas'
+                (pandas.DataFrame) or 'arrow' (pyarrow.RecordBatch).
+
+        Yields:
+            The batches.
+        """
+
+        if format not in BATCH_FORMATS:
+            raise ValueError("invalid batch format '{}' (should be one of {})" \
+                .format(format, ', '.join(sorted(BATCH_FORMATS))))
+
+        make_batch = getattr(self, '_{}_batch'.format(format))
+        rows = self.tuples()
+        while True:
+            batch = list(itertools.islice(rows, int(size)))
+            if not batch:
+                return
+            yield make_batch(batch)
+
+    def _tuples_batch(self, rows):
+        return rows
+
+    def _dicts_batch(self, rows):
+        return [dict(zip(self._columns, row)) for row in rows]
+
+    def _column_lists(self, rows):
+        return dict(zip(self._columns, (list(c) for c in zip(*rows))))
+
+    def _numpy_batch(self, rows):
+        numpy = _optional_import('numpy')
+        dtypes = {'bool': bool, 'int': 'int64', 'float': 'float64'}
+        batch = dict()
+        for (name, values), type_name in zip(self._column_lists(rows).items(),
+                                             self._types):
+            dtype = dtypes.get(type_name) if None not in values else None
+            if dtype is None and type_name == 'float':
+                values = [numpy.nan if v is None else v for v in values]
+                dtype = 'float64'
+            try:
+                batch[name] = numpy.array(values, dtype=dtype or object)
+            except (TypeError, ValueError):
+                # values kept as str in a typed column
+                batch[name] = numpy.array(values, dtype=object)
+        return batch
+
+    def _pandas_batch(self, rows):
+        pandas = _optional_import('pandas')
+        return pandas.DataFrame.from_records(rows, columns=self._columns)
+
+    def _arrow_batch(self, rows):
+        pyarrow = _optional_import('pyarrow')
+        columns = self._column_lists(rows)
+        return pyarrow.RecordBatch.from_arrays(
+            [_arrow_array(pyarrow, columns[name]) for name in self._columns],
+            names=self._columns)
+
+
+def _arrow_array(pyarrow, values):
+    try:
+        return pyarrow.array(values)
+    except (TypeError, ValueError):
+        # values kept as str in a typed column
+        return pyarrow.array([None if v is None else str(v) for v in values])
+
+
+def _optional_import(name):
+    try:
+        return __import__(name)
+    except ImportError:
+        raise ImportError('{0} is required for this batch format '
+                          '(pip install {0})'.format(name))
@@ -13,12 +13,25 @@ import re
 import sys
 import time
 
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from functools import wraps
 
 from ..conf import GenieConf
 from ..utils import dttm_to_epoch
-
-from ..exceptions import JobTimeoutError, GenieHTTPError
+from .cache import get_output_cache, iter_lines, iter_text_lines, read_text
+from .download import (DEFAULT_CHUNK_SIZE,
+                       DEFAULT_PARALLELISM,
+                       download_output)
+from .journal import get_job_journal
+from .log_buffer import DEFAULT_SPILL_SIZE, LogBuffer
+from .output import DEFAULT_MAX_WORKERS, fetch_output, list_output
+from .poll_schedules import get_poll_schedule
+from .results import DEFAULT_SAMPLE_SIZE, ResultReader, detect_format
+from .stream import (DEFAULT_CHUNK_SIZE as DEFAULT_STREAM_CHUNK_SIZE,
+                     stream_output)
+from .tailer import LogTailer
+
+from ..exceptions import JobTimeoutError
 
 
 logger = logging.getLogger('com.netflix.genie.jobs.running')
@@ -89,6 +102,7 @@ class RunningJob(object):
         self._job_id = job_id
         self._status = self._info.get('status') or None
         self._sys_stream = None
+        self._tailers = dict()
 
         # get_adapter_version is set in main __init__.py to get around circular imports
         self._adapter = adapter \
@@ -348,6 +362,10 @@ class RunningJob(object):
             str or iterator.
         """
 
+        filename = self._cached_output_file(log_path)
+        if filename is not None:
+            return iter_lines(filename) if iterator else read_text(filename)
+
         return self._adapter.get_log(self._job_id,
                                      log_path,
                                      iterator=iterator,
@@ -607,39 +625,44 @@ class RunningJob(object):
         stderr_part = ''
 
         if self.__reload_stderr:
-            headers = {'Range': 'bytes={}-'.format(len(self._cached_stderr))} \
-                if self._cached_stderr else None
-
-            logger.debug('getting stderr (headers -> %s)', headers)
-
-            try:
-                stderr_part = self._adapter.get_stderr(
-                    self._job_id,
-                    headers=headers,
-                    **kwargs
-                )
-            except GenieHTTPError as e:
-                # HACK: assumes we are getting this because
-                # stderr hasn't changed so we are exceeding
-                # total size. Would be more corrct to parse
-                # and check the Content-Range header from
-                # the response and potentially retry with
-                # a different range
-                if e.response is not None and e.response.status_code == 416:
-                    stderr_part = ""
-                else:
-                    raise
-
-            if self._cached_stderr is None:
-                self._cached_stderr = stderr_part
-            else:
-                self._cached_stderr += stderr_part
+            tailer = self.tailer('stderr')
+            self._cached_stderr = tailer.buffer
+            stderr_part = tailer.poll(**kwargs)
 
         if self.is_done:
             self.__reload_stderr = False
 
         return stderr_part
 
+    def tailer(self, log='stderr'):
+        """
+        Get the tailer for one of the job's logs.
+
+        The tailer fetches the log incrementally with byte Range requests each
+        time it is polled (see :py:class:`LogTailer`).
+
+        Example:
+            >>> tailer = running_job.tailer('spark.log')
+            >>> while not running_job.is_done:
+            ...     print(tailer.poll(), end='')
+
+        Args:
+            log (str, optional): The log name (stderr, stdout, spark.log,
+                genie.log) or path relative to the job's output directory
+                (default: stderr).
+
+        Returns:
+            :py:class:`LogTailer`: The tailer (the same tailer is returned for
+                the same log).
+        """
+
+        if log not in self._tailers:
+            buffer = LogBuffer(spill_size=self._conf.genie.get('log_buffer_spill_size',
+                                                               DEFAULT_SPILL_SIZE))
+            self._tailers[log] = LogTailer(self._adapter, self._job_id, log,
+                                           buffer=buffer)
+        return self._tailers[log]
+
     def stderr(self, iterator=False, **kwargs):
         """
         Get the job's stderr as either an iterator or full text.
@@ -651,16 +674,21 @@ class RunningJob(object):
             >>>     print(l)
 
         Args:
-            iterator (bool, optional): Set to True if want to return as iterator.
+            iterator (bool, optional): Set to True if want to return as iterator
+                (lines are read from the stderr buffer as they are iterated).
 
         Returns:
             str or iterator.
         """
 
+        filename = self._cached_output_file('stderr')
+        if filename is not None:
+            return iter_text_lines(filename) if iterator else read_text(filename)
+
         self._update_stderr(**kwargs)
 
-        return self._cached_stderr.split('\n') if iterator \
-            else self._cached_stderr
+        return self._cached_stderr.iter_lines() if iterator \
+            else self._cached_stderr.getvalue()
 
     @property
     def stdout_url(self):
@@ -687,10 +715,261 @@ class RunningJob(object):
             str or iterator.
         """
 
+        filename = self._cached_output_file('stdout')
+        if filename is not None:
+            return iter_lines(filename) if iterator else read_text(filename)
+
         return self._adapter.get_stdout(self._job_id,
                                         iterator=iterator,
                                         **kwargs)
 
+    def _cached_output_file(self, path):
+        """
+        Get a file from a finished job's output directory through the output
+        cache (if enabled with the "genie.output_cache_dir" option). Callers
+        read it in the same types as the uncached output.
+
+        Returns:
+            str: The cache file name (or None if not cached).
+        """
+
+        cache = get_output_cache(self._conf)
+        if cache is None or not self.is_done:
+            return None
+
+        path = getattr(self._adapter, 'LOG_PATHS', dict()).get(path, path)
+        size = self._output_file_size(path)
+
+        filename = cache.get(self._job_id, path, size=size)
+        if filename is None:
+            response = self._adapter.get_log_response(self._job_id, path,
+                                                      stream=True)
+            try:
+                filename = cache.put(self._job_id,
+                                     path,
+                                     response.iter_content(DEFAULT_STREAM_CHUNK_SIZE),
+                                     size=size)
+            finally:
+                response.close()
+
+        return filename
+
+    def stream(self, path='stdout', chunk_size=None, lines=False,
+               encoding='utf-8', compression='auto', prefetch=0, **kwargs):
+        """
+        Stream a file from the job's output directory in constant memory.
+
+        Example:
+            >>> for line in running_job.stream(lines=True):
+            ...     process(line)
+            >>> for chunk in running_job.stream('output.csv.gz', chunk_size=1 << 20):
+            ...     dest.write(chunk)
+
+        Args:
+            path (str, optional): The path relative to the job's output
+                directory or a log name (default: stdout).
+            chunk_size (int, optional): Bytes read per chunk (default: the
+                "genie.stream_chunk_size" option or 64 KiB).
+            lines (bool, optional): If True, yield decoded lines (without line
+                endings) instead of bytes chunks (default: False).
+            encoding (str, optional): Encoding used to decode lines (default:
+                'utf-8').
+            compression (str, optional): 'gzip', 'zstd' (requires zstandard),
+                None or 'auto' to detect from the path and data (default).
+            prefetch (int, optional): Number of chunks to read ahead from a
+                background thread while the caller processes (default: 0).
+
+        Returns:
+            iterator: Bytes chunks or lines.
+        """
+
+        if chunk_size is None:
+            chunk_size = self._conf.genie.get('stream_chunk_size',
+                                              DEFAULT_STREAM_CHUNK_SIZE)
+
+        return stream_output(self._adapter,
+                             self._job_id,
+                             getattr(self._adapter, 'LOG_PATHS', dict()).get(path, path),
+                             chunk_size=chunk_size,
+                             lines=lines,
+                             encoding=encoding,
+                             compression=compression,
+                             prefetch=prefetch,
+                             **kwargs)
+
+    def results(self, path='stdout', dialect=None, header=None, columns=None,
+                types=None, sample_size=DEFAULT_SAMPLE_SIZE, **kwargs):
+        """
+        Read the job's tabular output (for example a Presto or Hive query
+        result) as typed records in bounded memory.
+
+        The dialect and header default to what the job's command and arguments
+        produce (Presto "--output-format", Hive "hive.cli.print.header" or the
+        "headers" tag set by headers()) and are sniffed otherwise. Column
+        types are inferred from the first sample_size lines.
+
+        Example:
+            >>> results = running_job.results()
+            >>> results.columns
+            ['dateint', 'country', 'hours']
+            >>> for row in results.dicts():
+            ...     process(row)
+            >>> for df in results.batches(100000, format='pandas'):
+            ...     process(df)
+
+        Args:
+            path (str, optional): The path relative to the job's output
+                directory or a log name (default: stdout).
+            dialect (csv.Dialect, optional): Override the dialect.
+            header (bool, optional): Override whether the first row is a
+                header.
+            columns (list, optional): Column names.
+            types (list, optional): Column type names ('bool', 'int', 'float'
+                or 'str').
+            sample_size (int, optional): Lines used to sniff the format and
+                infer types (default: 1000).
+            **kwargs: Keyword arguments passed to stream().
+
+        Returns:
+            :py:class:`ResultReader`: The result reader.
+        """
+
+        detected_dialect, detected_header = detect_format(self.command_name,
+                                                          self.command_args,
+                                                          self.tags)
+
+        return ResultReader(self.stream(path, lines=True, **kwargs),
+                            dialect=dialect or detected_dialect,
+                            header=detected_header if header is None else header,
+                            columns=columns,
+                            types=types,
+                            sample_size=sample_size)
+
+    def _output_file_size(self, path):
+        """Get the size of a file in the job's output directory (or None)."""
+
+        path = path.strip('/')
+        directory, _, name = path.rpartition('/')
+
+        if directory:
+            try:
+                listing = self._adapter.get(self._job_id,
+                                            path='output/{}/'.format(directory),
+                                            if_not_found=dict(),
+                                            headers={'Accept': 'application/json'})
+            except NotImplementedError:
+                return None
+        else:
+            listing = self.output_data or dict()
+
+        for entry in listing.get('files') or []:
+            if entry.get('name') == name:
+                return entry.get('size')
+        return None
+
+    def output_files(self, path='', recursive=True, pattern=None):
+        """
+        List the files in the job's output directory tree.
+
+        Example:
+            >>> [f['path'] for f in running_job.output_files(pattern='genie/logs/*')]
+            [u'genie/logs/cmd.log', u'genie/logs/env.log', u'genie/logs/genie.log']
+
+        Args:
+            path (str, optional): The directory relative to the job's output
+                directory (default: the output directory).
+            recursive (bool, optional): List subdirectories (default: True).
+            pattern (str or list, optional): Glob pattern(s) matched against
+                the file paths ("*" also matches "/").
+
+        Returns:
+            list: The file entries (dicts with "path", "name", "size" and
+                "lastModified") sorted by path.
+        """
+
+        return list_output(self._adapter,
+                           self._job_id,
+                           path=path,
+                           recursive=recursive,
+                           pattern=pattern,
+                           max_workers=self._conf.genie.get('output_max_workers',
+                                                            DEFAULT_MAX_WORKERS))
+
+    def fetch_output(self, dest_dir, pattern=None, path='', **kwargs):
+        """
+        Download the files in the job's output directory tree (matching
+        pattern) concurrently into a local directory.
+
+        Example:
+            >>> running_job.fetch_output('/tmp/debug', pattern=['genie/logs/*', 'std*'])
+            {u'genie/logs/genie.log': '/tmp/debug/genie/logs/genie.log', ...}
+
+        Args:
+            dest_dir (str): The local directory to write to.
+            pattern (str or list, optional): Glob pattern(s) matched against
+                the file paths (default: all files).
+            path (str, optional): The directory relative to the job's output
+                directory (default: the output directory).
+
+        Returns:
+            dict: The local file names keyed by path.
+        """
+
+        files = self.output_files(path=path, pattern=pattern)
+
+        return fetch_output(self._adapter,
+                            self._job_id,
+                            dest_dir,
+                            files,
+                            max_workers=self._conf.genie.get('output_max_workers',
+                                                             DEFAULT_MAX_WORKERS),
+                            chunk_size=self._conf.genie.get('download_chunk_size',
+                                                            DEFAULT_CHUNK_SIZE),
+                            **kwargs)
+
+    def download_output(self, path, dest, parallelism=None, chunk_size=None,
+                        **kwargs):
+        """
+        Download a file from the job's output directory (for example, a large
+        stdout) with concurrent Range requests.
+
+        Example:
+            >>> running_job.download_output('stdout', '/tmp/results.csv',
+            ...                             parallelism=8)
+            123456789
+
+        Args:
+            path (str): The path relative to the job's output directory (or a
+                log name like stdout).
+            dest (str): The local file path to write to. An interrupted
+                download is resumed from "<dest>.part".
+            parallelism (int, optional): Maximum concurrent requests (default:
+                the "genie.download_parallelism" option or 4).
+            chunk_size (int, optional): Bytes per request (default: the
+                "genie.download_chunk_size" option or 8 MiB).
+
+        Returns:
+            int: The number of bytes downloaded.
+        """
+
+        if parallelism is None:
+            parallelism = self._conf.genie.get('download_parallelism',
+                                               DEFAULT_PARALLELISM)
+        if chunk_size is None:
+            chunk_size = self._conf.genie.get('download_chunk_size',
+                                              DEFAULT_CHUNK_SIZE)
+
+        path = getattr(self._adapter, 'LOG_PATHS', dict()).get(path, path)
+
+        return download_output(self._adapter,
+                               self._job_id,
+                               path,
+                               dest,
+                               size=self._output_file_size(path),
+                               parallelism=parallelism,
+                               chunk_size=chunk_size,
+                               **kwargs)
+
     @property
     @get_from_info('status_msg', info_section='job', update_if_running=True)
     def status_msg(self):
@@ -761,7 +1040,8 @@ class RunningJob(object):
         """
 
     def wait(self, sleep_seconds=10, suppress_stream=False, until_running=False,
-             job_timeout=None, kill_after_job_timeout=False):
+             job_timeout=None, kill_after_job_timeout=False, poller=None,
+             poll_schedule=None):
         """
         Blocking call that will wait for the job to complete.
 
@@ -770,7 +1050,8 @@ class RunningJob(object):
 
         Args:
             sleep_seconds (int, optional): The number of seconds to sleep while
-                polling to get job status (default: 10).
+                polling to get job status (default: 10). Not used if a
+                poll_schedule is used.
             suppress_stream (bool, optional): If True, do not write anything to
                 the sys stream (stderr/stdout) while waiting for the job to
                 complete (default: False).
@@ -780,22 +1061,87 @@ class RunningJob(object):
                 job to finish (default: None).
             kill_after_job_timeout (bool, optional): Whether to kill the job or
                 not after the job_timeout (default: False).
+            poller (:py:class:`StatusPoller`, optional): Wait on the status
+                polled by a (shared) poller instead of polling for this job
+                only. If the "genie.shared_poller" option is true, the
+                process-wide poller is used by default.
+            poll_schedule (:py:class:`PollSchedule` or str, optional): The
+                schedule for how long to sleep between polls (a schedule or one
+                of 'fixed', 'exponential', 'decorrelated', 'status'). Defaults to
+                the "genie.poll_schedule" option or polling every sleep_seconds.
+                Sleeps are shortened to not run past job_timeout.
+
+        If the job journal is enabled (the "genie.journal_path" option), the
+        statuses seen are recorded in it and waiting on a job the journal
+        knows has finished returns right away.
 
         Returns:
             :py:class:`RunningJob`: self
         """
 
+        journal = get_job_journal(self._conf)
+        entry = journal.get(self._job_id) if journal is not None else None
+        if entry is not None and entry['status'] not in RUNNING_STATUSES:
+            # finished before (possibly in a previous process)
+            logger.debug("job id '%s' finished with status '%s' (journal)",
+                         self._job_id, entry['status'])
+            if entry['status'] != self._status:
+                # info loaded while the job was running is stale
+                stale = bool(self._info)
+                self._status = entry['status']
+                self._info['status'] = entry['status']
+                if stale:
+                    self.update(info_section='job')
+            return self
+
+        if poller is None and self._conf.genie.get('shared_poller') \
+                in {'True', 'TRUE', 'true', True, '1', 1}:
+            from .poller import get_shared_poller
+            poller = get_shared_poller(self._conf)
+
+        if poller is not None:
+            return self._wait_for_poller(poller,
+                                         sleep_seconds=sleep_seconds,
+                                         suppress_stream=suppress_stream,
+                                         until_running=until_running,
+                                         job_timeout=job_timeout,
+                                         kill_after_job_timeout=kill_after_job_timeout)
+
+        schedule = get_poll_schedule(poll_schedule,
+                                     conf=self._conf,
+                                     sleep_seconds=sleep_seconds)
+
         i = 0
+        attempt = 0
+        interval = None
+        last_status = None
 
         statuses = {s for s in RUNNING_STATUSES \
             if not until_running or s.upper() != 'RUNNING'}
 
         start_time = time.time()
 
-        while self._adapter.get_status(self._job_id).upper() in statuses:
+        while True:
+            status = self._adapter.get_status(self._job_id).upper()
+            if status != last_status:
+                self._journal_status(status)
+            if status not in statuses:
+                break
+
+            attempt = attempt + 1 if status == last_status else 0
+            last_status = status
+
             if i % 3 == 0 and not suppress_stream:
                 self._write_to_stream('.')
-            time.sleep(sleep_seconds)
+
+            elapsed = time.time() - start_time
+            interval = schedule(attempt,
+                                status=status,
+                                elapsed=elapsed,
+                                previous=interval,
+                                remaining=job_timeout - elapsed \
+                                    if job_timeout is not None else None)
+            time.sleep(interval)
 
             # handle client-side job timeout
             if (job_timeout is not None) and (time.time() - start_time > job_timeout):
@@ -813,6 +1159,54 @@ class RunningJob(object):
 
         return self
 
+    def _journal_status(self, status):
+        """Record the job's status in the job journal (if enabled)."""
+
+        journal = get_job_journal(self._conf)
+        if journal is not None:
+            journal.update_status(self._job_id, status)
+
+    def _wait_for_poller(self, poller, sleep_seconds, suppress_stream,
+                         until_running, job_timeout, kill_after_job_timeout):
+        """Block until the poller resolves the job's status."""
+
+        future = poller.register(self, until_running=until_running)
+        start_time = time.time()
+
+        i = 0
+        while True:
+            try:
+                status = future.result(timeout=sleep_seconds)
+                break
+            except FutureTimeoutError:
+                pass
+
+            if i % 3 == 0 and not suppress_stream:
+                self._write_to_stream('.')
+
+            # handle client-side job timeout
+            if (job_timeout is not None) and (time.time() - start_time > job_timeout):
+                poller.unregister(future)
+                if kill_after_job_timeout:
+                    self.kill()
+                    return self
+                else:
+                    raise JobTimeoutError("Timed out while waiting for job {} to finish" \
+                        .format(self.job_id))
+
+            i += 1
+
+        self._journal_status(status)
+        if status not in RUNNING_STATUSES and status != self._status:
+            self._status = status
+            self._info['status'] = status
+            self.update(info_section='job')
+
+        if not suppress_stream:
+            self._write_to_stream('\n')
+
+        return self
+
     def _write_to_stream(self, msg):
         """Writes message to the configured sys stream."""
 
@@ -0,0 +1,245 @@
+"""
+genie.jobs.running_async
+
+This module implements the asyncio RunningJob model.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import codecs
+import logging
+import time
+
+from ..conf import GenieConf
+from .running import INFO_SECTIONS, RUNNING_STATUSES
+from .tailer import parse_content_range
+
+from ..exceptions import JobTimeoutError
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.running_async')
+
+
+class AsyncRunningJob(object):
+    """
+    RunningJob for use with asyncio.
+
+    Methods which talk to Genie are coroutines. Job information is loaded with
+    ``await running_job.update()`` and read from :py:attr:`info`.
+
+    Example:
+        >>> running_job = AsyncRunningJob('1234-abcd')
+        >>> await running_job.wait()
+        >>> print(await running_job.status)
+        SUCCEEDED
+    """
+
+    def __init__(self, job_id, adapter=None, conf=None, info=None):
+        self._cached_stderr = None
+        self._stderr_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._stderr_offset = 0
+        self._conf = conf or GenieConf()
+        self._info = info or dict()
+        self._job_id = job_id
+        self._status = (self._info.get('status') or '').upper() or None
+
+        if adapter is None:
+            from ..adapter.genie_3_async import AsyncGenie3Adapter
+            adapter = AsyncGenie3Adapter(conf=self._conf)
+        self._adapter = adapter
+
+    def __repr__(self):
+        return '{cls}("{job_id}", adapter={adapter})'.format(
+            cls=self.__class__.__name__,
+            job_id=self._job_id,
+            adapter=self._adapter
+        )
+
+    @property
+    def info(self):
+        return self._info
+
+    @property
+    def job_id(self):
+        """The job's id."""
+
+        return self._job_id
+
+    @property
+    def is_done(self):
+        """
+        Is the job done running (as of the last status check)?
+
+        Returns:
+            boolean: True if the job is done, False if still running or the
+                status has not been checked.
+        """
+
+        return self._status is not None and self._status not in RUNNING_STATUSES
+
+    @property
+    def is_successful(self):
+        """
+        Did the job complete successfully (as of the last status check)?
+
+        Returns:
+            boolean: True if job completed successfully, False otherwise.
+        """
+
+        return self._status == 'SUCCEEDED'
+
+    @property
+    def status(self):
+        """
+        Get the job's status (awaitable).
+
+        Example:
+            >>> await running_job.status
+            u'RUNNING'
+
+        Returns:
+            str: Job status.
+        """
+
+        return self._get_status()
+
+    async def _get_status(self):
+        if (self._status is None) or (self._status in RUNNING_STATUSES):
+            last_known_status = self._status
+            self._status = (await self._adapter.get_status(self._job_id)).upper()
+            if last_known_status != self._status:
+                await self.update(info_section='job')
+            self._info['status'] = self._status
+
+        return self._status
+
+    async def update(self, info_section=None, **kwargs):
+        """Update the job information."""
+
+        assert (info_section is None) or (info_section in INFO_SECTIONS), \
+            "invalid info_section '{}' (should be None or one of {})" \
+                .format(info_section, INFO_SECTIONS)
+
+        if info_section:
+            kwargs.update({info_section: True})
+
+        data = await self._adapter.get_info_for_rj(self._job_id, **kwargs)
+
+        self._info.update(data)
+
+        return self
+
+    async def kill(self, **kwargs):
+        """
+        Kill the job.
+
+        Returns:
+            :py:class:`AsyncResponse`.
+        """
+
+        if self.info.get('kill_uri'):
+            return await self._adapter.kill_job(kill_uri=self.info['kill_uri'],
+                                                **kwargs)
+        return await self._adapter.kill_job(job_id=self._job_id, **kwargs)
+
+    async def stderr(self, iterator=False, **kwargs):
+        """
+        Get the job's stderr as either a list of lines or full text.
+
+        Only the part of stderr which has not been read yet is requested.
+
+        Args:
+            iterator (bool, optional): Set to True to return a list of lines.
+
+        Returns:
+            str or list.
+        """
+
+        # the offset is in bytes (like LogTailer), the decoder keeps
+        # multi-byte characters split across reads
+        offset = self._stderr_offset
+        headers = {'Range': 'bytes={}-'.format(offset)} if offset else None
+
+        response = await self._adapter.get_log_response(self._job_id,
+                                                         'stderr',
+                                                         headers=headers,
+                                                         **kwargs)
+
+        data = b''
+        if response.status_code == 206:
+            start, _, _ = parse_content_range(response.headers.get('Content-Range'))
+            start = offset if start is None else start
+            data = (response.content or b'')[max(offset - start, 0):]
+        elif response.status_code != 416:
+            # the server ignored the range (416: stderr has not grown)
+            data = (response.content or b'')[offset:]
+
+        self._stderr_offset += len(data)
+        stderr_part = self._stderr_decoder.decode(data)
+
+        self._cached_stderr = (self._cached_stderr or '') + stderr_part
+
+        return self._cached_stderr.split('\n') if iterator \
+            else self._cached_stderr
+
+    async def stdout(self, iterator=False, **kwargs):
+        """
+        Get the job's stdout as either a list of lines or full text.
+
+        Args:
+            iterator (bool, optional): Set to True to return a list of lines.
+
+        Returns:
+            str or list.
+        """
+
+        return await self._adapter.get_stdout(self._job_id,
+                                              iterator=iterator,
+                                              **kwargs)
+
+    async def wait(self, sleep_seconds=10, until_running=False, job_timeout=None,
+                   kill_after_job_timeout=False):
+        """
+        Wait for the job to complete without blocking the event loop.
+
+        Args:
+            sleep_seconds (int, optional): The number of seconds to sleep while
+                polling to get job status (default: 10).
+            until_running (bool, optional): If True, only wait until the job
+                status becomes 'RUNNING' (default: False).
+            job_timeout (int, optional): The number of seconds to wait for the
+                job to finish (default: None).
+            kill_after_job_timeout (bool, optional): Whether to kill the job or
+                not after the job_timeout (default: False).
+
+        Returns:
+            :py:class:`AsyncRunningJob`: self
+        """
+
+        statuses = {s for s in RUNNING_STATUSES \
+            if not until_running or s.upper() != 'RUNNING'}
+
+        start_time = time.time()
+
+        while True:
+            status = (await self._adapter.get_status(self._job_id)).upper()
+            if status not in statuses:
+                break
+
+            await asyncio.sleep(sleep_seconds)
+
+            # handle client-side job timeout
+            if (job_timeout is not None) and (time.time() - start_time > job_timeout):
+                if kill_after_job_timeout:
+                    await self.kill()
+                    return self
+                raise JobTimeoutError("Timed out while waiting for job {} to finish" \
+                    .format(self._job_id))
+
+        self._status = status
+        self._info['status'] = status
+
+        return self
@@ -0,0 +1,225 @@
+"""
+genie.jobs.stream
+
+This module implements streaming files from a job's output directory in
+constant memory.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import codecs
+import logging
+import threading
+import zlib
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.stream')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+COMPRESSIONS = {'auto', 'gzip', 'zstd', None}
+
+
+class _GzipDecompressor(object):
+    """Decompress (possibly multi-member) gzip data incrementally."""
+
+    def __init__(self):
+        self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data):
+        out = list()
+        while data:
+            out.append(self._obj.decompress(data))
+            data = self._obj.unused_data
+            if data:
+                # next gzip member
+                self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return b''.join(out)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class _ZstdDecompressor(object):
+    """Decompress zstd data incrementally (requires zstandard)."""
+
+    def __init__(self):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('zstandard is required to read zstd compressed '
+                              'output (pip install nflx-genie-client[zstd])')
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return b''
+
+
+def _detect_compression(path, head):
+    if head.startswith(GZIP_MAGIC) or path.endswith('.gz'):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC) or path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def decompress_chunks(chunks, compression='auto', path=''):
+    """
+    Decompress an iterator of bytes chunks.
+
+    Args:
+        chunks (iterator): The bytes chunks.
+        compression (str, optional): 'gzip', 'zstd', None (no decompression)
+            or 'auto' to detect from the path suffix and the magic bytes of
+            the data (default: 'auto').
+        path (str, optional): The path of the data (for detection).
+
+    Yields:
+        bytes: Decompressed chunks.
+    """
+
+    if compression not in COMPRESSIONS:
+        raise ValueError("invalid compression '{}' (should be one of gzip, "
+                         "zstd, auto or None)".format(compression))
+
+    decompressor = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if compression == 'auto':
+            compression = _detect_compression(path, chunk)
+            logger.debug("detected compression '%s' for '%s'", compression, path)
+        if compression is not None and decompressor is None:
+            decompressor = _GzipDecompressor() if compression == 'gzip' \
+                else _ZstdDecompressor()
+        data = decompressor.decompress(chunk) if decompressor else chunk
+        if data:
+            yield data
+
+    if decompressor is not None:
+        data = decompressor.flush()
+        if data:
+            yield data
+
+
+def iter_decoded_lines(chunks, encoding='utf-8', errors='replace'):
+    """
+    Split an iterator of bytes chunks into decoded lines (without the line
+    endings). Multibyte characters split across chunks are decoded
+    incrementally.
+
+    Yields:
+        str: The lines.
+    """
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    pending = ''
+    for chunk in chunks:
+        text = pending + decoder.decode(chunk)
+        lines = text.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line[:-1] if line.endswith('\r') else line
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending[:-1] if pending.endswith('\r') else pending
+
+
+_DONE = object()
+
+
+def prefetch_chunks(chunks, size):
+    """
+    Read ahead up to size chunks from a background thread. The bounded queue
+    blocks the reader when the consumer is slower (backpressure), so at most
+    size chunks are held in memory.
+
+    Yields:
+        The chunks (errors from the reader are raised to the consumer).
+    """
+
+    queue = Queue(maxsize=size)
+    stop = threading.Event()
+
+    def reader():
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    return
+                queue.put(chunk)
+        except Exception as err:
+            queue.put(err)
+        queue.put(_DONE)
+
+    thread = threading.Thread(target=reader, name='genie-stream-prefetch')
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            item = queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # unblock the reader if waiting on a full queue
+        while not queue.empty():
+            queue.get_nowait()
+
+
+def stream_output(adapter, job_id, path, chunk_size=DEFAULT_CHUNK_SIZE,
+                  lines=False, encoding='utf-8', compression='auto',
+                  prefetch=0, **kwargs):
+    """
+    Stream a file from a job's output directory.
+
+    Only chunk_size bytes (times prefetch, if set) are read ahead of the
+    consumer, so arbitrarily large files are processed in constant memory.
+
+    Args:
+        adapter: The adapter to stream with (get_log_response()).
+        job_id (str): The job id.
+        path (str): The path relative to the job's output directory.
+        chunk_size (int, optional): Bytes read per chunk (default: 64 KiB).
+        lines (bool, optional): If True, yield decoded lines instead of bytes
+            chunks (default: False).
+        encoding (str, optional): Encoding used to decode lines (default:
+            'utf-8').
+        compression (str, optional): 'gzip', 'zstd', None or 'auto' (default).
+        prefetch (int, optional): Number of chunks to read ahead from a
+            background thread (default: 0, no read ahead).
+        **kwargs: Keyword arguments passed to get_log_response().
+
+    Yields:
+        bytes or str: Bytes chunks (or lines if lines is True).
+    """
+
+    response = adapter.get_log_response(job_id, path, stream=True, **kwargs)
+
+    try:
+        chunks = response.iter_content(int(chunk_size))
+        if prefetch:
+            chunks = prefetch_chunks(chunks, int(prefetch))
+        chunks = decompress_chunks(chunks, compression=compression, path=path)
+        if lines:
+            chunks = iter_decoded_lines(chunks, encoding=encoding)
+        for item in chunks:
+            yield item
+    finally:
+        response.close()
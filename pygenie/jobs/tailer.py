@@ -0,0 +1,180 @@
+"""
+genie.jobs.tailer
+
+This module implements incrementally tailing a job's logs with HTTP Range
+requests.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import codecs
+import logging
+import re
+
+from .log_buffer import DEFAULT_SPILL_SIZE, LogBuffer
+
+
+logger = logging.getLogger('com.netflix.genie.jobs.tailer')
+
+CONTENT_RANGE_RE = re.compile(r'^\s*bytes\s+(?:(\d+)-(\d+)|\*)/(\d+|\*)\s*$', re.I)
+
+
+def parse_content_range(value):
+    """
+    Parse a Content-Range header value.
+
+    Example:
+        >>> parse_content_range('bytes 100-199/1000')
+        (100, 199, 1000)
+        >>> parse_content_range('bytes */1000')
+        (None, None, 1000)
+
+    Returns:
+        tuple: (start, end, total) with None for unknown values (all None if
+            the value cannot be parsed).
+    """
+
+    match = CONTENT_RANGE_RE.match(value or '')
+    if match is None:
+        return None, None, None
+    start, end, total = match.groups()
+    return (int(start) if start is not None else None,
+            int(end) if end is not None else None,
+            int(total) if total not in {None, '*'} else None)
+
+
+class LogTailer(object):
+    """
+    Incrementally fetch a job's log.
+
+    Each :py:meth:`poll` requests the bytes after the ones already fetched
+    with a Range header and appends them to a :py:class:`LogBuffer`. The
+    Content-Range (and Content-Length) headers of the response are used to
+    keep the offset byte-accurate:
+
+        - 206: the returned range is appended (any overlap with bytes already
+          fetched is dropped).
+        - 200: the server ignored the Range header and returned the whole
+          log, only the bytes past the offset are appended.
+        - 416: nothing new if the log size equals the offset.
+
+    If the log is smaller than the offset (it was truncated or rotated), the
+    buffer is reset and the log is fetched again from the start.
+
+    Example:
+        >>> tailer = LogTailer(adapter, job_id, 'stderr')
+        >>> while not running_job.is_done:
+        ...     print(tailer.poll(), end='')
+
+    Args:
+        adapter: The adapter to get the log with (get_log_response()).
+        job_id (str): The job id.
+        log (str): The log name (stderr, stdout, spark.log, genie.log, see
+            the adapter's LOG_PATHS) or path relative to the job's output
+            directory.
+        buffer (:py:class:`LogBuffer`, optional): The buffer to append to.
+        spill_size (int, optional): Spill size for a new buffer.
+    """
+
+    def __init__(self, adapter, job_id, log, buffer=None,
+                 spill_size=DEFAULT_SPILL_SIZE):
+        self._adapter = adapter
+        self.job_id = job_id
+        self.log = log
+        self.path = getattr(adapter, 'LOG_PATHS', dict()).get(log, log)
+        self.buffer = buffer if buffer is not None else LogBuffer(spill_size=spill_size)
+        self.total = None
+        self.truncations = 0
+        self._decoder = self._new_decoder()
+
+    def __repr__(self):
+        return '{}(job_id={}, log={}, offset={})'.format(self.__class__.__name__,
+                                                         self.job_id,
+                                                         self.log,
+                                                         self.offset)
+
+    def _new_decoder(self):
+        return codecs.getincrementaldecoder(self.buffer.encoding)(errors='replace')
+
+    @property
+    def offset(self):
+        """Number of bytes fetched."""
+
+        return len(self.buffer)
+
+    def _truncated(self, total):
+        logger.warning("log '%s' for job '%s' truncated (%s bytes, had %s), "
+                       "fetching again from the start",
+                       self.log, self.job_id, total, self.offset)
+        self.truncations += 1
+        self.buffer.close()
+        self._decoder = self._new_decoder()
+
+    def _fetch(self, **kwargs):
+        offset = self.offset
+        headers = {'Range': 'bytes={}-'.format(offset)} if offset else None
+
+        logger.debug('getting %s (headers -> %s)', self.log, headers)
+
+        response = self._adapter.get_log_response(self.job_id,
+                                                  self.path,
+                                                  headers=headers,
+                                                  **kwargs)
+
+        content_range = response.headers.get('Content-Range')
+        start, _, total = parse_content_range(content_range)
+
+        if response.status_code == 416:
+            if total is not None and total < offset:
+                self._truncated(total)
+                return None
+            self.total = total if total is not None else self.total
+            return b''
+
+        data = response.content or b''
+
+        if response.status_code == 206:
+            # assume the requested range if the server did not say
+            start = offset if start is None else start
+            if start > offset:
+                # cannot have skipped bytes, the log was replaced
+                self._truncated(total)
+                return None
+            data = data[offset - start:]
+        else:
+            length = response.headers.get('Content-Length')
+            total = int(length) if length and length.isdigit() else len(data)
+            if total < offset:
+                self._truncated(total)
+                return None
+            data = data[offset:]
+
+        self.total = total
+        self.buffer.append(data)
+        return data
+
+    def poll(self, **kwargs):
+        """
+        Fetch new bytes of the log.
+
+        Args:
+            **kwargs: Keyword arguments passed to the adapter's
+                get_log_response().
+
+        Returns:
+            str: The new text (an incomplete multibyte character at the end is
+                returned with the next poll).
+        """
+
+        data = self._fetch(**kwargs)
+        if data is None:
+            # truncated, fetch from the start
+            data = self._fetch(**kwargs) or b''
+        return self._decoder.decode(data)
+
+    def text(self):
+        """Return all fetched text."""
+
+        return self.buffer.getvalue()
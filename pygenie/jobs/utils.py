@@ -17,13 +17,17 @@ import sys
 from decorator import decorator
 from functools import wraps
 
-from .running import RunningJob
+from . import running
+from .journal import get_job_journal
+from .running import RUNNING_STATUSES, RunningJob
+
+from ..conf import GenieConf
 
 from ..utils import (convert_to_unicode,
                      is_str,
                      str_to_list)
 
-from ..exceptions import GenieJobNotFoundError
+from ..exceptions import GenieHTTPError, GenieJobNotFoundError
 
 
 logger = logging.getLogger('com.netflix.genie.jobs.utils')
@@ -47,6 +51,11 @@ REPR_OVERWRITE_MODES = {
 
 REPR_MODES = REPR_APPEND_MODES.union(REPR_OVERWRITE_MODES)
 
+# more jobs matching the attempts' id prefix than this are not searched
+# through (e.g. "etl-20170101" shares "etl-" with every dated etl job), the
+# attempt ids are probed instead
+MAX_SEARCH_ATTEMPTS = 100
+
 
 def _remove_wrapper_from_args(func):
     """
@@ -194,6 +203,12 @@ def generate_job_id(job_id, return_success=True, override_existing=False, conf=N
     generate an id until the generated id is completely new and kill the
     discovered running job(s)
 
+    The existing attempts ("<job_id>", "<job_id>-1", ...) are looked up in the
+    job journal if it is enabled (the "genie.journal_path" option), else found
+    with one jobs search if the adapter supports it and at most
+    MAX_SEARCH_ATTEMPTS jobs share the attempts' id prefix, otherwise each id
+    is probed in turn.
+
     Args:
         job_id (str): The initial job id to start the generation process.
         return_success (bool, optional): If True, allows returning an id for a successful job.
@@ -212,6 +227,148 @@ def generate_job_id(job_id, return_success=True, override_existing=False, conf=N
     if return_success and override_existing:
         raise ValueError("return_success and override_existing cannot both be True")
 
+    statuses = _journal_attempts(job_id, return_success, override_existing, conf)
+    if statuses is None:
+        statuses = _search_attempts(job_id, conf)
+    if statuses is None:
+        return _probe_job_id(job_id, return_success, override_existing, conf)
+
+    while True:
+        status = statuses.get(job_id)
+        if status is None:
+            logger.debug("returning new job id '%s'", job_id)
+            return job_id
+        logger.debug("job id '%s' exists with status '%s'", job_id, status)
+        is_done = status not in RUNNING_STATUSES
+        if not return_success and override_existing:
+            if not is_done:
+                logger.warning("killing job id %s", job_id)
+                response = reattach_job(job_id, conf=conf).kill()
+                response.raise_for_status()
+        elif not is_done or (status == 'SUCCEEDED' and return_success):
+            logger.debug("returning job id '%s' with status '%s'", job_id, status)
+            return job_id
+        job_id = _next_job_id(job_id)
+        logger.debug("trying new job id '%s'", job_id)
+
+
+def _next_job_id(job_id):
+    """Get the next attempt's job id ("job" -> "job-1" -> "job-2"...)."""
+
+    id_parts = job_id.split('-')
+    if id_parts[-1].isdigit():
+        id_parts[-1] = str(int(id_parts[-1]) + 1)
+    else:
+        id_parts.append('1')
+    return '-'.join(id_parts)
+
+
+def _attempts_prefix(job_id):
+    """Get the id prefix shared by the attempts of a job id."""
+
+    id_parts = job_id.split('-')
+    return '-'.join(id_parts[:-1]) + '-' if id_parts[-1].isdigit() \
+        and len(id_parts) > 1 else job_id
+
+
+def _resolve_job_id(job_id, statuses, return_success, override_existing):
+    """
+    Resolve a job id from the statuses of its attempts (without killing any
+    job).
+    """
+
+    while True:
+        status = statuses.get(job_id)
+        if status is None:
+            return job_id
+        if return_success or not override_existing:
+            if status in RUNNING_STATUSES \
+                    or (status == 'SUCCEEDED' and return_success):
+                return job_id
+        job_id = _next_job_id(job_id)
+
+
+def _journal_attempts(job_id, return_success, override_existing, conf=None):
+    """
+    Get the statuses of the existing attempts of a job id from the job journal
+    (or None if the journal is not enabled or may be missing attempts).
+
+    Statuses of attempts which had not finished are refreshed from Genie and
+    the resolved job id is checked with Genie if it is not in the journal
+    (submitted by another process).
+    """
+
+    conf = conf or GenieConf()
+    journal = get_job_journal(conf)
+    if journal is None:
+        return None
+
+    prefix = _attempts_prefix(job_id)
+    statuses = journal.attempts(prefix.rstrip('-'))
+    if not statuses:
+        return None
+
+    adapter = running.get_adapter_for_version(conf.genie.version)(conf=conf)
+    unfinished = [i for i, status in statuses.items()
+                  if status in RUNNING_STATUSES]
+    if unfinished:
+        refreshed = adapter.get_statuses(unfinished)
+        for i in unfinished:
+            if i in refreshed:
+                statuses[i] = refreshed[i]
+                journal.update_status(i, refreshed[i])
+            else:
+                # not found in Genie
+                del statuses[i]
+
+    resolved = _resolve_job_id(job_id, statuses, return_success,
+                               override_existing)
+    if resolved not in statuses:
+        try:
+            status = adapter.get_status(resolved)
+        except GenieJobNotFoundError:
+            return statuses
+        logger.debug("job id '%s' exists with status '%s' but is not in the "
+                     "journal, searching attempts", resolved, status)
+        return None
+
+    return statuses
+
+
+def _search_attempts(job_id, conf=None):
+    """
+    Get the statuses of the existing attempts of a job id with a jobs search
+    (or None if the adapter or server cannot search by id prefix, or too many
+    jobs share the prefix).
+    """
+
+    prefix = _attempts_prefix(job_id)
+
+    conf = conf or GenieConf()
+    try:
+        adapter = running.get_adapter_for_version(conf.genie.version)(conf=conf)
+        statuses = adapter.search_statuses('{}%'.format(prefix),
+                                           max_results=MAX_SEARCH_ATTEMPTS)
+    except (NotImplementedError, GenieHTTPError) as err:
+        logger.debug("cannot search attempts of job id '%s' (%s)", job_id, err)
+        return None
+
+    if statuses is None:
+        logger.debug("more than %s jobs match '%s%%', probing job ids",
+                     MAX_SEARCH_ATTEMPTS, prefix)
+        return None
+
+    if any(not i.startswith(prefix) for i in statuses):
+        # the server ignored the id filter
+        logger.debug("jobs search not filtered by id, probing job ids")
+        return None
+
+    return statuses
+
+
+def _probe_job_id(job_id, return_success, override_existing, conf):
+    """Generate a job id by reattaching to each attempt in turn."""
+
     while True:
         try:
             running_job = reattach_job(job_id, conf=conf)
@@ -231,12 +388,7 @@ def generate_job_id(job_id, return_success=True, override_existing=False, conf=N
                             running_job.job_id,
                             running_job.status)
                 return running_job.job_id
-            id_parts = running_job.job_id.split('-')
-            if id_parts[-1].isdigit():
-                id_parts[-1] = str(int(id_parts[-1]) + 1)
-            else:
-                id_parts.append('1')
-            job_id = '-'.join(id_parts)
+            job_id = _next_job_id(running_job.job_id)
             logger.debug("trying new job id '%s'", job_id)
         except GenieJobNotFoundError:
             logger.debug("returning new job id '%s'", job_id)
@@ -0,0 +1,203 @@
+"""
+genie.metadata_cache
+
+This module implements a read-through cache for the cluster, command and
+application configurations read by the :py:class:`pygenie.client.Genie`
+client.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from collections import OrderedDict
+
+
+logger = logging.getLogger('com.netflix.genie.metadata_cache')
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class MemoryCacheBackend(object):
+    """Thread-safe in-memory least recently used cache backend."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = int(max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCacheBackend(object):
+    """
+    Cache backend storing entries as JSON files in a directory (which can be
+    shared by processes).
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # created concurrently
+                if not os.path.isdir(self.directory):
+                    raise
+
+    def _path(self, key):
+        return os.path.join(self.directory,
+                            hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as entry_file:
+                entry = json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            return None
+        return entry if entry.get('key') == key else None
+
+    def set(self, key, entry):
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(dict(entry, key=key), tmp_file)
+            os.rename(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def clear(self):
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    # removed concurrently
+                    pass
+
+
+class MetadataCache(object):
+    """
+    Read-through cache of Genie responses with a time to live.
+
+    Entries are fresh for ttl seconds. A stale entry with an ETag is
+    revalidated with If-None-Match (a 304 response makes it fresh again
+    without transferring it) otherwise it is requested again.
+
+    Args:
+        backend: The cache backend (:py:class:`MemoryCacheBackend` or
+            :py:class:`DiskCacheBackend`).
+        ttl (float, optional): Seconds entries are used without asking the
+            server (default: 60).
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_TTL):
+        self.backend = backend
+        self.ttl = float(ttl)
+
+    @staticmethod
+    def key(url, params=None):
+        """Get the cache key for a request."""
+
+        return url if not params else \
+            '{}?{}'.format(url, json.dumps(params, sort_keys=True))
+
+    def get(self, key):
+        """
+        Get a cached entry.
+
+        Returns:
+            tuple: (value, fresh, etag), (None, False, None) if not cached.
+        """
+
+        entry = self.backend.get(key)
+        if entry is None:
+            return None, False, None
+        return copy.deepcopy(entry['value']), \
+            entry['expires'] > time.time(), \
+            entry.get('etag')
+
+    def put(self, key, value, etag=None):
+        """Cache a value."""
+
+        self.backend.set(key, {'value': copy.deepcopy(value),
+                               'etag': etag,
+                               'expires': time.time() + self.ttl})
+
+    def clear(self):
+        """Remove all entries."""
+
+        self.backend.clear()
+
+
+_caches = dict()
+_caches_lock = threading.Lock()
+
+
+def get_metadata_cache(conf=None):
+    """
+    Get the shared :py:class:`MetadataCache` for the settings in conf, or None
+    if caching is not enabled.
+
+    The following options in the "genie" section are used:
+        metadata_cache: set to true to enable caching (default: false).
+        metadata_cache_ttl: seconds entries are used without asking the server
+            (default: 60).
+        metadata_cache_max_entries: maximum entries of the in-memory cache
+            (default: 1024).
+        metadata_cache_dir: cache entries in this directory instead of in
+            memory (shared by the processes using it).
+
+    Args:
+        conf (GenieConf, optional): The configuration to read settings from.
+
+    Returns:
+        :py:class:`MetadataCache`: The shared cache (or None).
+    """
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    if get('metadata_cache') not in {'True', 'TRUE', 'true', True, '1', 1}:
+        return None
+
+    settings = (
+        float(get('metadata_cache_ttl', DEFAULT_TTL)),
+        int(get('metadata_cache_max_entries', DEFAULT_MAX_ENTRIES)),
+        get('metadata_cache_dir')
+    )
+
+    with _caches_lock:
+        if settings not in _caches:
+            ttl, max_entries, directory = settings
+            backend = DiskCacheBackend(directory) if directory \
+                else MemoryCacheBackend(max_entries)
+            _caches[settings] = MetadataCache(backend, ttl=ttl)
+        return _caches[settings]
@@ -0,0 +1,359 @@
+"""
+genie.reconcile
+
+This module implements reconciling the applications, commands and clusters
+in Genie with a desired state: only the differences are applied.
+
+Example spec (a dict or a YAML/JSON file):
+
+    applications:
+      - id: spark-2.4
+        name: spark
+        version: '2.4'
+        user: genie
+        status: ACTIVE
+        tags: [type:spark, ver:2.4]
+    commands:
+      - id: spark-submit
+        name: spark-submit
+        version: '2.4'
+        user: genie
+        status: ACTIVE
+        executable: spark-submit
+        applications: [spark-2.4]
+    clusters:
+      - id: yarn-prod
+        name: yarn-prod
+        version: '1'
+        user: genie
+        status: UP
+        tags: [sched:adhoc]
+        commands: [spark-submit]
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import logging
+import os
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import Genie
+from .exceptions import GenieError
+from .utils import is_str
+
+
+logger = logging.getLogger('com.netflix.genie.reconcile')
+
+DEFAULT_MAX_WORKERS = 8
+
+# (resource kind, key of the linked resources) in dependency order
+KINDS = (
+    ('applications', None),
+    ('commands', 'applications'),
+    ('clusters', 'commands'),
+)
+
+KIND_LINKS = {kind: links for kind, links in KINDS if links}
+
+# fields set by Genie
+READ_ONLY_FIELDS = {'created', 'updated', '_links'}
+
+# fields compared without order
+SET_FIELDS = {'tags', 'configs', 'dependencies'}
+
+# tags added by Genie
+SYSTEM_TAG_PREFIXES = ('genie.id:', 'genie.name:')
+
+
+Change = namedtuple('Change', ['kind', 'resource_id', 'action', 'data'])
+Change.__doc__ = """
+A change to a resource.
+
+Attributes:
+    kind (str): "applications", "commands" or "clusters".
+    resource_id (str): The resource id.
+    action (str): "create" (data is the resource), "update" (data is the
+        JSON patch operations) or "link" (data is the linked resource ids).
+    data: The data sent for the change.
+"""
+
+
+class Plan(object):
+    """The changes to reconcile Genie with a desired state."""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    __nonzero__ = __bool__
+
+    def __str__(self):
+        if not self.changes:
+            return 'No changes.'
+        lines = list()
+        for change in self.changes:
+            name = '{} {}'.format(change.kind[:-1], change.resource_id)
+            if change.action == 'create':
+                lines.append('+ {}'.format(name))
+            elif change.action == 'update':
+                for operation in change.data:
+                    lines.append('~ {} {} = {}'.format(name,
+                                                       operation['path'][1:],
+                                                       json.dumps(operation['value'])))
+            else:
+                lines.append('~ {} {} = {}'.format(name,
+                                                   KIND_LINKS[change.kind],
+                                                   json.dumps(change.data)))
+        return '\n'.join(lines)
+
+
+def load_spec(spec):
+    """
+    Load a desired state spec.
+
+    Args:
+        spec (dict or str): The spec, or the path of a YAML (requires PyYAML)
+            or JSON file.
+
+    Returns:
+        dict: The resources of each kind by id.
+    """
+
+    if is_str(spec):
+        with open(spec) as spec_file:
+            content = spec_file.read()
+        if os.path.splitext(spec)[1].lower() == '.json':
+            spec = json.loads(content)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('PyYAML is required for YAML specs '
+                                  '(pip install pyyaml)')
+            spec = yaml.safe_load(content)
+
+    unknown = set(spec or dict()) - {kind for kind, _ in KINDS}
+    if unknown:
+        raise GenieError('unknown resource kinds in spec: {}'
+                         .format(', '.join(sorted(unknown))))
+
+    resources = dict()
+    for kind, _ in KINDS:
+        resources[kind] = dict()
+        for resource in (spec or dict()).get(kind) or list():
+            resource_id = resource.get('id')
+            if not resource_id:
+                raise GenieError('{} in spec without an id: {}'
+                                 .format(kind, resource))
+            if resource_id in resources[kind]:
+                raise GenieError("duplicate {} id '{}' in spec"
+                                 .format(kind, resource_id))
+            resources[kind][resource_id] = dict(resource)
+    return resources
+
+
+def _normalize(field, value):
+    if field == 'tags' and value is not None:
+        value = [t for t in value if not t.startswith(SYSTEM_TAG_PREFIXES)]
+    if field in SET_FIELDS and value is not None:
+        return sorted(value)
+    return value
+
+
+def _ids(resources):
+    return [r['id'] if isinstance(r, dict) else r for r in resources or list()]
+
+
+class Reconciler(object):
+    """
+    Reconcile Genie resources with a desired state.
+
+    The current state of the resources in the spec is loaded concurrently and
+    compared with the spec: only the fields which differ are patched and only
+    the links (applications of commands, commands of clusters) which differ
+    are set. Changes are applied concurrently per kind, applications first,
+    then commands and their applications, then clusters and their commands.
+    Resources not in the spec are left as they are.
+
+    Example:
+        >>> reconciler = Reconciler(Genie())
+        >>> plan = reconciler.plan('genie-configs.yaml')
+        >>> print(plan)
+        + application spark-2.4
+        ~ cluster yarn-prod commands = ["spark-submit"]
+        >>> reconciler.apply(plan)
+    """
+
+    def __init__(self, genie=None, max_workers=None):
+        """
+        Args:
+            genie (:py:class:`pygenie.client.Genie`, optional): The Genie
+                client.
+            max_workers (int, optional): Maximum concurrent requests
+                (default: the "genie.reconcile_max_workers" option or 8).
+        """
+
+        self.genie = genie or Genie()
+        if max_workers is None:
+            max_workers = self.genie.conf.genie.get('reconcile_max_workers',
+                                                    DEFAULT_MAX_WORKERS)
+        self.max_workers = max(1, int(max_workers))
+
+    def _map(self, func, items):
+        items = list(items)
+        if not items:
+            return list()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) \
+                as executor:
+            return list(executor.map(func, items))
+
+    def _load(self, kind, resource_id):
+        """Get the current resource and its links (None if it does not exist)."""
+
+        get = {'applications': self.genie.get_application,
+               'commands': self.genie.get_command,
+               'clusters': self.genie.get_cluster}[kind]
+        current = get(resource_id)
+        links = None
+        if current is not None and kind == 'commands':
+            links = _ids(self.genie.get_applications_for_command(resource_id))
+        elif current is not None and kind == 'clusters':
+            links = _ids(self.genie.get_commands_for_cluster(resource_id))
+        return current, links
+
+    def plan(self, spec):
+        """
+        Compute the changes to reconcile Genie with the spec.
+
+        Args:
+            spec (dict or str): The spec (see :py:func:`load_spec`).
+
+        Returns:
+            :py:class:`Plan`: The changes.
+        """
+
+        resources = load_spec(spec)
+        keys = [(kind, resource_id) for kind, _ in KINDS
+                for resource_id in sorted(resources[kind])]
+        current = dict(zip(keys, self._map(lambda key: self._load(*key), keys)))
+
+        changes = list()
+        for kind, links_key in KINDS:
+            for resource_id in sorted(resources[kind]):
+                desired = dict(resources[kind][resource_id])
+                desired_links = desired.pop(links_key, None) if links_key else None
+                resource, links = current[(kind, resource_id)]
+
+                if resource is None:
+                    changes.append(Change(kind, resource_id, 'create', desired))
+                    links = list()
+                else:
+                    operations = [
+                        {'op': 'replace' if field in resource else 'add',
+                         'path': '/{}'.format(field),
+                         'value': value}
+                        for field, value in sorted(desired.items())
+                        if field not in READ_ONLY_FIELDS and field != 'id'
+                        and _normalize(field, value) != \
+                            _normalize(field, resource.get(field))
+                    ]
+                    if operations:
+                        changes.append(Change(kind, resource_id, 'update',
+                                              operations))
+
+                if desired_links is not None and list(desired_links) != links:
+                    changes.append(Change(kind, resource_id, 'link',
+                                          list(desired_links)))
+
+        return Plan(changes)
+
+    def _apply_change(self, change):
+        genie = self.genie
+        logger.info('%s %s %s', change.action, change.kind[:-1], change.resource_id)
+        if change.action == 'create':
+            {'applications': genie.create_application,
+             'commands': genie.create_command,
+             'clusters': genie.create_cluster}[change.kind](change.data)
+        elif change.action == 'update':
+            {'applications': genie.patch_application,
+             'commands': genie.patch_command,
+             'clusters': genie.patch_cluster}[change.kind](change.resource_id,
+                                                           change.data)
+        elif change.kind == 'commands':
+            genie.set_application_for_command(change.resource_id, change.data)
+        else:
+            genie.set_commands_for_cluster(change.resource_id, change.data)
+
+    def apply(self, plan):
+        """
+        Apply a plan.
+
+        Changes are applied in dependency order (applications, commands,
+        command applications, clusters, cluster commands), concurrently within
+        each step. If a change fails, the following steps are not applied.
+
+        Args:
+            plan (:py:class:`Plan`): The changes (see :py:meth:`plan`).
+
+        Returns:
+            :py:class:`Plan`: The applied plan.
+        """
+
+        steps = list()
+        for kind, _ in KINDS:
+            steps.append([c for c in plan if c.kind == kind and c.action != 'link'])
+            steps.append([c for c in plan if c.kind == kind and c.action == 'link'])
+
+        for step in steps:
+            errors = list()
+
+            def apply_change(change):
+                try:
+                    self._apply_change(change)
+                except Exception as err:
+                    logger.error('failed to %s %s %s: %s', change.action,
+                                 change.kind[:-1], change.resource_id, err)
+                    errors.append(err)
+
+            self._map(apply_change, step)
+            if errors:
+                raise errors[0]
+
+        return plan
+
+
+def reconcile(spec, genie=None, dry_run=False, max_workers=None):
+    """
+    Reconcile Genie resources with a desired state spec.
+
+    Example:
+        >>> print(reconcile('genie-configs.yaml', dry_run=True))
+
+    Args:
+        spec (dict or str): The spec (see :py:func:`load_spec`).
+        genie (:py:class:`pygenie.client.Genie`, optional): The Genie client.
+        dry_run (bool, optional): If True, only compute the plan.
+        max_workers (int, optional): Maximum concurrent requests.
+
+    Returns:
+        :py:class:`Plan`: The changes (applied unless dry_run).
+    """
+
+    reconciler = Reconciler(genie, max_workers=max_workers)
+    plan = reconciler.plan(spec)
+    if dry_run:
+        return plan
+    return reconciler.apply(plan)
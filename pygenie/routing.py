@@ -0,0 +1,195 @@
+"""
+genie.routing
+
+This module implements resolving which cluster and command Genie would run a
+job on from a snapshot of the clusters and commands, without submitting it.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import threading
+
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .adapter.genie_3 import get_criteria
+from .client import Genie
+
+
+logger = logging.getLogger('com.netflix.genie.routing')
+
+DEFAULT_MAX_WORKERS = 8
+
+Route = namedtuple('Route', ['cluster_id', 'command_id', 'criteria_index',
+                             'candidates'])
+Route.__doc__ = """
+Where a job would run.
+
+Attributes:
+    cluster_id (str): The first matching cluster (Genie load balances between
+        the candidates, randomly by default).
+    command_id (str): The command the job would run on cluster_id.
+    criteria_index (int): The index of the cluster criteria which matched.
+    candidates (dict): Every matching cluster id -> command id.
+"""
+
+
+class _TagIndex(object):
+    """Inverted index of tag -> resource ids."""
+
+    def __init__(self, resources):
+        self._postings = defaultdict(set)
+        for resource_id, tags in resources:
+            for tag in tags or list():
+                self._postings[tag].add(resource_id)
+
+    def match(self, tags):
+        """Get the ids of the resources having all the tags."""
+
+        postings = sorted((self._postings.get(tag, frozenset()) for tag in set(tags)),
+                          key=len)
+        if not postings:
+            return set()
+        matched = set(postings[0])
+        for posting in postings[1:]:
+            if not matched:
+                break
+            matched &= posting
+        return matched
+
+
+class RoutingSimulator(object):
+    """
+    Resolve jobs' cluster and command criteria like Genie does.
+
+    Only UP clusters and ACTIVE commands are considered. The cluster criterias
+    are tried in priority order: the first one for which clusters having all
+    its tags have a command having all the command criteria tags wins. On each
+    of these clusters, the command is the first such command in the cluster's
+    command list.
+
+    Example:
+        >>> simulator = RoutingSimulator.from_genie(Genie())
+        >>> route = simulator.resolve_job(job)
+        >>> if route is None:
+        ...     print('no cluster/command for', job.get('job_id'))
+
+    Args:
+        clusters (list): Cluster dicts ("id", "status", "tags").
+        commands (list): Command dicts ("id", "status", "tags").
+        cluster_commands (dict): Cluster id -> list of command ids (in the
+            cluster's order).
+    """
+
+    def __init__(self, clusters, commands, cluster_commands):
+        self._cluster_index = _TagIndex(
+            (c['id'], c.get('tags')) for c in clusters
+            if (c.get('status') or '').upper() == 'UP')
+        active = {c['id'] for c in commands
+                  if (c.get('status') or '').upper() == 'ACTIVE'}
+        self._command_index = _TagIndex(
+            (c['id'], c.get('tags')) for c in commands if c['id'] in active)
+        self._cluster_commands = {
+            cluster_id: [i for i in command_ids if i in active]
+            for cluster_id, command_ids in cluster_commands.items()
+        }
+        self._resolved = dict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_genie(cls, genie=None, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Snapshot the clusters and commands in Genie.
+
+        The commands of each UP cluster are requested concurrently (through
+        the client's metadata cache, if enabled).
+
+        Args:
+            genie (:py:class:`pygenie.client.Genie`, optional): The Genie
+                client.
+            max_workers (int, optional): Maximum concurrent requests.
+
+        Returns:
+            :py:class:`RoutingSimulator`: The simulator.
+        """
+
+        genie = genie or Genie()
+        clusters = [c for c in genie.get_clusters(filters={'status': 'UP'})
+                    if c is not None]
+        commands = [c for c in genie.get_commands(filters={'status': 'ACTIVE'})
+                    if c is not None]
+
+        def command_ids(cluster):
+            return [c['id'] if isinstance(c, dict) else c
+                    for c in genie.get_commands_for_cluster(cluster['id'])]
+
+        cluster_commands = dict()
+        if clusters:
+            with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers),
+                                                           len(clusters)))) \
+                    as executor:
+                cluster_commands = dict(zip(
+                    [c['id'] for c in clusters],
+                    executor.map(command_ids, clusters)))
+
+        logger.debug('routing snapshot of %s clusters and %s commands',
+                     len(clusters), len(commands))
+        return cls(clusters, commands, cluster_commands)
+
+    def resolve(self, cluster_criterias, command_criteria):
+        """
+        Resolve criteria.
+
+        Args:
+            cluster_criterias (list): Lists of cluster tags (or dicts with
+                "tags") in priority order.
+            command_criteria (list): The command tags.
+
+        Returns:
+            :py:class:`Route`: The route (None if no cluster and command
+                match).
+        """
+
+        key = (tuple(frozenset(c.get('tags') if isinstance(c, dict) else c)
+                     for c in cluster_criterias),
+               frozenset(command_criteria))
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key]
+
+        commands = self._command_index.match(key[1]) if key[1] else set()
+        route = None
+        for index, tags in enumerate(key[0]):
+            candidates = dict()
+            for cluster_id in sorted(self._cluster_index.match(tags)):
+                for command_id in self._cluster_commands.get(cluster_id, ()):
+                    if command_id in commands:
+                        candidates[cluster_id] = command_id
+                        break
+            if candidates:
+                cluster_id = sorted(candidates)[0]
+                route = Route(cluster_id, candidates[cluster_id], index,
+                              candidates)
+                break
+
+        with self._lock:
+            self._resolved[key] = route
+        return route
+
+    def resolve_job(self, job):
+        """
+        Resolve a job's criteria.
+
+        Args:
+            job (:py:class:`pygenie.jobs.core.GenieJob`): The job.
+
+        Returns:
+            :py:class:`Route`: The route (None if no cluster and command
+                match).
+        """
+
+        cluster_criterias, command_criteria = get_criteria(job)
+        return self.resolve(cluster_criterias, command_criteria)
@@ -0,0 +1,202 @@
+"""
+genie.sessions
+
+This module implements a process-wide pool of HTTP sessions so that requests
+to the Genie server reuse TCP/TLS connections instead of opening new ones for
+every call.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+try:
+    from urlparse import urlparse
+except ImportError:
+    from urllib.parse import urlparse
+
+
+logger = logging.getLogger('com.netflix.genie.sessions')
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+class SessionPool(object):
+    """
+    Thread-safe manager of pooled :py:class:`requests.Session` objects.
+
+    Sessions are keyed by the Genie host (scheme and netloc) and the set of
+    session adapters mounted on them (see :py:attr:`GenieConf.session_adapters`).
+    Each session mounts an :py:class:`HTTPAdapter` sized with pool_connections
+    and pool_maxsize, so concurrent requests to the same host share a bounded
+    set of keep-alive connections.
+
+    Sessions which have not been used for idle_timeout seconds are closed and
+    evicted. After a fork, the child process drops the sessions inherited from
+    the parent (without closing the shared sockets) and builds its own.
+
+    Example:
+        >>> pool = SessionPool(pool_maxsize=50)
+        >>> session = pool.get('http://genie/api/v3/jobs')
+        >>> session.get('http://genie/api/v3/jobs')
+
+    Args:
+        pool_connections (int, optional): Number of host connection pools to
+            cache per session (default: 10).
+        pool_maxsize (int, optional): Maximum number of connections to keep
+            per host connection pool (default: 10).
+        idle_timeout (int or float, optional): Seconds a session can be unused
+            before being evicted. None disables eviction (default: 300).
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.pool_connections = int(pool_connections)
+        self.pool_maxsize = int(pool_maxsize)
+        self.idle_timeout = float(idle_timeout) \
+            if idle_timeout not in {None, ''} else None
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._sessions = dict()
+
+    def __repr__(self):
+        return '{}(pool_connections={}, pool_maxsize={}, idle_timeout={})' \
+            .format(self.__class__.__name__,
+                    self.pool_connections,
+                    self.pool_maxsize,
+                    self.idle_timeout)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    @staticmethod
+    def _key(url, adapters):
+        parts = urlparse(url)
+        host = '{}://{}'.format(parts.scheme, parts.netloc).lower()
+        # key on the adapter instances themselves, the session holds a
+        # reference to each adapter so ids cannot be reused while cached
+        return (host, tuple((prefix, id(adpt)) for prefix, adpt in adapters.items()))
+
+    def _new_session(self, adapters):
+        session = requests.Session()
+        for prefix in ('http://', 'https://'):
+            session.mount(prefix, HTTPAdapter(pool_connections=self.pool_connections,
+                                              pool_maxsize=self.pool_maxsize))
+        for prefix, adpt in adapters.items():
+            session.mount(prefix, adpt)
+        return session
+
+    def _check_pid(self):
+        pid = os.getpid()
+        if pid != self._pid:
+            # connections belong to the parent, do not close them from the child
+            logger.debug('fork detected (pid %s -> %s), dropping sessions',
+                         self._pid, pid)
+            self._sessions = dict()
+            self._pid = pid
+
+    def _evict_idle(self, now):
+        if self.idle_timeout is None:
+            return
+        for key, (session, last_used) in list(self._sessions.items()):
+            if now - last_used > self.idle_timeout:
+                logger.debug('evicting idle session for %s', key[0])
+                del self._sessions[key]
+                session.close()
+
+    def get(self, url, adapters=None):
+        """
+        Get a pooled session to use for a request to url.
+
+        Args:
+            url (str): The request URL (used to determine the host).
+            adapters (dict, optional): A mapping of URL prefixes to transport
+                adapters to mount on the session.
+
+        Returns:
+            :py:class:`requests.Session`: A session shared with other callers
+                using the same host and adapters.
+        """
+
+        adapters = adapters or dict()
+        key = self._key(url, adapters)
+        now = time.time()
+
+        with self._lock:
+            self._check_pid()
+            self._evict_idle(now)
+            entry = self._sessions.get(key)
+            session = entry[0] if entry else self._new_session(adapters)
+            self._sessions[key] = (session, now)
+            return session
+
+    def clear(self):
+        """Close and remove all pooled sessions."""
+
+        with self._lock:
+            sessions = [s for s, _ in self._sessions.values()]
+            self._sessions = dict()
+        for session in sessions:
+            session.close()
+
+
+_pools = dict()
+_pools_lock = threading.Lock()
+
+
+def get_session_pool(conf=None):
+    """
+    Get the shared :py:class:`SessionPool` for the pool settings in conf.
+
+    The following options in the "genie" section are used (all optional):
+        session_pool_connections: number of host connection pools per session.
+        session_pool_maxsize: maximum connections per host connection pool.
+        session_idle_timeout: seconds before an unused session is evicted.
+
+    Pools are shared process-wide between confs with identical settings.
+
+    Args:
+        conf (GenieConf, optional): The configuration to read settings from.
+
+    Returns:
+        :py:class:`SessionPool`: The shared pool.
+    """
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    idle_timeout = get('session_idle_timeout', DEFAULT_IDLE_TIMEOUT)
+    settings = (
+        int(get('session_pool_connections', DEFAULT_POOL_CONNECTIONS)),
+        int(get('session_pool_maxsize', DEFAULT_POOL_MAXSIZE)),
+        float(idle_timeout) if idle_timeout not in {None, ''} else None
+    )
+
+    with _pools_lock:
+        if settings not in _pools:
+            _pools[settings] = SessionPool(*settings)
+        return _pools[settings]
+
+
+def _reset_after_fork():
+    # locks may have been held by other threads at fork time
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    for pool in _pools.values():
+        pool._lock = threading.RLock()
+        pool._check_pid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
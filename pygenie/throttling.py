@@ -0,0 +1,359 @@
+"""
+genie.throttling
+
+This module implements client-side throttling of requests to the Genie server:
+per-host rate limiting, retry budgets, jittered backoff and honoring
+Retry-After headers on 429/503 responses.
+
+"""
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import random
+import threading
+import time
+
+from collections import deque
+from email.utils import mktime_tz, parsedate_tz
+try:
+    from urlparse import urlparse
+except ImportError:
+    from urllib.parse import urlparse
+
+
+logger = logging.getLogger('com.netflix.genie.throttling')
+
+DEFAULT_MAX_BACKOFF = 60
+DEFAULT_MAX_RETRY_AFTER = 300
+DEFAULT_RETRY_BUDGET_RATIO = 0.2
+DEFAULT_RETRY_BUDGET_MIN_PER_SECOND = 10
+DEFAULT_RETRY_BUDGET_TTL = 10
+
+RETRY_AFTER_CODES = {429, 503}
+
+
+def _now():
+    return getattr(time, 'monotonic', time.time)()
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header value (delay seconds or an HTTP date) into
+    the number of seconds to wait. Returns None if the value is invalid.
+    """
+
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    now = time.time() if now is None else now
+    return max(mktime_tz(parsed) - now, 0)
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket allowing rate requests per second on average with
+    bursts of up to burst requests.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else max(self.rate, 1)
+        self._tokens = self.burst
+        self._updated = _now()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '{}(rate={}, burst={})'.format(self.__class__.__name__,
+                                              self.rate,
+                                              self.burst)
+
+    def _reserve(self):
+        # take a token (possibly going into debt) and return how long the
+        # caller should wait for it to become available
+        with self._lock:
+            now = _now()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0)
+
+    def acquire(self):
+        """Block until a token is available. Returns the seconds waited."""
+
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RetryBudget(object):
+    """
+    Limits retries to a ratio of requests made within a sliding window of ttl
+    seconds, on top of min_per_second retries which are always allowed. When
+    a host is overloaded, this stops every client from multiplying its load by
+    the number of attempts.
+    """
+
+    def __init__(self, ratio=DEFAULT_RETRY_BUDGET_RATIO,
+                 min_per_second=DEFAULT_RETRY_BUDGET_MIN_PER_SECOND,
+                 ttl=DEFAULT_RETRY_BUDGET_TTL):
+        self.ratio = float(ratio)
+        self.min_per_second = float(min_per_second)
+        self.ttl = float(ttl)
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '{}(ratio={}, min_per_second={}, ttl={})' \
+            .format(self.__class__.__name__,
+                    self.ratio,
+                    self.min_per_second,
+                    self.ttl)
+
+    def _expire(self, now):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.ttl:
+                events.popleft()
+
+    def record_request(self):
+        """Record a request (first attempts deposit into the budget)."""
+
+        with self._lock:
+            now = _now()
+            self._expire(now)
+            self._requests.append(now)
+
+    def can_retry(self):
+        """Return True (and withdraw from the budget) if a retry is allowed."""
+
+        with self._lock:
+            now = _now()
+            self._expire(now)
+            allowed = self.min_per_second * self.ttl \
+                + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class _HostThrottle(object):
+    """Throttling state for one host."""
+
+    def __init__(self, bucket, budget):
+        self.bucket = bucket
+        self.budget = budget
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+
+
+class Throttler(object):
+    """
+    Thread-safe manager of per-host throttling state.
+
+    Before each request, :py:meth:`before_request` waits for the host's
+    token bucket (if a rate is set) and for any Retry-After delay the host
+    has sent to another request. Between attempts, :py:meth:`retry_delay`
+    returns how long to sleep: the Retry-After delay for 429/503 responses
+    (capped at max_retry_after), otherwise a random delay between 0 and
+    min(max_backoff, backoff * 2 ** attempt) ("full jitter"), or None if the
+    host's retry budget is exhausted.
+
+    Args:
+        rate (float, optional): Maximum average requests per second per host
+            (default: unlimited).
+        burst (int, optional): Maximum burst of requests per host (default:
+            rate).
+        max_backoff (float, optional): Maximum seconds between attempts
+            (default: 60).
+        max_retry_after (float, optional): Maximum seconds to honor from a
+            Retry-After header (default: 300).
+        retry_budget_ratio (float, optional): Retries allowed as a ratio of
+            requests (default: 0.2). None disables the retry budget.
+        retry_budget_min_per_second (float, optional): Retries per second
+            always allowed (default: 10).
+        retry_budget_ttl (float, optional): Seconds requests and retries are
+            counted for in the budget (default: 10).
+    """
+
+    def __init__(self, rate=None, burst=None, max_backoff=DEFAULT_MAX_BACKOFF,
+                 max_retry_after=DEFAULT_MAX_RETRY_AFTER,
+                 retry_budget_ratio=DEFAULT_RETRY_BUDGET_RATIO,
+                 retry_budget_min_per_second=DEFAULT_RETRY_BUDGET_MIN_PER_SECOND,
+                 retry_budget_ttl=DEFAULT_RETRY_BUDGET_TTL):
+        self.rate = float(rate) if rate not in {None, ''} else None
+        self.burst = burst
+        self.max_backoff = float(max_backoff)
+        self.max_retry_after = float(max_retry_after)
+        self.retry_budget_ratio = float(retry_budget_ratio) \
+            if retry_budget_ratio not in {None, ''} else None
+        self.retry_budget_min_per_second = float(retry_budget_min_per_second)
+        self.retry_budget_ttl = float(retry_budget_ttl)
+        self._hosts = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '{}(rate={}, burst={}, retry_budget_ratio={})' \
+            .format(self.__class__.__name__,
+                    self.rate,
+                    self.burst,
+                    self.retry_budget_ratio)
+
+    def _host(self, url):
+        parts = urlparse(url)
+        host = '{}://{}'.format(parts.scheme, parts.netloc).lower()
+        with self._lock:
+            if host not in self._hosts:
+                bucket = TokenBucket(self.rate, self.burst) \
+                    if self.rate else None
+                budget = RetryBudget(self.retry_budget_ratio,
+                                     self.retry_budget_min_per_second,
+                                     self.retry_budget_ttl) \
+                    if self.retry_budget_ratio is not None else None
+                self._hosts[host] = _HostThrottle(bucket, budget)
+            return self._hosts[host]
+
+    def reserve(self, url, retry=False):
+        """
+        Reserve a request to url without waiting: takes a token from the
+        host's bucket (if a rate is set) and returns how long the caller
+        should wait before sending the request (for asyncio callers, which
+        must not block the event loop).
+
+        Args:
+            url (str): The request URL.
+            retry (bool, optional): If True, the request is a retry (retries
+                are not deposited into the retry budget).
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+
+        host = self._host(url)
+
+        with host.lock:
+            blocked = max(host.blocked_until - _now(), 0)
+        if blocked > 0:
+            logger.debug('waiting %.2fs (Retry-After) before request to %s',
+                         blocked, url)
+
+        # tokens keep accruing while blocked
+        waited = host.bucket._reserve() if host.bucket is not None else 0
+        if waited:
+            logger.debug('rate limited for %.2fs before request to %s',
+                         waited, url)
+
+        if host.budget is not None and not retry:
+            host.budget.record_request()
+
+        return max(blocked, waited)
+
+    def before_request(self, url, retry=False):
+        """
+        Wait until a request to url is allowed.
+
+        Args:
+            url (str): The request URL.
+            retry (bool, optional): If True, the request is a retry (retries
+                are not deposited into the retry budget).
+        """
+
+        wait = self.reserve(url, retry=retry)
+        if wait > 0:
+            time.sleep(wait)
+
+    def retry_delay(self, url, attempt, backoff, resp=None):
+        """
+        Get the number of seconds to wait before retrying a request.
+
+        Args:
+            url (str): The request URL.
+            attempt (int): The attempt which failed (0 for the first attempt).
+            backoff (float): The base backoff in seconds.
+            resp (optional): The failed attempt's response (None for
+                connection errors and timeouts).
+
+        Returns:
+            float: Seconds to wait, or None if the request should not be
+                retried because the host's retry budget is exhausted.
+        """
+
+        host = self._host(url)
+
+        if host.budget is not None and not host.budget.can_retry():
+            return None
+
+        if resp is not None and resp.status_code in RETRY_AFTER_CODES:
+            retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = min(retry_after, self.max_retry_after)
+                # hold back other requests to the host for the delay as well
+                with host.lock:
+                    host.blocked_until = max(host.blocked_until, _now() + delay)
+                return delay
+
+        ceiling = min(self.max_backoff, float(backoff) * 2 ** min(attempt, 32))
+        return random.uniform(0, ceiling)
+
+
+_throttlers = dict()
+_throttlers_lock = threading.Lock()
+
+
+def get_throttler(conf=None):
+    """
+    Get the shared :py:class:`Throttler` for the throttling settings in conf.
+
+    The following options in the "genie" section are used (all optional):
+        rate_limit: maximum average requests per second per host.
+        rate_limit_burst: maximum burst of requests per host.
+        max_backoff: maximum seconds between attempts.
+        max_retry_after: maximum seconds to honor from a Retry-After header.
+        retry_budget_ratio: retries allowed as a ratio of requests ("none"
+            disables the retry budget).
+        retry_budget_min_per_second: retries per second always allowed.
+        retry_budget_ttl: seconds requests and retries are counted for.
+
+    Throttlers (and their per-host state) are shared process-wide between
+    confs with identical settings.
+
+    Args:
+        conf (GenieConf, optional): The configuration to read settings from.
+
+    Returns:
+        :py:class:`Throttler`: The shared throttler.
+    """
+
+    get = conf.genie.get if conf is not None else lambda _, default=None: default
+
+    rate = get('rate_limit')
+    burst = get('rate_limit_burst')
+    ratio = get('retry_budget_ratio', DEFAULT_RETRY_BUDGET_RATIO)
+    settings = (
+        float(rate) if rate not in {None, ''} else None,
+        int(burst) if burst not in {None, ''} else None,
+        float(get('max_backoff', DEFAULT_MAX_BACKOFF)),
+        float(get('max_retry_after', DEFAULT_MAX_RETRY_AFTER)),
+        float(ratio) if str(ratio).lower() not in {'none', ''} else None,
+        float(get('retry_budget_min_per_second',
+                  DEFAULT_RETRY_BUDGET_MIN_PER_SECOND)),
+        float(get('retry_budget_ttl', DEFAULT_RETRY_BUDGET_TTL))
+    )
+
+    with _throttlers_lock:
+        if settings not in _throttlers:
+            _throttlers[settings] = Throttler(*settings)
+        return _throttlers[settings]
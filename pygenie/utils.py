@@ -24,6 +24,8 @@ from importlib_metadata import version
 import requests
 
 from .auth import AuthHandler
+from .sessions import get_session_pool
+from .throttling import get_throttler
 
 from requests.exceptions import Timeout, ConnectionError
 from .exceptions import GenieHTTPError
@@ -71,6 +73,20 @@ def call(url, method='get', headers=None, raise_not_status=None, none_on_404=Fal
             GenieHTTPError (will not retry requests with 404 response).
         failure_codes (list, optional): list of status codes to break retries and
             return Response.
+        session_adapters (dict, optional): mapping of URL prefixes to transport
+            adapters to mount on the session.
+        session_pool (SessionPool, optional): pool to get the (shared) session
+            from. Defaults to the process-wide pool.
+        throttler (Throttler, optional): rate limiter and retry policy shared
+            by requests to the same host. Defaults to the process-wide
+            throttler. Retries wait for a random delay of up to
+            backoff * 2 ** attempt seconds (or the Retry-After delay for
+            429/503 responses) and stop early if the host's retry budget is
+            exhausted.
+        circuit_breakers (CircuitBreakers, optional): per-host circuit
+            breakers. While a host's circuit is open, GenieCircuitOpenError
+            is raised instead of sending requests (default: no circuit
+            breaking).
     """
 
     failure_codes = failure_codes or list()
@@ -95,12 +111,19 @@ def call(url, method='get', headers=None, raise_not_status=None, none_on_404=Fal
     logger.debug('headers: %s', headers)
 
     errors = list()
-    session = requests.Session()
     adapters = kwargs.pop('session_adapters', None) or {}
-    for m, adpt in adapters.items():
-        session.mount(m, adpt)
+    session_pool = kwargs.pop('session_pool', None)
+    if session_pool is None:
+        session_pool = get_session_pool()
+    session = session_pool.get(url, adapters)
+    throttler = kwargs.pop('throttler', None) or get_throttler()
+    circuit_breakers = kwargs.pop('circuit_breakers', None)
+    breaker = circuit_breakers.get(url) if circuit_breakers is not None else None
 
     for i in range(attempts):
+        if breaker is not None:
+            breaker.before_request()
+        throttler.before_request(url, retry=i > 0)
         try:
             resp = session.request(method,
                                    url=url,
@@ -108,13 +131,30 @@ def call(url, method='get', headers=None, raise_not_status=None, none_on_404=Fal
                                    auth=auth_handler.auth,
                                    *args,
                                    **kwargs)
+            if breaker is not None:
+                if resp.status_code >= 500 \
+                        and str(resp.status_code) not in failure_codes:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
             if (int(resp.status_code/100) == 2) or (str(resp.status_code) in failure_codes):
                 break
         except (ConnectionError, Timeout, socket.timeout) as err:
+            if breaker is not None:
+                breaker.record_failure()
             errors.append(err)
             resp = None
+        except BaseException:
+            if breaker is not None:
+                breaker.release_probe()
+            raise
 
         if i < attempts - 1:
+            delay = throttler.retry_delay(url, i, backoff, resp)
+            if delay is None:
+                logger.warning('retry budget exhausted, not retrying "%s %s"',
+                               method.upper(), url)
+                break
             msg = ''
             if resp is not None:
                 msg = '-> {method} {url} ({code}): {text}'\
@@ -123,7 +163,7 @@ def call(url, method='get', headers=None, raise_not_status=None, none_on_404=Fal
                             code=resp.status_code,
                             text=resp.content)
             logger.warning('attempt %s %s', i + 1, msg)
-            time.sleep(i * backoff)
+            time.sleep(delay)
 
     if resp is not None:
         # Allow us to return None if we receive a 404
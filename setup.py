@@ -50,6 +50,10 @@ setup(
         "six",
         "importlib-metadata",
     ],
+    extras_require={
+        "async": ["aiohttp"],
+        "zstd": ["zstandard"],
+    },
     setup_requires=['setupmeta'],
     # See https://pypi.python.org/pypi?%3Aaction=list_classifiers
     classifiers=[
@@ -0,0 +1,206 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from mock import patch
+
+import pygenie
+
+from pygenie.conf import GenieConf
+from pygenie.jobs.cache import (OutputCache,
+                                get_output_cache,
+                                iter_lines,
+                                iter_text_lines)
+from pygenie.jobs.log_buffer import LogBuffer
+
+from ..utils import fake_log_response
+
+
+def log_response(data):
+    response = fake_log_response('')
+    response._content = data
+    return response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestOutputCache(unittest.TestCase):
+    """Test the on-disk output cache."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = OutputCache(os.path.join(self.tmp_dir, 'cache'),
+                                 max_size=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_put_get(self):
+        """Test writing and reading a cached file."""
+
+        assert self.cache.get('job', 'stdout') is None
+
+        filename = self.cache.put('job', 'stdout', [b'a\n', b'b\n'], size=4)
+
+        assert filename == self.cache.get('job', 'stdout', size=4)
+        assert [b'a', b'b'] == list(iter_lines(filename))
+        assert ['a', 'b', ''] == list(iter_text_lines(filename))
+        assert self.cache.get('job', 'stderr') is None
+        assert self.cache.get('other-job', 'stdout') is None
+
+    def test_size_mismatch(self):
+        """Test files are only cached (and read) with the expected size."""
+
+        assert self.cache.put('job', 'stdout', [b'abc'], size=4) is None
+        assert [] == os.listdir(self.cache.directory)
+
+        self.cache.put('job', 'stdout', [b'abc'])
+
+        assert self.cache.get('job', 'stdout', size=4) is None
+        assert [] == os.listdir(self.cache.directory)
+
+    def test_evict_lru(self):
+        """Test the least recently used files are evicted."""
+
+        first = self.cache.put('job-1', 'stdout', [b'x' * 40])
+        second = self.cache.put('job-2', 'stdout', [b'x' * 40])
+        past = time.time() - 60
+        os.utime(first, (past - 10, past - 10))
+        os.utime(second, (past, past))
+
+        # reading job-1 makes job-2 the least recently used
+        self.cache.get('job-1', 'stdout')
+        self.cache.put('job-3', 'stdout', [b'x' * 40])
+
+        assert self.cache.get('job-1', 'stdout') is not None
+        assert self.cache.get('job-2', 'stdout') is None
+        assert self.cache.get('job-3', 'stdout') is not None
+
+    def test_evict_keeps_new_file(self):
+        """Test a file larger than the cache is still readable once written."""
+
+        filename = self.cache.put('job', 'stdout', [b'x' * 200])
+
+        assert os.path.exists(filename)
+
+    def test_get_output_cache(self):
+        """Test the cache is only enabled with a directory."""
+
+        conf = GenieConf()
+
+        assert get_output_cache(conf) is None
+
+        conf.genie.set('output_cache_dir', self.tmp_dir)
+        conf.genie.set('output_cache_max_size', '1000')
+        cache = get_output_cache(conf)
+
+        assert self.tmp_dir == cache.directory
+        assert 1000 == cache.max_size
+        assert cache is get_output_cache(conf)
+
+        conf.genie.set('output_cache_max_size', '2000')
+
+        assert cache is not get_output_cache(conf)
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestRunningJobOutputCache(unittest.TestCase):
+    """Test RunningJob reading output through the cache."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.conf = GenieConf()
+        self.conf.genie.set('output_cache_dir', self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def running_job(self, status):
+        return pygenie.jobs.RunningJob(
+            '1234-cache',
+            conf=self.conf,
+            info={'status': status,
+                  'output_data': {'files': [{'name': 'stdout', 'size': 4},
+                                            {'name': 'stderr', 'size': 3}]}})
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stdout')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_stdout_cached(self, get_log_response, get_stdout):
+        """Test stdout of a finished job is downloaded once."""
+
+        get_log_response.side_effect = lambda *a, **kw: log_response(b'a\nb\n')
+
+        assert 'a\nb\n' == self.running_job('SUCCEEDED').stdout()
+        assert [b'a', b'b'] == list(self.running_job('SUCCEEDED').stdout(iterator=True))
+        assert 'a\nb\n' == self.running_job('FAILED').get_log('stdout')
+
+        get_log_response.assert_called_once_with('1234-cache', 'stdout',
+                                                 stream=True)
+        assert not get_stdout.called
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_stderr_cached(self, get_log_response):
+        """Test stderr of a finished job is read from the cache."""
+
+        get_log_response.side_effect = lambda *a, **kw: log_response(b'err')
+
+        assert 'err' == self.running_job('KILLED').stderr()
+        assert 'err' == self.running_job('KILLED').stderr()
+        assert 1 == get_log_response.call_count
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.call')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_same_as_uncached(self, get_log_response, call):
+        """Test cached output is read in the same types as uncached output."""
+
+        data = b'a\r\nb\n\n' + b'x' * 100000 + b'\xc3\xa9\nc'
+        get_log_response.side_effect = lambda *a, **kw: log_response(data)
+        call.side_effect = lambda *a, **kw: log_response(data)
+        cached = self.running_job('SUCCEEDED')
+        cached._info['output_data']['files'] = [
+            {'name': 'stdout', 'size': len(data)},
+            {'name': 'stderr', 'size': len(data)}]
+        uncached = pygenie.jobs.RunningJob('1234-cache', conf=GenieConf(),
+                                           info={'status': 'SUCCEEDED'})
+
+        assert uncached.stdout() == cached.stdout()
+        assert list(uncached.stdout(iterator=True)) == \
+            list(cached.stdout(iterator=True))
+        assert list(uncached.get_log('stdout', iterator=True)) == \
+            list(cached.get_log('stdout', iterator=True))
+        assert 1 == get_log_response.call_count
+
+        # uncached stderr is read through a LogBuffer
+        buf = LogBuffer()
+        buf.append(data)
+        assert list(buf.iter_lines()) == list(cached.stderr(iterator=True))
+        assert buf.getvalue() == cached.stderr()
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stdout')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_running_not_cached(self, get_log_response, get_stdout, get_status):
+        """Test output of a running job is not cached."""
+
+        get_status.return_value = 'RUNNING'
+        get_stdout.return_value = 'partial'
+
+        assert 'partial' == self.running_job('RUNNING').stdout()
+        assert not get_log_response.called
+        assert [] == os.listdir(self.tmp_dir)
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stdout')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_size_mismatch_not_cached(self, get_log_response, get_stdout):
+        """Test output not matching the listed size is read uncached."""
+
+        get_log_response.side_effect = lambda *a, **kw: log_response(b'a\n')
+        get_stdout.return_value = 'a\n'
+
+        assert 'a\n' == self.running_job('SUCCEEDED').stdout()
+        assert get_stdout.called
+        assert [] == os.listdir(self.tmp_dir)
@@ -0,0 +1,149 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+from mock import patch
+
+import pygenie
+
+from pygenie.exceptions import GenieDownloadError
+from pygenie.jobs.download import download_output
+
+from ..utils import fake_log_response
+
+
+class FakeOutputAdapter(object):
+    """Adapter serving a job output file with Range support."""
+
+    LOG_PATHS = {'stdout': 'stdout'}
+
+    def __init__(self, data, ranges=True):
+        self.data = data
+        self.ranges = ranges
+        self.requests = list()
+
+    def get_log_response(self, job_id, path, headers=None, **kwargs):
+        rng = (headers or {}).get('Range')
+        self.requests.append(rng)
+        response = fake_log_response('')
+        if rng and self.ranges:
+            start, end = [int(i) for i in rng.split('=')[1].split('-')]
+            response.status_code = 206
+            response.headers['Content-Range'] = 'bytes {}-{}/{}' \
+                .format(start, end, len(self.data))
+            response._content = self.data[start:end + 1]
+        else:
+            response._content = self.data
+        return response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestDownloadOutput(unittest.TestCase):
+    """Test downloading job output with Range requests."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dest = os.path.join(self.tmp_dir, 'stdout')
+        self.data = bytes(bytearray(range(256))) * 40
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_dest(self):
+        with open(self.dest, 'rb') as dest:
+            return dest.read()
+
+    def test_download(self):
+        """Test downloading a file in concurrent chunks."""
+
+        adapter = FakeOutputAdapter(self.data)
+
+        assert len(self.data) == download_output(adapter, 'job', 'stdout',
+                                                 self.dest,
+                                                 size=len(self.data),
+                                                 parallelism=4,
+                                                 chunk_size=1000)
+
+        assert self.data == self.read_dest()
+        assert 11 == len(adapter.requests)
+        assert 'bytes=10000-10239' in adapter.requests
+        assert ['stdout'] == os.listdir(self.tmp_dir)
+
+    def test_download_resume(self):
+        """Test resuming a partial download with the missing chunks only."""
+
+        with open(self.dest + '.part', 'wb') as part:
+            part.write(self.data[:2000] + b'\0' * (len(self.data) - 2000))
+        with open(self.dest + '.part.json', 'w') as state:
+            json.dump({'size': len(self.data), 'chunk_size': 1000,
+                       'done': [0, 1]}, state)
+
+        adapter = FakeOutputAdapter(self.data)
+        download_output(adapter, 'job', 'stdout', self.dest,
+                        size=len(self.data), chunk_size=1000)
+
+        assert self.data == self.read_dest()
+        assert 9 == len(adapter.requests)
+        assert 'bytes=0-999' not in adapter.requests
+
+    def test_download_no_ranges(self):
+        """Test falling back to one request if Range is not supported."""
+
+        adapter = FakeOutputAdapter(self.data, ranges=False)
+        download_output(adapter, 'job', 'stdout', self.dest,
+                        size=len(self.data), chunk_size=1000)
+
+        assert self.data == self.read_dest()
+        assert ['bytes=0-999', None] == adapter.requests
+
+    def test_download_no_ranges_short_read(self):
+        """Test a short fallback download does not leave a file at dest."""
+
+        adapter = FakeOutputAdapter(self.data[:-10], ranges=False)
+
+        with pytest.raises(GenieDownloadError):
+            download_output(adapter, 'job', 'stdout', self.dest,
+                            size=len(self.data), chunk_size=1000)
+
+        assert [] == os.listdir(self.tmp_dir)
+
+    def test_download_unknown_size(self):
+        """Test downloading with one request if the size is unknown."""
+
+        adapter = FakeOutputAdapter(self.data)
+        download_output(adapter, 'job', 'stdout', self.dest, chunk_size=1000)
+
+        assert self.data == self.read_dest()
+        assert [None] == adapter.requests
+
+    def test_download_wrong_size(self):
+        """Test the downloaded size is verified."""
+
+        adapter = FakeOutputAdapter(self.data[:-10])
+
+        with pytest.raises(GenieDownloadError):
+            download_output(adapter, 'job', 'stdout', self.dest,
+                            size=len(self.data), chunk_size=1000)
+
+        assert not os.path.exists(self.dest)
+
+    def test_running_job_download_output(self):
+        """Test RunningJob().download_output() using the output file size."""
+
+        adapter = FakeOutputAdapter(self.data)
+        running_job = pygenie.jobs.RunningJob(
+            '1234-download',
+            adapter=adapter,
+            info={'output_data': {'files': [{'name': 'stdout',
+                                             'size': len(self.data)}]}})
+
+        running_job.download_output('stdout', self.dest, chunk_size=4096)
+
+        assert self.data == self.read_dest()
+        assert 3 == len(adapter.requests)
@@ -9,6 +9,8 @@ from six import text_type
 
 import pygenie
 
+from pygenie.adapter.multipart import AttachmentFile
+
 
 def mock_to_attachment(att):
     if isinstance(att, dict):
@@ -205,15 +207,13 @@ class TestingHadoopJobAdapters(unittest.TestCase):
                 'version': '0.0.hadoop-alpha'
             })
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
     @patch('pygenie.jobs.pig.is_file')
-    def test_genie3_payload_file_script(self, is_file, os_isfile, file_open):
+    def test_genie3_payload_file_script(self, is_file, os_isfile):
         """Test HadoopJob payload for Genie 3 (file script)."""
 
         os_isfile.return_value = True
         is_file.return_value = True
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.HadoopJob(self.genie_3_conf) \
             .applications(['hadoop.app1']) \
@@ -237,7 +237,7 @@ class TestingHadoopJobAdapters(unittest.TestCase):
             {
                 u'applications': [u'hadoop.app1'],
                 u'attachments': [
-                    (u'hadoop.file1', u"open file '/hadoop.file1'")
+                    (u'hadoop.file1', AttachmentFile('/hadoop.file1'))
                 ],
                 u'clusterCriterias': [
                     {u'tags': [u'type:hadoop.cluster1']},
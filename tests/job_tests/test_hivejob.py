@@ -8,6 +8,8 @@ from mock import patch
 
 import pygenie
 
+from pygenie.adapter.multipart import AttachmentFile
+
 
 def mock_to_attachment(att):
     if isinstance(att, dict):
@@ -346,13 +348,11 @@ class TestingHiveJobAdapters(unittest.TestCase):
                 u'version': u'0.0.hive-alpha'
             })
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
-    def test_genie3_payload_adhoc_script(self, os_isfile, file_open):
+    def test_genie3_payload_adhoc_script(self, os_isfile):
         """Test HiveJob payload for Genie 3 (adhoc script)."""
 
         os_isfile.side_effect = lambda f: f.startswith('/')
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.HiveJob(self.genie_2_conf) \
             .applications(['hive.app']) \
@@ -382,9 +382,9 @@ class TestingHiveJobAdapters(unittest.TestCase):
             {
                 'applications': ['hive.app'],
                 'attachments': [
-                    ('hive.file1', "open file '/hive.file1'"),
-                    ('hive.file2', "open file '/hive.file2'"),
-                    ('properties_local.conf', "open file '/properties_local.conf'"),
+                    ('hive.file1', AttachmentFile('/hive.file1')),
+                    ('hive.file2', AttachmentFile('/hive.file2')),
+                    ('properties_local.conf', AttachmentFile('/properties_local.conf')),
                     ('script.hive', 'SELECT * FROM DUAL'),
                     ('_hive_parameters.txt', 'SET hivevar:a=a;\nSET hivevar:b=b;')
                 ],
@@ -409,15 +409,13 @@ class TestingHiveJobAdapters(unittest.TestCase):
             } ==
             pygenie.adapter.genie_3.get_payload(job))
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
     @patch('pygenie.jobs.hive.is_file')
-    def test_genie3_payload_file_script(self, presto_is_file, os_isfile, file_open):
+    def test_genie3_payload_file_script(self, presto_is_file, os_isfile):
         """Test HiveJob payload for Genie 3 (file script)."""
 
         os_isfile.return_value = True
         presto_is_file.return_value = True
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.HiveJob(self.genie_2_conf) \
             .applications(['hive.app']) \
@@ -447,11 +445,11 @@ class TestingHiveJobAdapters(unittest.TestCase):
             {
                 'applications': ['hive.app'],
                 'attachments': [
-                    ('hive.file1', "open file '/hive.file1'"),
-                    ('hive.file2', "open file '/hive.file2'"),
-                    ('properties1.conf', "open file '/properties1.conf'"),
-                    ('properties2.conf', "open file '/properties2.conf'"),
-                    ('script.hql', "open file '/script.hql'"),
+                    ('hive.file1', AttachmentFile('/hive.file1')),
+                    ('hive.file2', AttachmentFile('/hive.file2')),
+                    ('properties1.conf', AttachmentFile('/properties1.conf')),
+                    ('properties2.conf', AttachmentFile('/properties2.conf')),
+                    ('script.hql', AttachmentFile('/script.hql')),
                     ('_hive_parameters.txt', 'SET hivevar:a=a;\nSET hivevar:b=b;')
                 ],
                 'clusterCriterias': [
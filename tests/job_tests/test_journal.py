@@ -0,0 +1,185 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+import pygenie
+
+from pygenie.adapter.adapter import execute_job
+from pygenie.conf import GenieConf
+from pygenie.exceptions import GenieHTTPError, GenieJobNotFoundError
+from pygenie.jobs import HiveJob
+from pygenie.jobs.journal import JobJournal, get_job_journal, payload_hash
+from pygenie.jobs.utils import generate_job_id
+
+from ..utils import fake_response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestJobJournal(unittest.TestCase):
+    """Test the local job journal."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'journal', 'jobs.db')
+        self.conf = GenieConf()
+        self.conf.genie.set('journal_path', self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_journal(self):
+        """Test recording jobs and their statuses."""
+
+        journal = JobJournal(self.path)
+        journal.record_submit('etl', 'abc')
+        journal.record_submit('etl-1', 'abc')
+        journal.record_submit('etl-extra', 'def')
+        journal.record_submit('etl_1', 'def')
+        journal.update_status('etl', 'failed')
+
+        entry = JobJournal(self.path).get('etl')
+
+        assert 'abc' == entry['payload_hash']
+        assert 'FAILED' == entry['status']
+        assert JobJournal(self.path).get('missing') is None
+        assert {'etl': 'FAILED', 'etl-1': 'INIT'} == journal.attempts('etl')
+        assert ['etl-1', 'etl-extra', 'etl_1'] == journal.unfinished()
+
+        journal.prune(older_than=-1)
+
+        assert journal.get('etl') is None
+        assert journal.get('etl-1') is not None
+
+    def test_get_job_journal(self):
+        """Test the journal is only enabled with a path."""
+
+        assert get_job_journal(GenieConf()) is None
+        assert self.path == get_job_journal(self.conf).path
+        assert get_job_journal(self.conf) is get_job_journal(self.conf)
+
+    def test_payload_hash(self):
+        """Test the payload hash does not depend on the job id."""
+
+        job = HiveJob(self.conf).script('SELECT 1')
+
+        assert payload_hash(job.job_id('a')) == payload_hash(job.job_id('b'))
+        assert payload_hash(job) != payload_hash(job.script('SELECT 2'))
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.submit_job')
+    def test_execute_job(self, submit_job):
+        """Test jobs already in the journal are not submitted again."""
+
+        job = HiveJob(self.conf).job_id('1234-journal').script('SELECT 1')
+
+        running_job = execute_job(job)
+        execute_job(job)
+
+        assert '1234-journal' == running_job._job_id
+        assert 1 == submit_job.call_count
+        assert 'INIT' == get_job_journal(self.conf).get('1234-journal')['status']
+
+        execute_job(job.script('SELECT 2'))
+
+        assert 2 == submit_job.call_count
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.submit_job')
+    def test_execute_job_reattach(self, submit_job):
+        """Test reattaching (409) keeps the journal's status and submit time."""
+
+        submit_job.side_effect = GenieHTTPError(fake_response({}, 409))
+        journal = get_job_journal(self.conf)
+        journal.record_submit('1234-409', 'old', status='SUCCEEDED')
+        submitted = journal.get('1234-409')['submitted']
+
+        execute_job(HiveJob(self.conf).job_id('1234-409').script('SELECT 1'))
+        execute_job(HiveJob(self.conf).job_id('1234-new').script('SELECT 1'))
+
+        entry = journal.get('1234-409')
+        assert 'SUCCEEDED' == entry['status']
+        assert submitted == entry['submitted']
+        assert 'old' != entry['payload_hash']
+        assert 'INIT' == journal.get('1234-new')['status']
+        assert '1234-409' not in journal.unfinished()
+
+    @patch('pygenie.jobs.running.time.sleep')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_wait(self, get_status, sleep):
+        """Test wait() records statuses and skips jobs known to be finished."""
+
+        get_status.side_effect = ['RUNNING', 'RUNNING', 'SUCCEEDED']
+        journal = get_job_journal(self.conf)
+        journal.record_submit('1234-wait', 'abc')
+
+        pygenie.jobs.RunningJob('1234-wait', conf=self.conf) \
+            .wait(suppress_stream=True)
+        # a restarted process
+        pygenie.jobs.RunningJob('1234-wait', conf=self.conf) \
+            .wait(suppress_stream=True)
+
+        assert 'SUCCEEDED' == journal.get('1234-wait')['status']
+        assert 3 == get_status.call_count
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_info_for_rj')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_wait_finished_status(self, get_status, get_info_for_rj):
+        """Test the status is set from the journal when skipping wait()."""
+
+        get_info_for_rj.return_value = {'status': 'FAILED', 'finished': 'now'}
+        journal = get_job_journal(self.conf)
+        journal.record_submit('1234-done', 'abc', status='FAILED')
+
+        running_job = pygenie.jobs.RunningJob('1234-done', conf=self.conf) \
+            .wait(suppress_stream=True)
+
+        assert running_job.is_done
+        assert 'FAILED' == running_job.status
+        assert not get_info_for_rj.called
+
+        running_job = pygenie.jobs.RunningJob(
+            '1234-done', conf=self.conf, info={'status': 'RUNNING'}) \
+            .wait(suppress_stream=True)
+
+        assert 'FAILED' == running_job.status
+        assert 'now' == running_job.info['finished']
+        assert 0 == get_status.call_count
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.search_statuses')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_statuses')
+    def test_generate_job_id(self, get_statuses, get_status, search_statuses):
+        """Test generating job ids from the journal."""
+
+        journal = get_job_journal(self.conf)
+        journal.record_submit('etl', 'abc', status='FAILED')
+        journal.record_submit('etl-1', 'abc', status='RUNNING')
+        get_statuses.return_value = {'etl-1': 'SUCCEEDED'}
+        get_status.side_effect = GenieJobNotFoundError
+
+        assert 'etl-1' == generate_job_id('etl', conf=self.conf)
+        assert 'etl-2' == generate_job_id('etl', return_success=False,
+                                          conf=self.conf)
+        assert 'SUCCEEDED' == journal.get('etl-1')['status']
+        # finished attempts are not refreshed
+        get_statuses.assert_called_once_with(['etl-1'])
+        get_status.assert_called_once_with('etl-2')
+        assert 0 == search_statuses.call_count
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.search_statuses')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_generate_job_id_not_in_journal(self, get_status, search_statuses):
+        """Test searching attempts submitted by another process."""
+
+        journal = get_job_journal(self.conf)
+        journal.record_submit('etl', 'abc', status='FAILED')
+        get_status.return_value = 'RUNNING'
+        search_statuses.return_value = {'etl': 'FAILED', 'etl-1': 'RUNNING'}
+
+        assert 'etl-1' == generate_job_id('etl', conf=self.conf)
+        get_status.assert_called_once_with('etl-1')
+        search_statuses.assert_called_once_with('etl%', max_results=100)
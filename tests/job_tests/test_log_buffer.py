@@ -0,0 +1,97 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+from mock import call, patch
+
+import pygenie
+
+from pygenie.jobs.log_buffer import LogBuffer
+
+from ..utils import fake_log_response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestLogBuffer(unittest.TestCase):
+    """Test log buffer."""
+
+    def append_parts(self, buf):
+        for part in ['li', 'ne1\nline2', '', '\nline', '3\n', 'line4']:
+            buf.append(part)
+        return buf
+
+    def test_append_read(self):
+        """Test appending and reading byte ranges."""
+
+        buf = self.append_parts(LogBuffer())
+
+        assert 23 == len(buf)
+        assert 4 == buf.line_count
+        assert b'ne1\nl' == buf.read(2, 5)
+        assert b'line4' == buf.read(18)
+        assert b'' == buf.read(23)
+        assert 'line1\nline2\nline3\nline4' == buf.getvalue()
+
+    def test_iter_lines(self):
+        """Test iterating over lines like str.split('\\n')."""
+
+        buf = self.append_parts(LogBuffer())
+
+        assert ['line1', 'line2', 'line3', 'line4'] == list(buf.iter_lines())
+        assert ['line3', 'line4'] == list(buf.iter_lines(start=2))
+
+        buf.append('\n')
+
+        assert ['line4', ''] == list(buf.iter_lines(start=3))
+
+    def test_multibyte(self):
+        """Test the length of the buffer is in bytes."""
+
+        buf = LogBuffer()
+        buf.append('café\n')
+
+        assert 6 == len(buf)
+        assert ['café', ''] == list(buf.iter_lines())
+
+    def test_spill(self):
+        """Test the buffer moving to a temporary file past the spill size."""
+
+        buf = self.append_parts(LogBuffer(spill_size=10))
+
+        assert buf.spilled
+        assert 23 == len(buf)
+        assert b'ne1\nl' == buf.read(2, 5)
+        assert ['line2', 'line3', 'line4'] == list(buf.iter_lines(start=1))
+
+        buf.close()
+
+        assert not buf.spilled
+        assert 0 == len(buf)
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestRunningJobStderrBuffer(unittest.TestCase):
+    """Test RunningJob stderr with the log buffer."""
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_stderr_multibyte_range(self, get_status, get_stderr):
+        """Test the stderr Range offset is in bytes."""
+
+        get_status.return_value = 'RUNNING'
+        get_stderr.side_effect = [fake_log_response('café\n'),
+                                  fake_log_response('ok\n', 206, 'bytes 6-8/9')]
+
+        running_job = pygenie.jobs.RunningJob('1234-stderr-multibyte',
+                                              info={'status': 'RUNNING'})
+        running_job.stderr()
+        lines = running_job.stderr(iterator=True)
+
+        assert ['café', 'ok', ''] == list(lines)
+        assert (
+            [
+                call('1234-stderr-multibyte', 'stderr', headers=None),
+                call('1234-stderr-multibyte', 'stderr', headers={'Range': 'bytes=6-'})
+            ] ==
+            get_stderr.call_args_list)
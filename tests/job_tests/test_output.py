@@ -0,0 +1,139 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+from mock import patch
+
+import pygenie
+
+from pygenie.jobs.output import fetch_output, list_output
+
+from ..utils import fake_log_response
+
+
+OUTPUT_TREE = {
+    'output/': {
+        'files': [{'name': 'stdout', 'size': 6},
+                  {'name': 'stderr', 'size': 3}],
+        'directories': [{'name': 'genie/'}]
+    },
+    'output/genie/': {
+        'files': [{'name': 'genie/command.sh', 'size': 9}],
+        'directories': [{'name': 'genie/logs/'}]
+    },
+    'output/genie/logs/': {
+        'files': [{'name': 'genie/logs/genie.log', 'size': 4},
+                  {'name': 'genie/logs/env.log', 'size': 3}],
+        'directories': []
+    }
+}
+
+CONTENT = {
+    'stdout': b'out\nok',
+    'stderr': b'err',
+    'genie/command.sh': b'#!/bin/sh',
+    'genie/logs/genie.log': b'log\n',
+    'genie/logs/env.log': b'A=1',
+}
+
+
+class FakeTreeAdapter(object):
+    """Adapter serving a job output directory tree."""
+
+    def __init__(self):
+        self.listed = list()
+
+    def get(self, job_id, path=None, if_not_found=None, **kwargs):
+        self.listed.append(path)
+        return OUTPUT_TREE.get(path, if_not_found)
+
+    def get_log_response(self, job_id, path, **kwargs):
+        response = fake_log_response('')
+        response._content = CONTENT[path]
+        return response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestOutputTree(unittest.TestCase):
+    """Test listing and fetching a job's output directory tree."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_list_output(self):
+        """Test listing the output directory recursively."""
+
+        adapter = FakeTreeAdapter()
+
+        files = list_output(adapter, 'job')
+
+        assert ['genie/command.sh', 'genie/logs/env.log', 'genie/logs/genie.log',
+                'stderr', 'stdout'] == [f['path'] for f in files]
+        assert 'env.log' == files[1]['name']
+        assert 3 == files[1]['size']
+        assert ['output/', 'output/genie/', 'output/genie/logs/'] == adapter.listed
+
+    def test_list_output_not_recursive(self):
+        """Test listing one directory."""
+
+        files = list_output(FakeTreeAdapter(), 'job', path='genie',
+                            recursive=False)
+
+        assert ['genie/command.sh'] == [f['path'] for f in files]
+
+    def test_list_output_pattern(self):
+        """Test filtering the listing with glob patterns."""
+
+        adapter = FakeTreeAdapter()
+
+        assert ['genie/logs/env.log', 'genie/logs/genie.log'] == \
+            [f['path'] for f in list_output(adapter, 'job', pattern='*.log')]
+        assert ['genie/command.sh', 'stdout'] == \
+            [f['path'] for f in list_output(adapter, 'job',
+                                            pattern=['std*t', 'genie/*.sh'])]
+
+    def test_list_output_not_found(self):
+        """Test listing a missing directory."""
+
+        assert [] == list_output(FakeTreeAdapter(), 'job', path='missing')
+
+    def test_fetch_output(self):
+        """Test fetching files into a local directory."""
+
+        adapter = FakeTreeAdapter()
+        files = list_output(adapter, 'job', pattern=['genie/*', 'stdout'])
+
+        fetched = fetch_output(adapter, 'job', self.tmp_dir, files)
+
+        assert sorted(f['path'] for f in files) == sorted(fetched)
+        for path, dest in fetched.items():
+            assert os.path.join(self.tmp_dir, path) == dest
+            with open(dest, 'rb') as fetched_file:
+                assert CONTENT[path] == fetched_file.read()
+
+    def test_fetch_output_invalid_path(self):
+        """Test paths outside of the local directory are not written."""
+
+        with pytest.raises(ValueError):
+            fetch_output(FakeTreeAdapter(), 'job', self.tmp_dir,
+                         [{'path': '../stdout', 'size': 6}])
+
+    def test_running_job_fetch_output(self):
+        """Test RunningJob().output_files() and fetch_output()."""
+
+        running_job = pygenie.jobs.RunningJob('1234-output',
+                                              adapter=FakeTreeAdapter())
+
+        assert 5 == len(running_job.output_files())
+
+        fetched = running_job.fetch_output(self.tmp_dir, pattern='genie/logs/*')
+
+        assert {'genie/logs/env.log', 'genie/logs/genie.log'} == set(fetched)
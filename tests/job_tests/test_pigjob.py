@@ -8,6 +8,8 @@ from mock import patch
 
 import pygenie
 
+from pygenie.adapter.multipart import AttachmentFile
+
 
 def mock_to_attachment(att):
     if isinstance(att, dict):
@@ -369,13 +371,11 @@ class TestingPigJobAdapters(unittest.TestCase):
                 u'version': u'0.0.pig'
             })
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
-    def test_genie3_payload_adhoc_script(self, os_isfile, file_open):
+    def test_genie3_payload_adhoc_script(self, os_isfile):
         """Test PigJob payload for Genie 3 (adhoc script)."""
 
         os_isfile.side_effect = lambda f: f.startswith('/')
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.PigJob(self.genie_3_conf) \
             .applications(['pig_app_1']) \
@@ -407,11 +407,11 @@ class TestingPigJobAdapters(unittest.TestCase):
             {
                 'applications': ['pig_app_1'],
                 'attachments': [
-                    ('pigfile1', "open file '/pigfile1'"),
-                    ('pigfile2', "open file '/pigfile2'"),
-                    ('pig_param1.params', "open file '/pig_param1.params'"),
-                    ('pig_param2.params', "open file '/pig_param2.params'"),
-                    ('my_properties_local.conf', "open file '/my_properties_local.conf'"),
+                    ('pigfile1', AttachmentFile('/pigfile1')),
+                    ('pigfile2', AttachmentFile('/pigfile2')),
+                    ('pig_param1.params', AttachmentFile('/pig_param1.params')),
+                    ('pig_param2.params', AttachmentFile('/pig_param2.params')),
+                    ('my_properties_local.conf', AttachmentFile('/my_properties_local.conf')),
                     ('script.pig', 'A = LOAD;'),
                     ('_pig_parameters.txt', 'param1 = "1"\nparam2 = "2"')
                 ],
@@ -442,15 +442,13 @@ class TestingPigJobAdapters(unittest.TestCase):
             } ==
             pygenie.adapter.genie_3.get_payload(job))
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
     @patch('pygenie.jobs.pig.is_file')
-    def test_genie3_payload_file_script(self, is_file, os_isfile, file_open):
+    def test_genie3_payload_file_script(self, is_file, os_isfile):
         """Test PigJob payload for Genie 3 (file script)."""
 
         os_isfile.return_value = True
         is_file.return_value = True
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.PigJob(self.genie_3_conf) \
             .applications(['pigapp1']) \
@@ -473,8 +471,8 @@ class TestingPigJobAdapters(unittest.TestCase):
             {
                 'applications': ['pigapp1'],
                 'attachments': [
-                    ('pigfile1', "open file '/pigfile1'"),
-                    ('script.pig', "open file '/path/to/test/script.pig'")
+                    ('pigfile1', AttachmentFile('/pigfile1')),
+                    ('script.pig', AttachmentFile('/path/to/test/script.pig'))
                 ],
                 'clusterCriterias': [
                     {'tags': ['type:pigcluster1']},
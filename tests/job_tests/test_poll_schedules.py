@@ -0,0 +1,142 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+import pytest
+from mock import call, patch
+
+import pygenie
+
+from pygenie.conf import GenieConf
+from pygenie.exceptions import JobTimeoutError
+from pygenie.jobs.poll_schedules import (DecorrelatedJitterSchedule,
+                                         ExponentialBackoffSchedule,
+                                         FixedSchedule,
+                                         StatusAwareSchedule,
+                                         get_poll_schedule)
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestPollSchedules(unittest.TestCase):
+    """Test poll schedules."""
+
+    def test_fixed(self):
+        """Test fixed schedule."""
+
+        schedule = FixedSchedule(7)
+
+        assert [7, 7, 7] == [schedule(i) for i in range(3)]
+
+    def test_exponential(self):
+        """Test exponential backoff schedule with cap."""
+
+        schedule = ExponentialBackoffSchedule(initial=1, factor=2, max_interval=10)
+
+        assert [1, 2, 4, 8, 10, 10] == [schedule(i) for i in range(6)]
+        assert 10 == schedule(10000)
+
+    def test_exponential_jitter(self):
+        """Test exponential backoff schedule with full jitter."""
+
+        schedule = ExponentialBackoffSchedule(initial=1, max_interval=10, jitter=True)
+
+        assert all(0 <= schedule(i) <= min(10, 2 ** i) for i in range(10))
+
+    def test_decorrelated(self):
+        """Test decorrelated jitter schedule stays within bounds."""
+
+        schedule = DecorrelatedJitterSchedule(base=1, max_interval=20)
+
+        interval = None
+        for i in range(50):
+            new_interval = schedule(i, previous=interval)
+            assert 1 <= new_interval <= min(20, 3 * (interval or 1))
+            interval = new_interval
+
+    def test_status_aware(self):
+        """Test status aware schedule."""
+
+        schedule = StatusAwareSchedule(min_interval=2, max_interval=30)
+
+        assert 2 == schedule(5, status='INIT')
+        assert 2 == schedule(5, status='ACCEPTED')
+        assert 2 == schedule(0, status='RUNNING')
+        assert 16 == schedule(3, status='RUNNING')
+        assert 30 == schedule(10, status='RUNNING')
+
+    def test_deadline(self):
+        """Test intervals are tightened to not run past the deadline."""
+
+        schedule = FixedSchedule(30)
+
+        assert 5 == schedule(0, remaining=5)
+        assert 0 == schedule(0, remaining=-1)
+
+    def test_get_poll_schedule(self):
+        """Test getting poll schedules by name and from conf."""
+
+        conf = GenieConf()
+
+        assert 3 == get_poll_schedule(conf=conf, sleep_seconds=3).interval
+        assert isinstance(get_poll_schedule('exponential'), ExponentialBackoffSchedule)
+
+        conf.genie.set('poll_schedule', 'status')
+        conf.genie.set('poll_max_interval', '120')
+        schedule = get_poll_schedule(conf=conf)
+
+        assert isinstance(schedule, StatusAwareSchedule)
+        assert 120 == schedule(100, status='RUNNING')
+
+        with pytest.raises(ValueError):
+            get_poll_schedule('unknown')
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestRunningJobWaitSchedule(unittest.TestCase):
+    """Test RunningJob().wait() with poll schedules."""
+
+    @patch('pygenie.jobs.running.time.sleep')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_wait_fixed(self, get_status, sleep):
+        """Test waiting with the default fixed schedule."""
+
+        get_status.side_effect = ['INIT', 'RUNNING', 'RUNNING', 'SUCCEEDED']
+
+        running_job = pygenie.jobs.RunningJob('1234-wait-fixed')
+        running_job.wait(sleep_seconds=4, suppress_stream=True)
+
+        assert [call(4), call(4), call(4)] == sleep.call_args_list
+
+    @patch('pygenie.jobs.running.time.sleep')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_wait_status_schedule(self, get_status, sleep):
+        """Test waiting with a status aware schedule."""
+
+        get_status.side_effect = ['INIT', 'INIT', 'RUNNING', 'RUNNING',
+                                  'RUNNING', 'SUCCEEDED']
+
+        running_job = pygenie.jobs.RunningJob('1234-wait-status')
+        running_job.wait(poll_schedule=StatusAwareSchedule(min_interval=1,
+                                                           max_interval=60),
+                         suppress_stream=True)
+
+        assert [call(1), call(1), call(1), call(2), call(4)] == sleep.call_args_list
+
+    @patch('pygenie.jobs.running.time.time')
+    @patch('pygenie.jobs.running.time.sleep')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_wait_deadline(self, get_status, sleep, now):
+        """Test waiting shortens the sleep before the job timeout."""
+
+        get_status.return_value = 'RUNNING'
+        now.side_effect = [0, 0, 30, 55, 61, 61]
+
+        running_job = pygenie.jobs.RunningJob('1234-wait-deadline',
+                                              info={'id': '1234-wait-deadline',
+                                                    'status': 'RUNNING'})
+
+        with pytest.raises(JobTimeoutError):
+            running_job.wait(sleep_seconds=30, job_timeout=60, suppress_stream=True)
+
+        assert [call(30), call(5)] == sleep.call_args_list
@@ -0,0 +1,168 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+from mock import MagicMock, patch
+
+import pygenie
+
+from pygenie.adapter.genie_3 import Genie3Adapter
+from pygenie.exceptions import GenieJobNotFoundError
+from pygenie.jobs.poller import StatusPoller
+
+from ..utils import fake_response
+
+
+def search_response(statuses, number=0, total_pages=1):
+    response = fake_response({
+        '_embedded': {
+            'jobSearchResultList': [{'id': i, 'status': s} for i, s in statuses]
+        },
+        'page': {'number': number, 'totalPages': total_pages}
+    })
+    response._content = response._content.encode('utf-8')
+    return response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestStatusPoller(unittest.TestCase):
+    """Test polling job statuses for multiple jobs."""
+
+    def setUp(self):
+        self.adapter = MagicMock()
+        self.poller = StatusPoller(adapter=self.adapter, filters={'user': 'u'})
+        # do not start the polling thread, tests call poll() directly
+        self.poller._thread = MagicMock()
+        self.poller._thread.is_alive.return_value = True
+
+    def test_poll_resolves_finished(self):
+        """Test poll() resolving futures for finished jobs only."""
+
+        self.adapter.get_statuses.return_value = {'job-1': 'SUCCEEDED',
+                                                  'job-2': 'RUNNING'}
+
+        future_1 = self.poller.register('job-1')
+        future_2 = self.poller.register('job-2')
+        self.poller.poll()
+
+        self.adapter.get_statuses.assert_called_once_with(['job-1', 'job-2'],
+                                                          filters={'user': 'u'})
+        assert 'SUCCEEDED' == future_1.result(timeout=0)
+        assert not future_2.done()
+        assert 1 == len(self.poller)
+
+    def test_poll_until_running(self):
+        """Test poll() resolving futures waiting until running."""
+
+        self.adapter.get_statuses.return_value = {'job-1': 'RUNNING'}
+
+        future = self.poller.register('job-1', until_running=True)
+        self.poller.poll()
+
+        assert 'RUNNING' == future.result(timeout=0)
+
+    def test_poll_not_found(self):
+        """Test poll() setting an error for jobs which are not found."""
+
+        self.adapter.get_statuses.return_value = {}
+
+        future = self.poller.register('job-dne')
+        self.poller.poll()
+
+        with self.assertRaises(GenieJobNotFoundError):
+            future.result(timeout=0)
+
+    def test_poll_error(self):
+        """Test poll() keeping registrations when getting statuses fails."""
+
+        self.adapter.get_statuses.side_effect = [IOError, {'job-1': 'FAILED'}]
+
+        future = self.poller.register('job-1')
+        self.poller.poll()
+
+        assert not future.done()
+
+        self.poller.poll()
+
+        assert 'FAILED' == future.result(timeout=0)
+
+    def test_unregister(self):
+        """Test unregistering a job."""
+
+        future = self.poller.register('job-1')
+        self.poller.unregister(future)
+        self.poller.poll()
+
+        assert future.cancelled()
+        self.adapter.get_statuses.assert_not_called()
+
+    def test_polling_thread(self):
+        """Test the polling thread resolving futures and exiting."""
+
+        self.adapter.get_statuses.return_value = {'job-1': 'KILLED'}
+        poller = StatusPoller(adapter=self.adapter, interval=0)
+
+        assert 'KILLED' == poller.register('job-1').result(timeout=5)
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestGenie3AdapterGetStatuses(unittest.TestCase):
+    """Test getting statuses for multiple jobs from the jobs search endpoint."""
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    @patch('pygenie.adapter.genie_x.GenieBaseAdapter.call')
+    def test_get_statuses(self, genie_call, get_status):
+        """Test getting statuses with a search and a fallback for finished jobs."""
+
+        genie_call.side_effect = [
+            search_response([('batch-1', 'RUNNING'), ('other', 'RUNNING')],
+                            number=0, total_pages=2),
+            search_response([('batch-2', 'INIT')], number=1, total_pages=2),
+        ]
+        get_status.return_value = 'SUCCEEDED'
+
+        statuses = Genie3Adapter().get_statuses(['batch-1', 'batch-2', 'batch-3'],
+                                                filters={'user': 'u'})
+
+        assert {'batch-1': 'RUNNING',
+                'batch-2': 'INIT',
+                'batch-3': 'SUCCEEDED'} == statuses
+        assert 2 == genie_call.call_count
+        params = genie_call.call_args_list[0][1]['params']
+        assert 'batch-%' == params['id']
+        assert 'u' == params['user']
+        assert 'RUNNING' in params['status']
+        get_status.assert_called_once_with('batch-3')
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    @patch('pygenie.adapter.genie_x.GenieBaseAdapter.call')
+    def test_get_statuses_single(self, genie_call, get_status):
+        """Test getting statuses for one job uses the status endpoint."""
+
+        get_status.side_effect = GenieJobNotFoundError
+
+        assert {} == Genie3Adapter().get_statuses(['single'])
+        genie_call.assert_not_called()
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestRunningJobWaitPoller(unittest.TestCase):
+    """Test RunningJob().wait() with a status poller."""
+
+    @patch('pygenie.jobs.running.RunningJob.update')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
+    def test_wait_poller(self, get_status, update):
+        """Test waiting on a job status from a poller."""
+
+        adapter = MagicMock()
+        adapter.get_statuses.return_value = {'1234-poller': 'SUCCEEDED'}
+        poller = StatusPoller(adapter=adapter, interval=0)
+
+        running_job = pygenie.jobs.RunningJob('1234-poller',
+                                              info={'status': 'RUNNING'})
+        running_job.wait(poller=poller, sleep_seconds=0.01, suppress_stream=True)
+
+        get_status.assert_not_called()
+        assert 'SUCCEEDED' == running_job.status
+        update.assert_called_once_with(info_section='job')
@@ -10,6 +10,8 @@ from mock import patch
 
 import pygenie
 
+from pygenie.adapter.multipart import AttachmentFile
+
 
 def mock_to_attachment(att):
     if isinstance(att, dict):
@@ -307,13 +309,11 @@ class TestingPrestoJobAdapters(unittest.TestCase):
                 u'version': u'0.0.1presto'
             })
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
-    def test_genie3_payload_adhoc_script(self, os_isfile, file_open):
+    def test_genie3_payload_adhoc_script(self, os_isfile):
         """Test PrestoJob payload for Genie 3 (adhoc script)."""
 
         os_isfile.side_effect = lambda f: f.startswith('/')
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.PrestoJob(self.genie_3_conf) \
             .applications(['prestoapplicationid1']) \
@@ -337,8 +337,8 @@ class TestingPrestoJobAdapters(unittest.TestCase):
             {
                 u'applications': [u'prestoapplicationid1'],
                 u'attachments': [
-                    (u'prestofile1', u"open file '/prestofile1'"),
-                    (u'prestofile2', u"open file '/prestofile2'"),
+                    (u'prestofile1', AttachmentFile('/prestofile1')),
+                    (u'prestofile2', AttachmentFile('/prestofile2')),
                     (u'script.presto', u'SELECT * FROM DUAL\n;')
                 ],
                 u'clusterCriterias': [
@@ -361,15 +361,13 @@ class TestingPrestoJobAdapters(unittest.TestCase):
                 u'version': u'0.0.1presto'
             })
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
     @patch('pygenie.jobs.presto.is_file')
-    def test_genie3_payload_file_script(self, presto_is_file, os_isfile, file_open):
+    def test_genie3_payload_file_script(self, presto_is_file, os_isfile):
         """Test PrestoJob payload for Genie 3 (file script)."""
 
         os_isfile.return_value = True
         presto_is_file.return_value = True
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.PrestoJob(self.genie_3_conf) \
             .applications(['prestoapplicationid1']) \
@@ -393,9 +391,9 @@ class TestingPrestoJobAdapters(unittest.TestCase):
             {
                 u'applications': [u'prestoapplicationid1'],
                 u'attachments': [
-                    (u'prestofile1', u"open file '/prestofile1'"),
-                    (u'prestofile2', u"open file '/prestofile2'"),
-                    (u'file.presto', u"open file '/path/to/test/file.presto'")
+                    (u'prestofile1', AttachmentFile('/prestofile1')),
+                    (u'prestofile2', AttachmentFile('/prestofile2')),
+                    (u'file.presto', AttachmentFile('/path/to/test/file.presto'))
                 ],
                 u'clusterCriterias': [
                     {u'tags': [u'type:prestocluster1']},
@@ -0,0 +1,213 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+import pytest
+from mock import patch
+
+import pygenie
+
+from pygenie.jobs.results import (HiveDialect,
+                                  PrestoDialect,
+                                  ResultReader,
+                                  TSVDialect,
+                                  detect_format)
+
+from ..utils import fake_log_response
+
+
+PRESTO_OUTPUT = [
+    '"dateint","country","hours","active"',
+    '"20170101","US","1.5","true"',
+    '"20170101","Canada, CA","","false"',
+    '"20170102","say ""hi""","3","true"',
+]
+
+HIVE_OUTPUT = [
+    't.dateint\tt.country\tt.views',
+    '20170101\tUS\t10',
+    '20170102\t"quoted"\t\\N',
+]
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestDetectFormat(unittest.TestCase):
+    """Test detecting the output format of a job."""
+
+    def test_presto_output_format(self):
+        """Test Presto --output-format."""
+
+        assert (PrestoDialect, True) == \
+            detect_format('presto', '--output-format CSV_HEADER -f script.sql')
+        assert (TSVDialect, False) == \
+            detect_format('presto', '--output-format=TSV -f script.sql')
+        assert (PrestoDialect, False) == detect_format('presto', '-f script.sql')
+
+    def test_hive(self):
+        """Test Hive header from the tags or the print.header property."""
+
+        assert (HiveDialect, True) == \
+            detect_format('hive', '-f script.hql', ['headers'])
+        assert (HiveDialect, True) == \
+            detect_format('hive', '--hiveconf hive.cli.print.header=true -f x')
+        assert (HiveDialect, False) == detect_format('hive', '-f script.hql')
+
+    def test_unknown(self):
+        """Test an unknown command."""
+
+        assert (None, None) == detect_format('spark', '--class Foo')
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestResultReader(unittest.TestCase):
+    """Test reading tabular results."""
+
+    def test_presto(self):
+        """Test reading quoted CSV with type inference."""
+
+        reader = ResultReader(PRESTO_OUTPUT, dialect=PrestoDialect, header=True)
+
+        assert ['dateint', 'country', 'hours', 'active'] == reader.columns
+        assert ['int', 'str', 'float', 'bool'] == reader.types
+        assert [(20170101, 'US', 1.5, True),
+                (20170101, 'Canada, CA', None, False),
+                (20170102, 'say "hi"', 3.0, True)] == list(reader)
+
+    def test_hive(self):
+        """Test reading unquoted tab separated output."""
+
+        reader = ResultReader(HIVE_OUTPUT, dialect=HiveDialect, header=True)
+
+        assert [{'t.dateint': 20170101, 't.country': 'US', 't.views': 10},
+                {'t.dateint': 20170102, 't.country': '"quoted"', 't.views': None}] \
+            == list(reader.dicts())
+
+    def test_sniff(self):
+        """Test sniffing the dialect and header."""
+
+        reader = ResultReader(['name|count', 'a|1', 'b|2', 'c|3'])
+
+        assert '|' == reader.dialect.delimiter
+        assert ['name', 'count'] == reader.columns
+        assert [('a', 1), ('b', 2), ('c', 3)] == list(reader)
+
+    def test_no_header(self):
+        """Test generated column names and short rows."""
+
+        reader = ResultReader(['1,x', '2'], dialect=PrestoDialect, header=False)
+
+        assert ['c0', 'c1'] == reader.columns
+        assert [(1, 'x'), (2, None)] == list(reader)
+
+    def test_sample_size(self):
+        """Test types are inferred from the sample only."""
+
+        lines = (str(i) if i < 10 else 'x{}'.format(i) for i in range(20))
+        reader = ResultReader(lines, dialect=PrestoDialect, header=False,
+                              sample_size=5, types=['str'])
+
+        assert ['0', '1'] == [r[0] for r in reader][:2]
+        assert ['int'] == ResultReader(['1', '2', 'x'], dialect=PrestoDialect,
+                                       header=False, sample_size=2).types
+
+    def test_nonconforming_after_sample(self):
+        """Test values not matching the type inferred from the sample."""
+
+        lines = ['1,0.5', '2,1.5', 'N/A,x']
+        reader = ResultReader(lines, dialect=PrestoDialect, header=False,
+                              sample_size=2)
+
+        assert ['int', 'float'] == reader.types
+        assert [(1, 0.5), (2, 1.5), ('N/A', 'x')] == list(reader)
+
+    def test_nonconforming_numpy(self):
+        """Test numpy batches with values not matching the column type."""
+
+        pytest.importorskip('numpy')
+        reader = ResultReader(['1', '2', 'N/A'], dialect=PrestoDialect,
+                              header=False, sample_size=2)
+
+        batch = next(reader.batches(format='numpy'))
+
+        assert [1, 2, 'N/A'] == list(batch['c0'])
+
+    def test_duplicate_columns(self):
+        """Test repeated column names are made unique."""
+
+        reader = ResultReader(['"id","id","id_1","id"', '"1","2","3","4"'],
+                              dialect=PrestoDialect, header=True)
+
+        assert ['id', 'id_2', 'id_1', 'id_3'] == reader.columns
+        assert [{'id': 1, 'id_2': 2, 'id_1': 3, 'id_3': 4}] == list(reader.dicts())
+        assert ['a', 'a_1'] == ResultReader(['1,2'], columns=['a', 'a'],
+                                            dialect=PrestoDialect).columns
+
+    def test_batches(self):
+        """Test reading batches."""
+
+        reader = ResultReader(('{},{}'.format(i, i * 2) for i in range(25)),
+                              dialect=PrestoDialect, header=False)
+
+        batches = list(reader.batches(10, format='dicts'))
+
+        assert [10, 10, 5] == [len(b) for b in batches]
+        assert {'c0': 24, 'c1': 48} == batches[-1][-1]
+
+    def test_batches_invalid(self):
+        """Test an invalid batch format."""
+
+        with pytest.raises(ValueError):
+            list(ResultReader(['1']).batches(format='xml'))
+
+    def test_batches_numpy(self):
+        """Test numpy batches."""
+
+        numpy = pytest.importorskip('numpy')
+        reader = ResultReader(PRESTO_OUTPUT, dialect=PrestoDialect, header=True)
+
+        batch = next(reader.batches(format='numpy'))
+
+        assert numpy.int64 == batch['dateint'].dtype
+        assert numpy.isnan(batch['hours'][1])
+
+    def test_batches_pandas(self):
+        """Test pandas batches."""
+
+        pytest.importorskip('pandas')
+        reader = ResultReader(PRESTO_OUTPUT, dialect=PrestoDialect, header=True)
+
+        batch = next(reader.batches(format='pandas'))
+
+        assert ['dateint', 'country', 'hours', 'active'] == list(batch.columns)
+        assert 3 == len(batch)
+
+    def test_batches_arrow(self):
+        """Test Arrow batches."""
+
+        pytest.importorskip('pyarrow')
+        reader = ResultReader(PRESTO_OUTPUT, dialect=PrestoDialect, header=True)
+
+        batch = next(reader.batches(format='arrow'))
+
+        assert 3 == batch.num_rows
+        assert ['dateint', 'country', 'hours', 'active'] == batch.schema.names
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_running_job_results(self, get_log_response):
+        """Test RunningJob().results() using the job's output format."""
+
+        response = fake_log_response('')
+        response._content = '\n'.join(PRESTO_OUTPUT).encode('utf-8')
+        get_log_response.return_value = response
+
+        running_job = pygenie.jobs.RunningJob(
+            '1234-results',
+            info={'command_name': 'presto',
+                  'command_args': '--output-format CSV_HEADER -f script.sql',
+                  'tags': ['headers']})
+
+        results = running_job.results()
+
+        assert ['dateint', 'country', 'hours', 'active'] == results.columns
+        assert 3 == len(list(results))
@@ -7,6 +7,27 @@ from mock import call, patch
 
 import pygenie
 
+from ..utils import fake_log_response
+
+
+def stderr_responses(parts):
+    """Ranged log responses for stderr fetched in parts."""
+
+    responses = list()
+    offset = 0
+    for part in parts:
+        size = len(part.encode('utf-8'))
+        if offset == 0:
+            responses.append(fake_log_response(part))
+        elif size == 0:
+            responses.append(fake_log_response('', 416,
+                                               'bytes */{}'.format(offset)))
+        else:
+            responses.append(fake_log_response(part, 206, 'bytes {}-{}/{}' \
+                .format(offset, offset + size - 1, offset + size)))
+        offset += size
+    return responses
+
 
 @patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
 class TestingRunningJobIsDone(unittest.TestCase):
@@ -109,12 +130,15 @@ class TestingRunningJobUpdate(unittest.TestCase):
     def test_update_timeout(self, get):
         """Test calling update for RunningJob (with timeout)."""
 
-        get.side_effect = [{'_links':{'self':{'href':'http://example.com'}}},{},[],{},{},{},{}]
+        get.side_effect = lambda job_id, path=None, **kwargs: \
+            {None: {'_links':{'self':{'href':'http://example.com'}}},
+             'applications': []}.get(path, {})
 
         running_job = pygenie.jobs.RunningJob('1234-update-timeout')
         running_job.update(timeout=3)
 
-        assert (
+        # sections are requested concurrently so the call order can vary
+        self.assertCountEqual(
             [
                 call('1234-update-timeout', timeout=3),
                 call('1234-update-timeout', path='request', timeout=3),
@@ -123,7 +147,7 @@ class TestingRunningJobUpdate(unittest.TestCase):
                 call('1234-update-timeout', if_not_found={}, path='command', timeout=3),
                 call('1234-update-timeout', if_not_found={}, path='execution', timeout=3),
                 call('1234-update-timeout', if_not_found={}, path='output', timeout=3, headers={u'Accept': u'application/json'})
-            ] ==
+            ],
             get.call_args_list)
 
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get')
@@ -464,7 +488,7 @@ class TestingRunningStderr(unittest.TestCase):
     """Test RunningJob stderr log."""
 
     @patch('pygenie.jobs.running.RunningJob.update')
-    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stderr')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
     def test_update_stderr(self, get_status, get_stderr, update):
         """Test RunningJob() updating stderr."""
@@ -475,11 +499,11 @@ class TestingRunningStderr(unittest.TestCase):
             'SUCCEEDED',
             'SUCCEEDED'
         ]
-        get_stderr.side_effect = [
+        get_stderr.side_effect = stderr_responses([
             "line1\nline2\n",
             "line3\nline4\n",
             "line5\nline6\n"
-        ]
+        ])
 
         running_job = pygenie.jobs.RunningJob('1234-update-stderr',
                                               info={'status': 'RUNNING'})
@@ -489,14 +513,14 @@ class TestingRunningStderr(unittest.TestCase):
 
         assert (
             [
-                call('1234-update-stderr', headers=None),
-                call('1234-update-stderr', headers={'Range': 'bytes=12-'}),
-                call('1234-update-stderr', headers={'Range': 'bytes=24-'})
+                call('1234-update-stderr', 'stderr', headers=None),
+                call('1234-update-stderr', 'stderr', headers={'Range': 'bytes=12-'}),
+                call('1234-update-stderr', 'stderr', headers={'Range': 'bytes=24-'})
             ] ==
             get_stderr.call_args_list)
 
     @patch('pygenie.jobs.running.RunningJob.update')
-    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stderr')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
     def test_override_stderr_params(self, get_status, get_stderr, update):
         """Test RunningJob() updating stderr."""
@@ -507,11 +531,11 @@ class TestingRunningStderr(unittest.TestCase):
             'SUCCEEDED',
             'SUCCEEDED'
         ]
-        get_stderr.side_effect = [
+        get_stderr.side_effect = stderr_responses([
             "line1\nline2\n",
             "line3\nline4\n",
             "line5\nline6\n"
-        ]
+        ])
 
         running_job = pygenie.jobs.RunningJob('1234-update-stderr',
                                               info={'status': 'RUNNING'})
@@ -521,13 +545,13 @@ class TestingRunningStderr(unittest.TestCase):
 
         assert (
             [
-                call('1234-update-stderr', headers=None, timeout=1),
-                call('1234-update-stderr', headers={'Range': 'bytes=12-'}, timeout=1),
-                call('1234-update-stderr', headers={'Range': 'bytes=24-'}, timeout=1)
+                call('1234-update-stderr', 'stderr', headers=None, timeout=1),
+                call('1234-update-stderr', 'stderr', headers={'Range': 'bytes=12-'}, timeout=1),
+                call('1234-update-stderr', 'stderr', headers={'Range': 'bytes=24-'}, timeout=1)
             ] ==
             get_stderr.call_args_list)
 
-    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stderr')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
     def test_stderr_running(self, get_status, get_stderr):
         """Test RunningJob().stderr() for running job."""
@@ -543,7 +567,7 @@ class TestingRunningStderr(unittest.TestCase):
         ]
 
         get_status.return_value = 'RUNNING'
-        get_stderr.side_effect = stderr
+        get_stderr.side_effect = stderr_responses(stderr)
 
         running_job = pygenie.jobs.RunningJob('1234-stderr-running',
                                               info={'status': 'RUNNING'})
@@ -555,13 +579,14 @@ class TestingRunningStderr(unittest.TestCase):
 
             get_stderr.assert_called_with(
                 '1234-stderr-running',
+                'stderr',
                 headers={'Range': 'bytes={}-'.format(start)} if start > 0 else None)
 
         assert 36 == len(running_job._cached_stderr)
 
     @patch('pygenie.jobs.running.RunningJob.update')
     @patch('pygenie.jobs.running.RunningJob._write_to_stream')
-    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stderr')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
     def test_stderr_watch(self, get_status, get_stderr, write_to_stream, update):
         """Test RunningJob().watch_stderr()."""
@@ -574,11 +599,11 @@ class TestingRunningStderr(unittest.TestCase):
             'RUNNING',
             'SUCCEEDED'
         ]
-        get_stderr.side_effect = [
+        get_stderr.side_effect = stderr_responses([
             "line1\nline2\n",
             "line3\nline4\n",
             "line5\nline6\n"
-        ]
+        ])
 
         running_job = pygenie.jobs.RunningJob('1234-watch-stderr',
                                               info={'status': 'RUNNING'})
@@ -594,7 +619,7 @@ class TestingRunningStderr(unittest.TestCase):
             ] ==
             write_to_stream.call_args_list)
 
-    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stderr')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get_status')
     def test_stderr_running_zero_bytes(self, get_status, get_stderr):
         """Test RunningJob().stderr() for running job (0 stderr bytes)."""
@@ -612,7 +637,7 @@ class TestingRunningStderr(unittest.TestCase):
         ]
 
         get_status.return_value = 'RUNNING'
-        get_stderr.side_effect = stderr
+        get_stderr.side_effect = stderr_responses(stderr)
 
         running_job = pygenie.jobs.RunningJob('1234-stderr-running-zero-bytes',
                                               info={'status': 'RUNNING'})
@@ -624,9 +649,10 @@ class TestingRunningStderr(unittest.TestCase):
 
             get_stderr.assert_called_with(
                 '1234-stderr-running-zero-bytes',
+                'stderr',
                 headers=None)
 
-        assert '' == running_job._cached_stderr
+        assert 0 == len(running_job._cached_stderr)
 
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get_info_for_rj')
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get_stderr')
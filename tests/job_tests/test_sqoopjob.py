@@ -8,6 +8,8 @@ from mock import patch
 
 import pygenie
 
+from pygenie.adapter.multipart import AttachmentFile
+
 
 def mock_to_attachment(att):
     if isinstance(att, dict):
@@ -282,13 +284,11 @@ class TestingSqoopJobAdapters(unittest.TestCase):
                 u'version': u'0.0.1sqoop'
             })
 
-    @patch('pygenie.adapter.genie_3.open')
     @patch('os.path.isfile')
-    def test_genie3_payload(self, os_isfile, file_open):
+    def test_genie3_payload(self, os_isfile):
         """Test SqoopJob payload for Genie 3."""
 
         os_isfile.side_effect = lambda f: f.startswith('/')
-        file_open.side_effect = lambda f, m: u"open file '{}'".format(f)
 
         job = pygenie.jobs.SqoopJob(self.genie_3_conf) \
             .applications(['sqoop-app-id1']) \
@@ -319,8 +319,8 @@ class TestingSqoopJobAdapters(unittest.TestCase):
             {
                 u'applications': [u'sqoop-app-id1'],
                 u'attachments': [
-                    (u'sqoopfile1a', u"open file '/sqoopfile1a'"),
-                    (u'sqoopfile2b', u"open file '/sqoopfile2b'"),
+                    (u'sqoopfile1a', AttachmentFile('/sqoopfile1a')),
+                    (u'sqoopfile2b', AttachmentFile('/sqoopfile2b')),
                     (u'_sqoop_options.txt', u"--username\n'user-g3'\n--password\n't3st-g3'\n--opt1-g3\n'val1-g3'\n--connect\n'jdbc://test-g3'\n")
                 ],
                 u'clusterCriterias': [
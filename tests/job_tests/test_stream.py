@@ -0,0 +1,118 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import gzip
+import io
+import unittest
+
+import pytest
+from mock import MagicMock, patch
+
+import pygenie
+
+from pygenie.jobs.stream import (decompress_chunks,
+                                 iter_decoded_lines,
+                                 prefetch_chunks,
+                                 stream_output)
+
+from ..utils import fake_log_response
+
+
+def gzipped(data):
+    out = io.BytesIO()
+    with gzip.GzipFile(fileobj=out, mode='wb') as gz:
+        gz.write(data)
+    return out.getvalue()
+
+
+def byte_response(data):
+    response = fake_log_response('')
+    response._content = data
+    return response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestStream(unittest.TestCase):
+    """Test streaming job output."""
+
+    def test_iter_decoded_lines(self):
+        """Test decoding lines split across chunks."""
+
+        data = 'a,1\r\ncafé,2\nlast'.encode('utf-8')
+        chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+
+        assert ['a,1', 'café,2', 'last'] == list(iter_decoded_lines(chunks))
+        assert ['x', ''] == list(iter_decoded_lines([b'x\n\n']))
+
+    def test_decompress_gzip(self):
+        """Test detecting and decompressing (multi-member) gzip data."""
+
+        data = gzipped(b'hello ') + gzipped(b'world')
+        chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+
+        assert b'hello world' == b''.join(decompress_chunks(chunks))
+        assert data == b''.join(decompress_chunks(chunks, compression=None))
+
+    def test_decompress_zstd(self):
+        """Test decompressing zstd data."""
+
+        zstandard = pytest.importorskip('zstandard')
+        data = zstandard.ZstdCompressor().compress(b'hello zstd')
+
+        assert b'hello zstd' == b''.join(decompress_chunks([data[:5], data[5:]]))
+
+    def test_decompress_invalid(self):
+        """Test an invalid compression."""
+
+        with pytest.raises(ValueError):
+            list(decompress_chunks([b'x'], compression='lz4'))
+
+    def test_prefetch(self):
+        """Test reading ahead with a bounded queue."""
+
+        chunks = [b'%d' % i for i in range(20)]
+
+        assert chunks == list(prefetch_chunks(iter(chunks), 2))
+
+    def test_prefetch_error(self):
+        """Test errors reading ahead are raised to the consumer."""
+
+        def chunks():
+            yield b'a'
+            raise IOError('connection reset')
+
+        stream = prefetch_chunks(chunks(), 2)
+
+        assert b'a' == next(stream)
+        with pytest.raises(IOError):
+            next(stream)
+
+    def test_stream_output(self):
+        """Test streaming output chunks and lines."""
+
+        adapter = MagicMock()
+        adapter.get_log_response.side_effect = \
+            lambda *args, **kwargs: byte_response(gzipped(b'l1\nl2\n' * 1000))
+
+        chunks = list(stream_output(adapter, 'job', 'out.gz', chunk_size=100,
+                                    compression=None))
+        lines = list(stream_output(adapter, 'job', 'out.gz', chunk_size=100,
+                                   lines=True, prefetch=4))
+
+        assert all(len(c) <= 100 for c in chunks)
+        assert 2000 == len(lines)
+        assert ['l1', 'l2'] == lines[:2]
+        adapter.get_log_response.assert_called_with('job', 'out.gz', stream=True)
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_running_job_stream(self, get_log_response):
+        """Test RunningJob().stream()."""
+
+        get_log_response.return_value = byte_response(b'a\nb\n')
+
+        running_job = pygenie.jobs.RunningJob('1234-stream',
+                                              info={'status': 'SUCCEEDED'})
+
+        assert ['a', 'b'] == list(running_job.stream(lines=True))
+        get_log_response.assert_called_once_with('1234-stream', 'stdout',
+                                                 stream=True)
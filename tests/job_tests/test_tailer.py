@@ -0,0 +1,134 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+from mock import MagicMock, call, patch
+
+import pygenie
+
+from pygenie.adapter.genie_2 import Genie2Adapter
+from pygenie.adapter.genie_3 import Genie3Adapter
+from pygenie.jobs.tailer import LogTailer, parse_content_range
+
+from ..utils import fake_log_response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestLogTailer(unittest.TestCase):
+    """Test tailing job logs with Range requests."""
+
+    def setUp(self):
+        self.adapter = MagicMock(spec=Genie3Adapter)
+        self.adapter.LOG_PATHS = Genie3Adapter.LOG_PATHS
+        self.tailer = LogTailer(self.adapter, 'job-tail', 'genie.log')
+
+    def ranges(self):
+        return [c[1]['headers'] for c in self.adapter.get_log_response.call_args_list]
+
+    def test_parse_content_range(self):
+        """Test parsing Content-Range headers."""
+
+        assert (100, 199, 1000) == parse_content_range('bytes 100-199/1000')
+        assert (0, 9, None) == parse_content_range('bytes 0-9/*')
+        assert (None, None, 1000) == parse_content_range('bytes */1000')
+        assert (None, None, None) == parse_content_range('items 0-9/10')
+        assert (None, None, None) == parse_content_range(None)
+
+    def test_poll(self):
+        """Test polling appends ranges and tracks the byte offset."""
+
+        self.adapter.get_log_response.side_effect = [
+            fake_log_response('abc\n'),
+            fake_log_response('dé\n', 206, 'bytes 4-7/8'),
+            fake_log_response('', 416, 'bytes */8')
+        ]
+
+        assert ['abc\n', 'dé\n', ''] == [self.tailer.poll() for _ in range(3)]
+        assert 8 == self.tailer.offset
+        assert 8 == self.tailer.total
+        assert [None, {'Range': 'bytes=4-'}, {'Range': 'bytes=8-'}] == self.ranges()
+        self.adapter.get_log_response.assert_called_with(
+            'job-tail', 'genie/logs/genie.log', headers={'Range': 'bytes=8-'})
+
+    def test_poll_overlap(self):
+        """Test bytes already fetched are dropped from overlapping ranges."""
+
+        self.adapter.get_log_response.side_effect = [
+            fake_log_response('abcd'),
+            fake_log_response('cdef', 206, 'bytes 2-5/6')
+        ]
+
+        self.tailer.poll()
+
+        assert 'ef' == self.tailer.poll()
+        assert 'abcdef' == self.tailer.text()
+
+    def test_poll_range_ignored(self):
+        """Test a 200 response to a Range request (whole log returned)."""
+
+        self.adapter.get_log_response.side_effect = [
+            fake_log_response('abcd'),
+            fake_log_response('abcdefg')
+        ]
+
+        self.tailer.poll()
+
+        assert 'efg' == self.tailer.poll()
+        assert 7 == self.tailer.offset
+
+    def test_poll_truncated(self):
+        """Test fetching from the start when the log was truncated."""
+
+        self.adapter.get_log_response.side_effect = [
+            fake_log_response('abcdefgh'),
+            fake_log_response('', 416, 'bytes */3'),
+            fake_log_response('xyz')
+        ]
+
+        self.tailer.poll()
+
+        assert 'xyz' == self.tailer.poll()
+        assert 'xyz' == self.tailer.text()
+        assert 1 == self.tailer.truncations
+        assert [None, {'Range': 'bytes=8-'}, None] == self.ranges()
+
+    def test_poll_split_multibyte(self):
+        """Test a multibyte character split across polls."""
+
+        response = fake_log_response('', 206, 'bytes 1-2/3')
+        response._content = 'é'.encode('utf-8')[1:]
+        first = fake_log_response('')
+        first._content = 'é'.encode('utf-8')[:1]
+        self.adapter.get_log_response.side_effect = [first, response]
+
+        assert '' == self.tailer.poll()
+        assert 'é' == self.tailer.poll()
+
+    def test_genie_2_log_paths(self):
+        """Test log names are resolved with the adapter's log paths."""
+
+        tailer = LogTailer(Genie2Adapter(), 'job-tail', 'stderr')
+
+        assert 'stderr.log' == tailer.path
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestRunningJobTailer(unittest.TestCase):
+    """Test RunningJob().tailer()."""
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get_log_response')
+    def test_tailer(self, get_log_response):
+        """Test getting tailers for job logs."""
+
+        get_log_response.return_value = fake_log_response('spark\n')
+
+        running_job = pygenie.jobs.RunningJob('1234-tailer',
+                                              info={'status': 'RUNNING'})
+        tailer = running_job.tailer('spark.log')
+
+        assert tailer is running_job.tailer('spark.log')
+        assert tailer is not running_job.tailer('stdout')
+        assert 'spark\n' == tailer.poll()
+        assert [call('1234-tailer', 'spark.log', headers=None)] == \
+            get_log_response.call_args_list
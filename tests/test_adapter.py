@@ -1,20 +1,40 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import gzip
+import os
+import shutil
+import subprocess
+import tempfile
 import unittest
 
 import pytest
 from mock import call, patch
 
-from pygenie.adapter.genie_3 import Genie3Adapter, get_payload
+from pygenie.adapter.adapter import submit_many
+from pygenie.adapter.genie_3 import (Genie3Adapter,
+                                    compress_attachments,
+                                    get_payload,
+                                    get_submit_payload)
+from pygenie.adapter.multipart import AttachmentFile
 from pygenie.adapter.genie_x import substitute
 from pygenie.conf import GenieConf
-from pygenie.exceptions import GenieHTTPError, GenieLogNotFoundError
+from pygenie.exceptions import (GenieHTTPError,
+                                GenieJobNotFoundError,
+                                GenieLogNotFoundError)
 from pygenie.jobs import PrestoJob
 
 from .utils import fake_response
 
 
+def info_side_effect(job_id, path=None, **kwargs):
+    if path is None:
+        return {'_links':{'self':{'href':'http://example.com'}}}
+    if path == 'applications':
+        return [{'id': 'app1'}]
+    return {}
+
+
 @patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
 class TestStringSubstitution(unittest.TestCase):
     """Test script parameter substitution."""
@@ -127,6 +147,18 @@ class TestGenie3Adapter(unittest.TestCase):
         with pytest.raises(GenieLogNotFoundError):
             adapter.get_stderr('job_id_dne')
 
+    @patch('requests.sessions.Session.request')
+    def test_log_response_range_not_satisfiable(self, request):
+        """Test Genie 3 adapter returning 416 log responses for Range requests."""
+
+        request.return_value = fake_response(None, status_code=416)
+
+        response = Genie3Adapter().get_log_response('job_id', 'stderr',
+                                                    headers={'Range': 'bytes=10-'})
+
+        assert 416 == response.status_code
+        assert 1 == request.call_count
+
     def test_set_job_name_with_script_has_params(self):
         """Test Genie 3 adapter setting job name (if not set) with script containing parameters."""
 
@@ -142,12 +174,13 @@ class TestGenie3Adapter(unittest.TestCase):
     def test_get_info_for_rj_all(self, get):
         """Test Genie 3 adapter get info call for job (all)."""
 
-        get.side_effect = [{'_links':{'self':{'href':'http://example.com'}}},{},[],{},{},{},{}]
+        get.side_effect = info_side_effect
 
         adapter = Genie3Adapter()
         adapter.get_info_for_rj('111-all')
 
-        assert (
+        # sections are requested concurrently so the call order can vary
+        self.assertCountEqual(
             [
                 call('111-all', timeout=30),
                 call('111-all', path='request', timeout=30),
@@ -156,7 +189,7 @@ class TestGenie3Adapter(unittest.TestCase):
                 call('111-all', path='command', timeout=30, if_not_found={}),
                 call('111-all', path='execution', timeout=30, if_not_found={}),
                 call('111-all', path='output', timeout=30, headers={'Accept': 'application/json'}, if_not_found={})
-            ] ==
+            ],
             get.call_args_list)
 
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get')
@@ -164,19 +197,12 @@ class TestGenie3Adapter(unittest.TestCase):
         """Test Genie 3 adapter get info call for job (all) (with timeout)."""
 
 
-        get.side_effect = [
-            {'_links':{'self':{'href':'http://example.com'}}},
-            {},
-            [],
-            {},
-            {},
-            {},
-            {}
-        ]
+        get.side_effect = info_side_effect
+
         adapter = Genie3Adapter()
         adapter.get_info_for_rj('111-all-timeout', timeout=1)
 
-        assert (
+        self.assertCountEqual(
             [
                 call('111-all-timeout', timeout=1),
                 call('111-all-timeout', path='request', timeout=1),
@@ -185,9 +211,43 @@ class TestGenie3Adapter(unittest.TestCase):
                 call('111-all-timeout', path='command', timeout=1, if_not_found={}),
                 call('111-all-timeout', path='execution', timeout=1, if_not_found={}),
                 call('111-all-timeout', path='output', timeout=1, headers={'Accept': 'application/json'}, if_not_found={})
-            ] ==
+            ],
             get.call_args_list)
 
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get')
+    def test_get_info_for_rj_all_sequential(self, get):
+        """Test Genie 3 adapter get info call for job (all) with one worker."""
+
+        get.side_effect = info_side_effect
+
+        conf = GenieConf()
+        conf.genie.set('info_max_workers', '1')
+        adapter = Genie3Adapter(conf=conf)
+        info = adapter.get_info_for_rj('111-all-sequential')
+
+        assert 7 == get.call_count
+        assert 'app1' == info['application_name']
+        assert 'http://example.com' == info['json_link']
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.get')
+    def test_get_info_for_rj_section_error(self, get):
+        """Test Genie 3 adapter get info call raises after all sections are done."""
+
+        def side_effect(job_id, path=None, **kwargs):
+            if path in {'request', 'execution'}:
+                raise GenieJobNotFoundError(path)
+            return info_side_effect(job_id, path=path, **kwargs)
+
+        get.side_effect = side_effect
+
+        adapter = Genie3Adapter()
+
+        with pytest.raises(GenieJobNotFoundError) as err:
+            adapter.get_info_for_rj('111-section-error')
+
+        assert 'request' == str(err.value)
+        assert 7 == get.call_count
+
     @patch('pygenie.adapter.genie_3.Genie3Adapter.get')
     def test_get_info_for_rj_job(self, get):
         """Test Genie 3 adapter get info call for job (job section)."""
@@ -314,3 +374,100 @@ class TestGenie3AdapterDisableTimeout(unittest.TestCase):
         self.adapter.submit_job(job)
 
         assert None == genie_call.call_args[1]['timeout']
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestSubmitMany(unittest.TestCase):
+    """Test submitting multiple jobs concurrently."""
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.submit_job')
+    def test_submit_many(self, submit_job):
+        """Test submitting jobs with reattaching and per-job errors."""
+
+        def submit(job, **kwargs):
+            if job.get('job_id') == 'submit-many-409':
+                raise GenieHTTPError(fake_response({}, 409))
+            if job.get('job_id') == 'submit-many-500':
+                raise GenieHTTPError(fake_response({}, 500))
+
+        submit_job.side_effect = submit
+
+        job_ids = ['submit-many-{}'.format(i) for i in range(5)] \
+            + ['submit-many-409', 'submit-many-500']
+        jobs = [PrestoJob().job_id(job_id).script('select 1')
+                for job_id in job_ids]
+
+        running_jobs, errors = submit_many(jobs, max_in_flight=3)
+
+        assert 7 == submit_job.call_count
+        assert job_ids[:-1] == [rj._job_id for rj in running_jobs[:-1]]
+        assert running_jobs[-1] is None
+        assert [6] == list(errors)
+        assert 500 == errors[6].response.status_code
+
+    def test_submit_many_empty(self):
+        """Test submitting no jobs."""
+
+        assert ([], {}) == submit_many([])
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestCompressAttachments(unittest.TestCase):
+    """Test compressing large in-line attachments."""
+
+    def test_compress_attachments(self):
+        """Test large in-line attachments are gzipped and decompressed."""
+
+        script = 'SELECT 1;\n' * 1000
+        attachments, command_args = compress_attachments(
+            [('script.hive', script),
+             ('_hive_parameters.txt', 'SET a=1;'),
+             ('udfs.jar', AttachmentFile('/udfs.jar'))],
+            '-i _hive_parameters.txt -f script.hive',
+            1000)
+
+        assert ['script.hive.gz', '_hive_parameters.txt', 'udfs.jar'] == \
+            [name for name, _ in attachments]
+        assert script.encode('utf-8') == gzip.decompress(attachments[0][1])
+        assert '$(gzip -df script.hive.gz) -i _hive_parameters.txt -f script.hive' \
+            == command_args
+
+    def test_compress_attachments_none(self):
+        """Test the command line is unchanged without large attachments."""
+
+        assert ([('script.hive', b'SELECT 1')], '-f script.hive') == \
+            compress_attachments([('script.hive', 'SELECT 1')], '-f script.hive',
+                                 1000)
+
+    def test_decompress_command_line(self):
+        """Test the command line decompresses the attachment in a shell."""
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            attachments, command_args = compress_attachments(
+                [('script.hive', 'SELECT 1;')], '-f script.hive', 0)
+            with open(os.path.join(tmp_dir, attachments[0][0]), 'wb') as att:
+                att.write(attachments[0][1])
+
+            out = subprocess.check_output(['bash', '-c', 'echo ' + command_args],
+                                          cwd=tmp_dir)
+
+            assert b'-f script.hive\n' == out
+            with open(os.path.join(tmp_dir, 'script.hive')) as script:
+                assert 'SELECT 1;' == script.read()
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_submit_payload(self):
+        """Test the submit payload with compression enabled."""
+
+        conf = GenieConf()
+        conf.genie.set('compress_attachments_min_size', '10')
+        job = PrestoJob(conf) \
+            .job_id('1234-compress') \
+            .script('SELECT * FROM dual')
+
+        payload, attachments = get_submit_payload(job)
+
+        assert ['script.presto.gz'] == [name for name, _ in attachments]
+        assert payload['commandArgs'].startswith('$(gzip -df script.presto.gz) ')
@@ -0,0 +1,331 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+from mock import patch
+
+aiohttp = pytest.importorskip('aiohttp')
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pygenie.adapter.genie_3_async import AsyncGenie3Adapter
+from pygenie.async_utils import call_async
+from pygenie.client_async import AsyncGenie
+from pygenie.conf import GenieConf
+from pygenie.exceptions import (GenieCircuitOpenError,
+                                GenieHTTPError,
+                                GenieJobNotFoundError)
+from pygenie.jobs import HiveJob
+from pygenie.jobs.running_async import AsyncRunningJob
+from pygenie.throttling import Throttler
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeGenie(object):
+    """Minimal Genie 3 server for asyncio tests."""
+
+    def __init__(self):
+        self.requests = list()
+        self.statuses = list()
+        self.stderr = b''
+        self.ranges = list()
+        self.submit_statuses = list()
+        self.attachments = list()
+        self.app = web.Application()
+        self.app.router.add_route('*', '/{tail:.*}', self.handle)
+
+    async def handle(self, request):
+        self.requests.append((request.method, request.path_qs))
+        self.ranges.append(request.headers.get('Range'))
+        path = request.path
+
+        if path == '/api/v3/jobs/missing/status':
+            return web.json_response({}, status=404)
+        if path.endswith('/status'):
+            return web.json_response({'status': self.statuses.pop(0)})
+        if path == '/api/v3/jobs/1234':
+            return web.json_response({
+                'id': '1234',
+                'status': 'SUCCEEDED',
+                '_links': {'self': {'href': 'http://genie/api/v3/jobs/1234'}}
+            })
+        if path == '/api/v3/jobs/1234/applications':
+            return web.json_response([{'id': 'spark'}])
+        if path == '/api/v3/jobs/1234/output/stderr':
+            start = int(request.headers.get('Range', 'bytes=0-')[6:-1])
+            if start >= len(self.stderr):
+                return web.Response(status=416)
+            return web.Response(
+                body=self.stderr[start:],
+                status=206 if start else 200,
+                headers={'Content-Range': 'bytes {}-{}/{}'.format(
+                    start, len(self.stderr) - 1, len(self.stderr))})
+        if path.startswith('/api/v3/jobs/1234/'):
+            return web.json_response({'id': path.rsplit('/', 1)[-1]})
+        if path == '/api/v3/jobs' and request.method == 'POST':
+            form = await request.post()
+            self.attachments.append([(f.filename, f.file.read())
+                                     for f in form.getall('attachment', [])])
+            return web.json_response({}, status=self.submit_statuses.pop(0))
+        if path == '/api/v3/jobs' and request.method == 'GET':
+            page = int(request.query['page'])
+            return web.json_response({
+                '_embedded': {'jobSearchResultList': [{'id': 'job-{}'.format(page)}]},
+                'page': {'number': page, 'totalPages': 3}
+            })
+        if path == '/api/v3/clusters':
+            return web.json_response({
+                '_embedded': {'clusterList': [{'id': 'c1'}, {'id': 'c2'}]},
+                'page': {'number': 0, 'totalPages': 1}
+            })
+        return web.json_response({}, status=500)
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestAsync(unittest.TestCase):
+    """Test asyncio adapter, running job and client."""
+
+    def serve(self, test):
+        fake = FakeGenie()
+
+        async def runner():
+            server = TestServer(fake.app)
+            await server.start_server()
+            conf = GenieConf()
+            conf.genie.set('url', str(server.make_url('')).rstrip('/'))
+            try:
+                await test(fake, conf)
+            finally:
+                await server.close()
+
+        run(runner())
+        return fake
+
+    def test_call_async_404_none(self):
+        """Test call_async() returning None on 404."""
+
+        async def test(fake, conf):
+            resp = await call_async(conf.genie.url + '/api/v3/jobs/missing/status',
+                                    none_on_404=True)
+            assert resp is None
+
+        self.serve(test)
+
+    @patch('pygenie.async_utils.asyncio.sleep')
+    def test_call_async_retries(self, sleep):
+        """Test call_async() retrying non-2xx responses."""
+
+        async def no_sleep(_):
+            pass
+
+        sleep.side_effect = no_sleep
+
+        async def test(fake, conf):
+            with pytest.raises(GenieHTTPError):
+                await call_async(conf.genie.url + '/unknown', attempts=3, backoff=0)
+
+        fake = self.serve(test)
+
+        assert 3 == len(fake.requests)
+
+    @patch('pygenie.async_utils.asyncio.sleep')
+    def test_submit_job_retry(self, sleep):
+        """Test each submit attempt sends the attachment files."""
+
+        async def no_sleep(_):
+            pass
+
+        sleep.side_effect = no_sleep
+        tmp_dir = tempfile.mkdtemp()
+        script = os.path.join(tmp_dir, 'script.hql')
+        with open(script, 'w') as script_file:
+            script_file.write('SELECT 1')
+
+        async def test(fake, conf):
+            fake.submit_statuses = [503, 202]
+            job = HiveJob(conf).job_id('1234').script(script)
+            async with AsyncGenie3Adapter(conf=conf) as adapter:
+                await adapter.submit_job(job)
+
+        try:
+            fake = self.serve(test)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        assert 2 == len(fake.attachments)
+        assert fake.attachments[0] == fake.attachments[1]
+        assert ('script.hql', b'SELECT 1') in fake.attachments[1]
+
+    @patch('pygenie.async_utils.asyncio.sleep')
+    def test_circuit_breaker(self, sleep):
+        """Test the adapter's requests go through the circuit breakers."""
+
+        async def no_sleep(_):
+            pass
+
+        sleep.side_effect = no_sleep
+
+        async def test(fake, conf):
+            conf.genie.set('circuit_breaker', 'true')
+            conf.genie.set('circuit_failure_threshold', '2')
+            async with AsyncGenie3Adapter(conf=conf) as adapter:
+                with pytest.raises(GenieCircuitOpenError):
+                    await adapter.call(url=conf.genie.url + '/unknown')
+
+        fake = self.serve(test)
+
+        assert 2 == len(fake.requests)
+
+    @patch('pygenie.throttling.time.sleep')
+    @patch('pygenie.async_utils.asyncio.sleep')
+    def test_call_async_throttled(self, sleep, time_sleep):
+        """Test rate limit waits are awaited instead of blocking."""
+
+        delays = list()
+
+        async def no_sleep(delay):
+            # aiohttp also yields with sleep(0)
+            if delay:
+                delays.append(delay)
+
+        sleep.side_effect = no_sleep
+        throttler = Throttler(rate=1, burst=1)
+
+        async def test(fake, conf):
+            for _ in range(2):
+                await call_async(conf.genie.url + '/api/v3/jobs/1234',
+                                 throttler=throttler)
+
+        self.serve(test)
+
+        assert 1 == len(delays)
+        assert 0.5 < delays[0] <= 1
+        assert not time_sleep.called
+
+    def test_get_info_for_rj(self):
+        """Test getting all info sections concurrently."""
+
+        async def test(fake, conf):
+            async with AsyncGenie3Adapter(conf=conf) as adapter:
+                info = await adapter.get_info_for_rj('1234')
+
+            assert '1234' == info['id']
+            assert 'spark' == info['application_name']
+            assert 'cluster' == info['cluster_id']
+            assert 'command' == info['command_id']
+
+        fake = self.serve(test)
+
+        assert 7 == len(fake.requests)
+
+    def test_running_job_wait(self):
+        """Test AsyncRunningJob.wait() polling until the job is done."""
+
+        async def test(fake, conf):
+            fake.statuses = ['INIT', 'RUNNING', 'SUCCEEDED']
+            async with AsyncGenie3Adapter(conf=conf) as adapter:
+                running_job = AsyncRunningJob('1234', adapter=adapter, conf=conf)
+                await running_job.wait(sleep_seconds=0)
+
+                assert running_job.is_done
+                assert 'SUCCEEDED' == await running_job.status
+
+        self.serve(test)
+
+    def test_running_job_stderr(self):
+        """Test AsyncRunningJob.stderr() only reading the new bytes."""
+
+        async def test(fake, conf):
+            async with AsyncGenie3Adapter(conf=conf) as adapter:
+                running_job = AsyncRunningJob('1234', adapter=adapter, conf=conf)
+
+                fake.stderr = 'caf\u00e9\n'.encode('utf-8')[:4]
+                assert 'caf' == await running_job.stderr()
+                fake.stderr = 'caf\u00e9\n\u00e9t\u00e9'.encode('utf-8')
+                assert 'caf\u00e9\n\u00e9t\u00e9' == await running_job.stderr()
+                assert ['caf\u00e9', '\u00e9t\u00e9'] == \
+                    await running_job.stderr(iterator=True)
+
+        fake = self.serve(test)
+
+        assert 'bytes=4-' == fake.ranges[1]
+        assert 'bytes=11-' == fake.ranges[2]
+
+    def test_get_statuses(self):
+        """Test getting the statuses of multiple jobs."""
+
+        async def test(fake, conf):
+            fake.statuses = ['RUNNING', 'SUCCEEDED']
+            async with AsyncGenie3Adapter(conf=conf) as adapter:
+                statuses = await adapter.get_statuses(['1234', 'missing', '5678'])
+
+            assert {'1234', '5678'} == set(statuses)
+            assert {'RUNNING', 'SUCCEEDED'} == set(statuses.values())
+
+        self.serve(test)
+
+    def test_running_job_not_found(self):
+        """Test AsyncRunningJob.status for a job which does not exist."""
+
+        async def test(fake, conf):
+            async with AsyncGenie3Adapter(conf=conf) as adapter:
+                running_job = AsyncRunningJob('missing', adapter=adapter, conf=conf)
+                with pytest.raises(GenieJobNotFoundError):
+                    await running_job.status
+
+        self.serve(test)
+
+    def test_client_conf(self):
+        """Test AsyncGenie requests use the conf's pool size and breakers."""
+
+        async def test(fake, conf):
+            conf.genie.set('async_pool_maxsize', '7')
+            conf.genie.set('circuit_breaker', 'true')
+            conf.genie.set('circuit_failure_threshold', '1')
+            async with AsyncGenie(conf=conf) as genie:
+                assert 7 == genie.session.connector.limit
+                with pytest.raises(GenieHTTPError):
+                    await genie.call(conf.genie.url + '/unknown', attempts=1)
+                with pytest.raises(GenieCircuitOpenError):
+                    await genie.call(conf.genie.url + '/unknown', attempts=1)
+
+        fake = self.serve(test)
+
+        assert 1 == len(fake.requests)
+
+    def test_client_paginate_missing(self):
+        """Test AsyncGenie list methods stop on a missing response."""
+
+        async def test(fake, conf):
+            async with AsyncGenie(conf=conf) as genie:
+                with patch.object(genie, 'call') as call:
+                    async def missing(*args, **kwargs):
+                        return None
+                    call.side_effect = missing
+                    assert [None] == [j async for j in genie.get_jobs()]
+
+        self.serve(test)
+
+    def test_client_get_jobs(self):
+        """Test AsyncGenie.get_jobs() paging through results."""
+
+        async def test(fake, conf):
+            async with AsyncGenie(conf=conf) as genie:
+                jobs = [j async for j in genie.get_jobs(req_size=1)]
+                clusters = [c async for c in genie.get_clusters()]
+
+            assert ['job-0', 'job-1', 'job-2'] == [j.id for j in jobs]
+            assert ['c1', 'c2'] == [c.id for c in clusters]
+
+        self.serve(test)
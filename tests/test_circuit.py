@@ -0,0 +1,150 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+import pytest
+from mock import patch
+from requests.exceptions import ConnectionError
+
+from pygenie.circuit import (CircuitBreaker,
+                             CircuitBreakers,
+                             get_circuit_breakers)
+from pygenie.conf import GenieConf
+from pygenie.exceptions import GenieCircuitOpenError, GenieHTTPError
+from pygenie.utils import call
+
+from .utils import fake_response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+@patch('pygenie.circuit._now')
+class TestCircuitBreaker(unittest.TestCase):
+    """Test circuit breaker states."""
+
+    def test_opens_after_threshold(self, now):
+        """Test the circuit opening after consecutive failures."""
+
+        now.return_value = 100
+        breaker = CircuitBreaker('http://genie', failure_threshold=3,
+                                 recovery_timeout=10)
+
+        for _ in range(2):
+            breaker.before_request()
+            breaker.record_failure()
+        breaker.record_success()
+        for _ in range(3):
+            breaker.before_request()
+            breaker.record_failure()
+
+        assert 'open' == breaker.state
+        with pytest.raises(GenieCircuitOpenError) as err:
+            breaker.before_request()
+        assert 10 == err.value.retry_in
+
+    def test_half_open_single_probe(self, now):
+        """Test the half-open circuit letting a single probe through."""
+
+        now.return_value = 100
+        breaker = CircuitBreaker('http://genie', failure_threshold=1,
+                                 recovery_timeout=10)
+        breaker.record_failure()
+
+        now.return_value = 111
+        assert 'half-open' == breaker.state
+
+        breaker.before_request()
+        with pytest.raises(GenieCircuitOpenError):
+            breaker.before_request()
+
+        breaker.record_success()
+
+        assert 'closed' == breaker.state
+        breaker.before_request()
+
+    def test_half_open_probe_fails(self, now):
+        """Test the circuit opening again when the probe fails."""
+
+        now.return_value = 100
+        breaker = CircuitBreaker('http://genie', failure_threshold=1,
+                                 recovery_timeout=10)
+        breaker.record_failure()
+
+        now.return_value = 111
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert 'open' == breaker.state
+        now.return_value = 120
+        with pytest.raises(GenieCircuitOpenError):
+            breaker.before_request()
+
+    def test_get_circuit_breakers(self, now):
+        """Test circuit breaking is disabled by default and set from conf."""
+
+        conf = GenieConf()
+
+        assert get_circuit_breakers(conf) is None
+
+        conf.genie.set('circuit_breaker', 'true')
+        conf.genie.set('circuit_failure_threshold', '2')
+        breakers = get_circuit_breakers(conf)
+
+        assert 2 == breakers.failure_threshold
+        assert breakers.get('http://genie/a') is breakers.get('HTTP://GENIE/b')
+        assert breakers.get('http://genie/a') is not breakers.get('http://other/a')
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+@patch('pygenie.utils.time.sleep')
+@patch('requests.sessions.Session.request')
+class TestCallCircuitBreaker(unittest.TestCase):
+    """Test circuit breaking HTTP request calls to Genie server."""
+
+    def test_fail_fast(self, request, sleep):
+        """Test call() failing fast once the circuit opens."""
+
+        request.side_effect = ConnectionError
+        breakers = CircuitBreakers(failure_threshold=3, recovery_timeout=60)
+
+        with pytest.raises(GenieCircuitOpenError):
+            call('http://genie-down', circuit_breakers=breakers, attempts=7,
+                 backoff=0)
+
+        assert 3 == request.call_count
+
+        with pytest.raises(GenieCircuitOpenError):
+            call('http://genie-down/api/v3/jobs/1', circuit_breakers=breakers)
+
+        assert 3 == request.call_count
+
+    @patch('pygenie.circuit._now')
+    def test_unexpected_error_releases_probe(self, now, request, sleep):
+        """Test an unexpected error during the half-open probe."""
+
+        now.return_value = 100
+        breakers = CircuitBreakers(failure_threshold=1, recovery_timeout=10)
+        breakers.get('http://genie-probe').record_failure()
+        now.return_value = 111
+        request.side_effect = [ValueError('bad request'), fake_response({}, 200)]
+
+        with pytest.raises(ValueError):
+            call('http://genie-probe', circuit_breakers=breakers)
+        call('http://genie-probe', circuit_breakers=breakers)
+
+        assert 'closed' == breakers.get('http://genie-probe').state
+
+    def test_client_errors_not_failures(self, request, sleep):
+        """Test 4xx and expected failure codes do not open the circuit."""
+
+        request.side_effect = [fake_response({}, 404), fake_response({}, 500),
+                               fake_response({}, 200)]
+        breakers = CircuitBreakers(failure_threshold=1)
+
+        assert call('http://genie-404', none_on_404=True,
+                    circuit_breakers=breakers) is None
+        with pytest.raises(GenieHTTPError):
+            call('http://genie-404', failure_codes=500, circuit_breakers=breakers)
+        call('http://genie-404', circuit_breakers=breakers)
+
+        assert 'closed' == breakers.get('http://genie-404').state
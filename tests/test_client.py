@@ -5,6 +5,7 @@ Netflix test for pygenie.client.py
 import json
 import os
 import re
+import threading
 import types
 import unittest
 
@@ -677,6 +678,76 @@ class TestJob(unittest.TestCase):
         assert status == new_status
 
 
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestPagination(unittest.TestCase):
+    """Test paging through list endpoints with prefetching."""
+
+    def setUp(self):
+        self.genie = Genie(GENIE_CONF)
+        self.requested = list()
+        self.page_2_requested = threading.Event()
+
+    def fake_call(self, url, method=None, params=None, total_pages=10):
+        page = params['page']
+        self.requested.append(page)
+        if page == 2:
+            self.page_2_requested.set()
+        elif page == 1:
+            # page 2 is requested while page 1 is in flight
+            self.page_2_requested.wait(5)
+        return {'response': {'jobSearchResultList': [{'id': '{}-{}'.format(page, i)}
+                                                     for i in range(2)]},
+                'page': {'totalPages': total_pages, 'number': page}}
+
+    def test_prefetch(self):
+        """Test pages are requested concurrently and yielded in order."""
+
+        with patch.object(Genie, 'call', side_effect=self.fake_call):
+            jobs = [j['id'] for j in self.genie.get_jobs(req_size=2, prefetch=3)]
+
+        assert ['{}-{}'.format(p, i) for p in range(10) for i in range(2)] == jobs
+        assert self.page_2_requested.is_set()
+        assert list(range(10)) == sorted(self.requested)
+
+    def test_no_prefetch(self):
+        """Test requesting pages one at a time."""
+
+        def fake_call(url, method=None, params=None):
+            self.page_2_requested.set()
+            return self.fake_call(url, method=method, params=params, total_pages=3)
+
+        with patch.object(Genie, 'call', side_effect=fake_call):
+            jobs = list(self.genie.get_jobs(prefetch=0))
+
+        assert 6 == len(jobs)
+        assert [0, 1, 2] == self.requested
+
+    def test_stop_iterating(self):
+        """Test pages are not requested after the consumer stops."""
+
+        with patch.object(Genie, 'call', side_effect=self.fake_call):
+            jobs = self.genie.get_jobs(prefetch=2)
+            first = [next(jobs)['id'] for _ in range(3)]
+            jobs.close()
+
+        assert ['0-0', '0-1', '1-0'] == first
+        assert set(self.requested) <= {0, 1, 2}
+
+    def test_pages_added(self):
+        """Test pages added while paging are requested."""
+
+        def fake_call(url, method=None, params=None):
+            self.page_2_requested.set()
+            return self.fake_call(url, method=method, params=params,
+                                  total_pages=params['page'] + 2
+                                  if params['page'] < 4 else 5)
+
+        with patch.object(Genie, 'call', side_effect=fake_call):
+            jobs = list(self.genie.get_jobs(prefetch=1))
+
+        assert 10 == len(jobs)
+
+
 @patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
 class TestGeniepyAPI(unittest.TestCase):
     """Test that all required APIs are available through geniepy"""
@@ -0,0 +1,156 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+from mock import patch
+
+from pygenie.client import Genie
+from pygenie.conf import GenieConf
+from pygenie.exceptions import GenieError
+from pygenie.export import export_jobs
+from pygenie.utils import DotDict
+
+
+# job id -> started (epoch milliseconds)
+JOBS = {
+    'job-1': 1000,
+    'job-2': 2000,
+    # on a window boundary
+    'job-3': 3600 * 1000,
+    'job-4': 3600 * 1000 + 1,
+    'job-5': 7200 * 1000 + 5,
+}
+
+
+class FakeGenie(object):
+    """Genie client searching JOBS (maxStarted is inclusive)."""
+
+    def __init__(self, fail_window=None, iso=False):
+        self.fail_window = fail_window
+        self.iso = iso
+        self.searches = list()
+
+    def get_jobs(self, filters=None, req_size=1000, prefetch=None):
+        self.searches.append(dict(filters))
+        for job_id, started in sorted(JOBS.items()):
+            if filters['minStarted'] <= started <= filters['maxStarted']:
+                if self.iso:
+                    started = (datetime.datetime(1970, 1, 1)
+                               + datetime.timedelta(milliseconds=started)) \
+                        .strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+                yield DotDict({'id': job_id, 'started': started, '_links': {}})
+                if filters['minStarted'] == self.fail_window:
+                    self.fail_window = None
+                    raise IOError('connection reset')
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestExportJobs(unittest.TestCase):
+    """Test exporting the job history."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dest = os.path.join(self.tmp_dir, 'jobs.ndjson')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_dest(self):
+        with open(self.dest) as dest:
+            return [json.loads(line) for line in dest]
+
+    def read_cursor(self):
+        with open(self.dest + '.cursor') as cursor_file:
+            return json.load(cursor_file)
+
+    def test_export(self):
+        """Test jobs are exported by windows without duplicates."""
+
+        genie = FakeGenie()
+
+        assert 5 == export_jobs(genie, self.dest, start=0, end=3 * 3600)
+
+        assert sorted(JOBS) == [j['id'] for j in self.read_dest()]
+        assert '_links' not in self.read_dest()[0]
+        assert [(0, 3600000), (3600000, 7200000), (7200000, 10800000)] == \
+            [(s['minStarted'], s['maxStarted']) for s in genie.searches]
+        with open(self.dest + '.cursor') as cursor_file:
+            cursor = json.load(cursor_file)
+        assert 10800000 == cursor['next']
+        assert 5 == cursor['count']
+
+    def test_resume(self):
+        """Test resuming a failed export from the last completed window."""
+
+        genie = FakeGenie(fail_window=3600000)
+
+        with pytest.raises(IOError):
+            export_jobs(genie, self.dest, start=0, end=3 * 3600)
+
+        # only the job on the boundary of the completed window is kept
+        assert ['job-3'] == self.read_cursor()['ids']
+        assert 2 == export_jobs(genie, self.dest, start=0)
+        assert sorted(JOBS) == [j['id'] for j in self.read_dest()]
+        # the first window is not searched again
+        assert 1 == len([s for s in genie.searches if s['minStarted'] == 0])
+
+        # done
+        assert 0 == export_jobs(genie, self.dest, start=0)
+
+    def test_iso_started(self):
+        """Test start times as ISO 8601 strings (as returned by Genie)."""
+
+        genie = FakeGenie(fail_window=3600000, iso=True)
+
+        with pytest.raises(IOError):
+            export_jobs(genie, self.dest, start=0, end=3 * 3600)
+
+        assert ['job-3'] == self.read_cursor()['ids']
+        assert 2 == export_jobs(genie, self.dest, start=0)
+        assert sorted(JOBS) == [j['id'] for j in self.read_dest()]
+
+    def test_different_export(self):
+        """Test a cursor is not used for a different export."""
+
+        export_jobs(FakeGenie(), self.dest, start=0, end=3600)
+
+        with pytest.raises(GenieError):
+            export_jobs(FakeGenie(), self.dest, start=0, end=7200)
+        with pytest.raises(GenieError):
+            export_jobs(FakeGenie(), self.dest, start=0, end=3600,
+                        cursor_path=self.dest + '.cursor',
+                        output_format='parquet')
+
+    def test_parquet(self):
+        """Test exporting to Parquet files."""
+
+        pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+        dest = os.path.join(self.tmp_dir, 'jobs')
+
+        export_jobs(FakeGenie(), dest, start=0, end=3 * 3600,
+                    output_format='parquet')
+
+        parts = sorted(os.listdir(dest))
+        assert 3 == len(parts)
+        assert ['job-1', 'job-2', 'job-3'] == \
+            pyarrow_parquet.read_table(os.path.join(dest, parts[0])) \
+                .column('id').to_pylist()
+
+    @patch('pygenie.client.Genie.get_jobs')
+    def test_genie_export_jobs(self, get_jobs):
+        """Test Genie().export_jobs()."""
+
+        get_jobs.side_effect = FakeGenie().get_jobs
+
+        assert 5 == Genie(GenieConf()).export_jobs(self.dest, start=0,
+                                                   end=3 * 3600,
+                                                   window=7200,
+                                                   filters={'user': 'etl'})
+        assert 'etl' == get_jobs.call_args[1]['filters']['user']
@@ -0,0 +1,159 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+import responses
+from mock import patch
+
+from pygenie.client import Genie
+from pygenie.conf import GenieConf
+from pygenie.metadata_cache import (DiskCacheBackend,
+                                    MemoryCacheBackend,
+                                    MetadataCache,
+                                    get_metadata_cache)
+
+
+GENIE_INI = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'genie.ini')
+
+CLUSTER = {'id': 'presto', 'name': 'presto', 'status': 'UP'}
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestMetadataCache(unittest.TestCase):
+    """Test the read-through metadata cache of the Genie client."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.conf = GenieConf().load_config_file(GENIE_INI)
+        self.conf.genie.set('metadata_cache', 'true')
+        self.path = re.compile(self.conf.genie.url + '/api/v3/clusters.*')
+        get_metadata_cache(self.conf).clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @responses.activate
+    def test_cached(self):
+        """Test configs are read from the cache."""
+
+        responses.add(responses.GET, self.path, body=json.dumps(CLUSTER))
+        genie = Genie(self.conf)
+
+        assert CLUSTER == genie.get_cluster('presto')
+        assert CLUSTER == genie.get_cluster('presto')
+        assert CLUSTER == Genie(self.conf).get_cluster('presto')
+        assert 1 == len(responses.calls)
+
+    @responses.activate
+    def test_cached_copy(self):
+        """Test changing a returned config does not change the cache."""
+
+        responses.add(responses.GET, self.path, body=json.dumps(CLUSTER))
+        genie = Genie(self.conf)
+
+        genie.get_cluster('presto')['status'] = 'OUT_OF_SERVICE'
+
+        assert 'UP' == genie.get_cluster('presto')['status']
+
+    @responses.activate
+    def test_not_enabled(self):
+        """Test configs are not cached by default."""
+
+        responses.add(responses.GET, self.path, body=json.dumps(CLUSTER))
+        genie = Genie(GenieConf().load_config_file(GENIE_INI))
+
+        genie.get_cluster('presto')
+        genie.get_cluster('presto')
+
+        assert 2 == len(responses.calls)
+
+    @responses.activate
+    def test_revalidate(self):
+        """Test stale configs are revalidated with their ETag."""
+
+        self.conf.genie.set('metadata_cache_ttl', '0')
+        responses.add(responses.GET, self.path, body=json.dumps(CLUSTER),
+                      headers={'ETag': '"v1"'})
+        responses.add(responses.GET, self.path, status=304)
+        genie = Genie(self.conf)
+
+        assert CLUSTER == genie.get_cluster('presto')
+        assert CLUSTER == genie.get_cluster('presto')
+        assert 2 == len(responses.calls)
+        assert '"v1"' == responses.calls[1].request.headers['If-None-Match']
+
+    @responses.activate
+    def test_invalidate(self):
+        """Test the client's own changes clear the cache."""
+
+        responses.add(responses.GET, self.path, body=json.dumps(CLUSTER))
+        responses.add(responses.PUT, self.path, status=204)
+        genie = Genie(self.conf)
+
+        genie.get_cluster('presto')
+        genie.update_cluster('presto', CLUSTER)
+        genie.get_cluster('presto')
+
+        assert ['GET', 'PUT', 'GET'] == [c.request.method for c in responses.calls]
+
+    @responses.activate
+    def test_params(self):
+        """Test requests with different parameters are cached separately."""
+
+        responses.add(responses.GET, self.path, body='[{"id": "cmd1"}]')
+        genie = Genie(self.conf)
+
+        genie.get_commands_for_cluster('presto', status='ACTIVE')
+        genie.get_commands_for_cluster('presto', status='ACTIVE')
+        genie.get_commands_for_cluster('presto')
+
+        assert 2 == len(responses.calls)
+
+    @responses.activate
+    def test_not_found(self):
+        """Test missing configs are not cached."""
+
+        responses.add(responses.GET, self.path, status=404)
+        genie = Genie(self.conf)
+
+        assert genie.get_cluster('missing') is None
+        assert genie.get_cluster('missing') is None
+        assert 2 == len(responses.calls)
+
+    def test_memory_backend_lru(self):
+        """Test the least recently used entries are evicted."""
+
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+
+        assert backend.get('b') is None
+        assert 1 == backend.get('a')
+
+    def test_disk_backend(self):
+        """Test entries are shared through the cache directory."""
+
+        MetadataCache(DiskCacheBackend(self.tmp_dir)).put('key', {'a': 1}, etag='e')
+        cache = MetadataCache(DiskCacheBackend(self.tmp_dir))
+
+        assert ({'a': 1}, True, 'e') == cache.get('key')
+
+        cache.clear()
+
+        assert (None, False, None) == cache.get('key')
+
+    def test_get_metadata_cache(self):
+        """Test the cache backend for the settings."""
+
+        self.conf.genie.set('metadata_cache_dir', self.tmp_dir)
+
+        assert get_metadata_cache(GenieConf()) is None
+        assert isinstance(get_metadata_cache(self.conf).backend, DiskCacheBackend)
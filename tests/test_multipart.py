@@ -0,0 +1,125 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import email.parser
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from pygenie.adapter.genie_3 import Genie3Adapter, to_attachment
+from pygenie.adapter.multipart import AttachmentFile, MultipartEncoder
+from pygenie.conf import GenieConf
+from pygenie.jobs import HiveJob
+
+
+def parse_body(body):
+    """Parse a multipart body into (name, filename, content type, data)."""
+
+    message = email.parser.BytesParser().parsebytes(
+        'Content-Type: {}\r\n\r\n'.format(body.content_type).encode('utf-8')
+        + body.to_bytes())
+    return [(part.get_param('name', header='content-disposition'),
+             part.get_filename(),
+             part.get('Content-Type'),
+             part.get_payload(decode=True))
+            for part in message.get_payload()]
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestMultipartEncoder(unittest.TestCase):
+    """Test the streaming multipart body."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.jar = os.path.join(self.tmp_dir, 'udfs.jar')
+        with open(self.jar, 'wb') as jar:
+            jar.write(b'\x00jar' * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_encode(self):
+        """Test the parts of the body."""
+
+        body = MultipartEncoder([
+            ('request', ('', '{"name": "job"}', 'application/json')),
+            ('attachment', ('udfs.jar', AttachmentFile(self.jar))),
+            ('attachment', ('script.hql', 'SELECT "café"'))],
+            chunk_size=100)
+
+        assert [('request', '', 'application/json', b'{"name": "job"}'),
+                ('attachment', 'udfs.jar', None, b'\x00jar' * 1000),
+                ('attachment', 'script.hql', None, 'SELECT "café"'.encode('utf-8'))] \
+            == parse_body(body)
+
+    def test_length(self):
+        """Test the length is computed up front."""
+
+        body = MultipartEncoder([('attachment', ('udfs.jar', AttachmentFile(self.jar))),
+                                 ('attachment', ('a"b.sql', b''))])
+
+        assert len(body.to_bytes()) == len(body)
+
+    def test_iterate_again(self):
+        """Test the body can be sent again (for retries)."""
+
+        body = MultipartEncoder([('attachment', ('udfs.jar', AttachmentFile(self.jar)))],
+                                chunk_size=1000)
+
+        chunks = list(body)
+
+        # header, 4 file chunks, part end, body end
+        assert 7 == len(chunks)
+        assert chunks == list(body)
+
+    def test_files_closed(self):
+        """Test attachment files are only open while they are read."""
+
+        opened = list()
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+
+        body = MultipartEncoder([('attachment', ('udfs.jar', AttachmentFile(self.jar)))])
+
+        with patch('pygenie.adapter.multipart.open', tracking_open, create=True):
+            assert [] == opened
+            body.to_bytes()
+
+        assert 1 == len(opened)
+        assert opened[0].closed
+
+    def test_to_attachment(self):
+        """Test local files and directories are not opened."""
+
+        name, att = to_attachment(self.jar)
+
+        assert 'udfs.jar' == name
+        assert self.jar == att.path
+        assert [('udfs.jar', att.__class__)] == \
+            [(n, a.__class__) for n, a in to_attachment(self.tmp_dir)]
+
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.call')
+    def test_submit_job(self, call):
+        """Test submitting a job with a streamed multipart body."""
+
+        job = HiveJob(GenieConf()) \
+            .job_id('1234-multipart') \
+            .script('SELECT 1') \
+            .dependencies(self.jar)
+
+        Genie3Adapter().submit_job(job)
+
+        kwargs = call.call_args[1]
+        body = kwargs['data']
+        parts = parse_body(body)
+
+        assert body.content_type == kwargs['headers']['Content-Type']
+        assert '1234-multipart' == json.loads(parts[0][3].decode('utf-8'))['id']
+        assert {'udfs.jar', 'script.hive'} == {p[1] for p in parts[1:]}
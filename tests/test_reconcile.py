@@ -0,0 +1,203 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import pytest
+from mock import patch
+
+from pygenie.conf import GenieConf
+from pygenie.exceptions import GenieError
+from pygenie.reconcile import Reconciler, load_spec, reconcile
+from pygenie.utils import DotDict
+
+
+class FakeGenie(object):
+    """In-memory Genie client recording mutations."""
+
+    def __init__(self, applications=None, commands=None, clusters=None):
+        self.conf = GenieConf()
+        self.resources = {'applications': dict(applications or dict()),
+                          'commands': dict(commands or dict()),
+                          'clusters': dict(clusters or dict())}
+        self.links = {'commands': dict(), 'clusters': dict()}
+        self.mutations = list()
+        self.lock = threading.Lock()
+
+    def _get(self, kind, resource_id):
+        resource = self.resources[kind].get(resource_id)
+        return DotDict(resource) if resource is not None else None
+
+    def get_application(self, application_id):
+        return self._get('applications', application_id)
+
+    def get_command(self, command_id):
+        return self._get('commands', command_id)
+
+    def get_cluster(self, cluster_id):
+        return self._get('clusters', cluster_id)
+
+    def get_applications_for_command(self, command_id):
+        return [{'id': i} for i in self.links['commands'].get(command_id, [])]
+
+    def get_commands_for_cluster(self, cluster_id):
+        return [DotDict({'id': i})
+                for i in self.links['clusters'].get(cluster_id, [])]
+
+    def _mutate(self, name, kind, resource_id, data):
+        with self.lock:
+            self.mutations.append((name, resource_id))
+            if name.startswith('create'):
+                self.resources[kind][resource_id] = dict(data)
+            elif name.startswith('patch'):
+                for operation in data:
+                    self.resources[kind][resource_id][operation['path'][1:]] = \
+                        operation['value']
+            else:
+                for linked_id in data:
+                    assert linked_id in self.resources[
+                        'applications' if kind == 'commands' else 'commands']
+                self.links[kind][resource_id] = list(data)
+
+    def create_application(self, application):
+        self._mutate('create_application', 'applications', application['id'],
+                     application)
+
+    def create_command(self, command):
+        self._mutate('create_command', 'commands', command['id'], command)
+
+    def create_cluster(self, cluster):
+        self._mutate('create_cluster', 'clusters', cluster['id'], cluster)
+
+    def patch_application(self, application_id, patches):
+        self._mutate('patch_application', 'applications', application_id, patches)
+
+    def patch_command(self, command_id, patches):
+        self._mutate('patch_command', 'commands', command_id, patches)
+
+    def patch_cluster(self, cluster_id, patches):
+        self._mutate('patch_cluster', 'clusters', cluster_id, patches)
+
+    def set_application_for_command(self, command_id, application_ids):
+        self._mutate('set_application_for_command', 'commands', command_id,
+                     application_ids)
+
+    def set_commands_for_cluster(self, cluster_id, commands):
+        self._mutate('set_commands_for_cluster', 'clusters', cluster_id, commands)
+
+
+SPEC = {
+    'applications': [
+        {'id': 'spark', 'version': '2.4', 'tags': ['type:spark', 'ver:2.4']}
+    ],
+    'commands': [
+        {'id': 'spark-submit', 'version': '2.4', 'applications': ['spark']}
+    ],
+    'clusters': [
+        {'id': 'yarn', 'status': 'UP', 'tags': ['sched:adhoc'],
+         'commands': ['spark-submit']}
+    ]
+}
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestReconcile(unittest.TestCase):
+    """Test reconciling Genie resources with a spec."""
+
+    def test_create(self):
+        """Test creating resources in dependency order."""
+
+        genie = FakeGenie()
+
+        plan = reconcile(SPEC, genie=genie)
+
+        assert ['create_application', 'create_command',
+                'set_application_for_command', 'create_cluster',
+                'set_commands_for_cluster'] == [m[0] for m in genie.mutations]
+        assert 5 == len(plan)
+        assert ['spark-submit'] == genie.links['clusters']['yarn']
+
+    def test_no_changes(self):
+        """Test nothing is applied when Genie has the desired state."""
+
+        genie = FakeGenie()
+        reconcile(SPEC, genie=genie)
+        genie.resources['applications']['spark']['tags'].append('genie.id:spark')
+        genie.mutations = list()
+
+        plan = reconcile(SPEC, genie=genie)
+
+        assert [] == genie.mutations
+        assert not plan
+        assert 'No changes.' == str(plan)
+
+    def test_minimal_diff(self):
+        """Test only the fields and links which differ are changed."""
+
+        genie = FakeGenie(
+            applications={'spark': {'id': 'spark', 'version': '2.3',
+                                    'tags': ['ver:2.4', 'type:spark'],
+                                    'created': '2020-01-01'}},
+            commands={'spark-submit': {'id': 'spark-submit', 'version': '2.4'}},
+            clusters={'yarn': {'id': 'yarn', 'status': 'UP', 'tags': ['sched:adhoc']}})
+        genie.links['commands']['spark-submit'] = ['spark']
+
+        plan = reconcile(SPEC, genie=genie, dry_run=True)
+
+        assert [] == genie.mutations
+        assert '~ application spark version = "2.4"\n' \
+               '~ cluster yarn commands = ["spark-submit"]' == str(plan)
+
+        Reconciler(genie).apply(plan)
+
+        assert [('patch_application', 'spark'),
+                ('set_commands_for_cluster', 'yarn')] == genie.mutations
+
+    def test_apply_failure(self):
+        """Test later steps are not applied after a failure."""
+
+        genie = FakeGenie()
+        genie.create_command = lambda command: (_ for _ in ()).throw(
+            GenieError('bad command'))
+
+        with pytest.raises(GenieError):
+            reconcile(SPEC, genie=genie)
+
+        assert ['create_application'] == [m[0] for m in genie.mutations]
+
+    def test_load_spec(self):
+        """Test loading specs."""
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'spec.json')
+            with open(path, 'w') as spec_file:
+                json.dump(SPEC, spec_file)
+
+            assert ['spark'] == list(load_spec(path)['applications'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        with pytest.raises(GenieError):
+            load_spec({'applications': [{'id': 'a'}, {'id': 'a'}]})
+        with pytest.raises(GenieError):
+            load_spec({'jobs': []})
+
+    def test_load_yaml_spec(self):
+        """Test loading YAML specs."""
+
+        yaml = pytest.importorskip('yaml')
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'spec.yaml')
+            with open(path, 'w') as spec_file:
+                yaml.safe_dump(SPEC, spec_file)
+
+            assert ['yarn'] == list(load_spec(path)['clusters'])
+        finally:
+            shutil.rmtree(tmp_dir)
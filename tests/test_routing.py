@@ -0,0 +1,117 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+from mock import patch
+
+from pygenie.conf import GenieConf
+from pygenie.jobs import HiveJob
+from pygenie.routing import RoutingSimulator
+from pygenie.utils import DotDict
+
+
+CLUSTERS = [
+    {'id': 'adhoc-1', 'status': 'UP', 'tags': ['type:yarn', 'sched:adhoc']},
+    {'id': 'adhoc-2', 'status': 'UP', 'tags': ['type:yarn', 'sched:adhoc']},
+    {'id': 'sla', 'status': 'UP', 'tags': ['type:yarn', 'sched:sla']},
+    {'id': 'down', 'status': 'OUT_OF_SERVICE', 'tags': ['type:yarn', 'sched:etl']},
+]
+
+COMMANDS = [
+    {'id': 'hive-old', 'status': 'DEPRECATED', 'tags': ['type:hive']},
+    {'id': 'hive-2', 'status': 'ACTIVE', 'tags': ['type:hive', 'ver:2']},
+    {'id': 'hive-3', 'status': 'ACTIVE', 'tags': ['type:hive', 'ver:3']},
+    {'id': 'spark', 'status': 'ACTIVE', 'tags': ['type:spark']},
+]
+
+CLUSTER_COMMANDS = {
+    'adhoc-1': ['hive-old', 'hive-3', 'hive-2'],
+    'adhoc-2': ['spark'],
+    'sla': ['hive-2'],
+    'down': ['hive-2', 'spark'],
+}
+
+
+class FakeGenie(object):
+    """Genie client serving the clusters and commands above."""
+
+    def __init__(self):
+        self.calls = list()
+
+    def get_clusters(self, filters=None):
+        self.calls.append(('get_clusters', filters))
+        return (DotDict(c) for c in CLUSTERS
+                if c['status'] == filters.get('status', c['status']))
+
+    def get_commands(self, filters=None):
+        self.calls.append(('get_commands', filters))
+        return (DotDict(c) for c in COMMANDS
+                if c['status'] == filters.get('status', c['status']))
+
+    def get_commands_for_cluster(self, cluster_id):
+        return [DotDict({'id': i}) for i in CLUSTER_COMMANDS[cluster_id]]
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestRoutingSimulator(unittest.TestCase):
+    """Test resolving jobs' clusters and commands locally."""
+
+    def setUp(self):
+        self.simulator = RoutingSimulator(CLUSTERS, COMMANDS, CLUSTER_COMMANDS)
+
+    def test_resolve(self):
+        """Test the first matching command of the cluster is used."""
+
+        route = self.simulator.resolve([['sched:adhoc']], ['type:hive'])
+
+        assert 'adhoc-1' == route.cluster_id
+        assert 'hive-3' == route.command_id
+        assert {'adhoc-1': 'hive-3'} == route.candidates
+
+    def test_resolve_priority(self):
+        """Test cluster criterias are tried in priority order."""
+
+        route = self.simulator.resolve([{'tags': ['sched:etl']},
+                                        {'tags': ['sched:adhoc', 'type:yarn']},
+                                        {'tags': ['type:yarn']}],
+                                       ['type:spark'])
+
+        assert ('adhoc-2', 'spark', 1) == route[:3]
+
+    def test_resolve_candidates(self):
+        """Test every matching cluster is a candidate."""
+
+        route = self.simulator.resolve([['type:yarn']], ['type:hive', 'ver:2'])
+
+        assert {'adhoc-1': 'hive-2', 'sla': 'hive-2'} == route.candidates
+
+    def test_no_route(self):
+        """Test criteria without a matching cluster and command."""
+
+        assert self.simulator.resolve([['sched:sla']], ['type:spark']) is None
+        assert self.simulator.resolve([['sched:etl']], ['type:hive']) is None
+        assert self.simulator.resolve([['type:yarn']], ['type:pig']) is None
+        assert self.simulator.resolve([['type:yarn']], []) is None
+
+    def test_resolve_job(self):
+        """Test resolving a job's criteria."""
+
+        job = HiveJob(GenieConf()) \
+            .cluster_tags(['sched:sla']) \
+            .command_tags(['type:hive', 'ver:2']) \
+            .script('SELECT 1')
+
+        route = self.simulator.resolve_job(job)
+
+        assert ('sla', 'hive-2', 0) == route[:3]
+
+    def test_from_genie(self):
+        """Test snapshotting the clusters and commands in Genie."""
+
+        genie = FakeGenie()
+
+        simulator = RoutingSimulator.from_genie(genie)
+
+        assert ('get_clusters', {'status': 'UP'}) in genie.calls
+        assert 'adhoc-1' == simulator.resolve([['type:yarn']], ['ver:3']).cluster_id
@@ -0,0 +1,111 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+from mock import patch
+from requests.adapters import HTTPAdapter
+
+from pygenie.conf import GenieConf
+from pygenie.sessions import SessionPool, get_session_pool
+from pygenie.utils import call
+
+from .utils import fake_response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestSessionPool(unittest.TestCase):
+    """Test pooling HTTP sessions."""
+
+    def test_same_host_reuses_session(self):
+        """Test requests to the same host share a session."""
+
+        pool = SessionPool()
+
+        session = pool.get('http://genie/api/v3/jobs/1')
+
+        assert session is pool.get('http://GENIE/api/v3/jobs/2/status')
+        assert 1 == len(pool)
+
+    def test_different_hosts(self):
+        """Test requests to different hosts get different sessions."""
+
+        pool = SessionPool()
+
+        assert pool.get('http://genie-a/api') is not pool.get('http://genie-b/api')
+        assert 2 == len(pool)
+
+    def test_adapters_in_key(self):
+        """Test session adapters are mounted and part of the session key."""
+
+        pool = SessionPool()
+        adapter = HTTPAdapter()
+
+        plain = pool.get('https://genie/api')
+        mounted = pool.get('https://genie/api', {'https://': adapter})
+
+        assert plain is not mounted
+        assert adapter is mounted.get_adapter('https://genie/api')
+        assert mounted is pool.get('https://genie/api', {'https://': adapter})
+
+    def test_pool_size(self):
+        """Test the default adapters use the configured pool size."""
+
+        pool = SessionPool(pool_connections=2, pool_maxsize=25)
+
+        adapter = pool.get('http://genie/api').get_adapter('http://genie/api')
+
+        assert 2 == adapter._pool_connections
+        assert 25 == adapter._pool_maxsize
+
+    @patch('pygenie.sessions.time.time')
+    def test_idle_eviction(self, now):
+        """Test idle sessions are closed and evicted."""
+
+        pool = SessionPool(idle_timeout=60)
+
+        now.return_value = 1000
+        session = pool.get('http://genie/api')
+        now.return_value = 1061
+
+        with patch.object(session, 'close') as close:
+            assert session is not pool.get('http://genie/api')
+            close.assert_called_once_with()
+
+    @patch('pygenie.sessions.os.getpid')
+    def test_fork(self, getpid):
+        """Test sessions inherited from a parent process are not reused."""
+
+        getpid.return_value = 1
+        pool = SessionPool()
+        session = pool.get('http://genie/api')
+
+        getpid.return_value = 2
+        with patch.object(session, 'close') as close:
+            assert session is not pool.get('http://genie/api')
+            close.assert_not_called()
+
+    def test_get_session_pool_conf(self):
+        """Test getting the shared pool for conf settings."""
+
+        conf = GenieConf()
+        conf.genie.set('session_pool_maxsize', '42')
+
+        pool = get_session_pool(conf)
+
+        assert 42 == pool.pool_maxsize
+        assert pool is get_session_pool(conf)
+        assert pool is not get_session_pool()
+
+    @patch('requests.sessions.Session.request')
+    def test_call_reuses_session(self, request):
+        """Test call() reuses the pooled session across calls."""
+
+        request.return_value = fake_response({}, 200)
+        pool = SessionPool()
+
+        call('http://genie-pooled/1', session_pool=pool)
+        call('http://genie-pooled/2', session_pool=pool)
+
+        assert 2 == request.call_count
+        assert 1 == len(pool)
@@ -0,0 +1,116 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from pygenie.adapter.genie_3 import get_submit_payload
+from pygenie.adapter.multipart import AttachmentFile
+from pygenie.adapter.staging import (AttachmentStager,
+                                     LocalDependencyStore,
+                                     get_attachment_stager)
+from pygenie.conf import GenieConf
+from pygenie.jobs import HiveJob
+
+
+class CountingStore(LocalDependencyStore):
+    """Local store counting uploads."""
+
+    uploads = list()
+
+    def upload(self, key, chunks):
+        CountingStore.uploads.append(key)
+        super(CountingStore, self).upload(key, chunks)
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestAttachmentStaging(unittest.TestCase):
+    """Test staging attachments in a dependency store."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.tmp_dir, 'store')
+        self.jar = os.path.join(self.tmp_dir, 'udfs.jar')
+        with open(self.jar, 'wb') as jar:
+            jar.write(b'jar' * 100)
+        CountingStore.uploads = list()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_stage(self):
+        """Test attachments are uploaded once per content."""
+
+        stager = AttachmentStager(CountingStore(self.store_dir))
+        digest = hashlib.sha256(b'jar' * 100).hexdigest()
+
+        remaining, deps = stager.stage([('udfs.jar', AttachmentFile(self.jar)),
+                                        ('params.txt', 'SET a=1;')])
+        _, deps_again = stager.stage([('udfs.jar', AttachmentFile(self.jar))])
+
+        assert [] == remaining
+        assert 'file://{}/{}/udfs.jar'.format(self.store_dir, digest) == deps[0]
+        assert deps[0] == deps_again[0]
+        assert 2 == len(CountingStore.uploads)
+        with open(deps[1][len('file://'):]) as params:
+            assert 'SET a=1;' == params.read()
+
+    def test_stage_min_size(self):
+        """Test small attachments are sent as is."""
+
+        stager = AttachmentStager(CountingStore(self.store_dir), min_size=10)
+
+        remaining, deps = stager.stage([('udfs.jar', AttachmentFile(self.jar)),
+                                        ('params.txt', 'SET a=1;')])
+
+        assert [('params.txt', b'SET a=1;')] == remaining
+        assert 1 == len(deps)
+
+    def test_changed_file(self):
+        """Test a changed file is staged again."""
+
+        stager = AttachmentStager(CountingStore(self.store_dir))
+        _, deps = stager.stage([('udfs.jar', AttachmentFile(self.jar))])
+
+        with open(self.jar, 'wb') as jar:
+            jar.write(b'new jar')
+        _, new_deps = stager.stage([('udfs.jar', AttachmentFile(self.jar))])
+
+        assert deps != new_deps
+        assert 2 == len(CountingStore.uploads)
+
+    def test_get_attachment_stager(self):
+        """Test staging is only enabled with a store location."""
+
+        conf = GenieConf()
+
+        assert get_attachment_stager(conf) is None
+
+        conf.genie.set('attachment_store', self.store_dir)
+        conf.genie.set('attachment_store_class', 'tests.test_staging.CountingStore')
+        stager = get_attachment_stager(conf)
+
+        assert isinstance(stager.store, CountingStore)
+        assert self.store_dir == stager.store.location
+
+    def test_submit_payload(self):
+        """Test staged attachments are sent as dependencies."""
+
+        conf = GenieConf()
+        conf.genie.set('attachment_store', self.store_dir)
+        job = HiveJob(conf) \
+            .job_id('1234-staging') \
+            .script('SELECT 1') \
+            .dependencies([self.jar, 's3://bucket/file.txt'])
+
+        payload, attachments = get_submit_payload(job)
+
+        assert [] == attachments
+        assert 's3://bucket/file.txt' == payload['dependencies'][0]
+        assert ['script.hive', 'udfs.jar'] == \
+            sorted(d.rpartition('/')[2] for d in payload['dependencies'][1:])
@@ -0,0 +1,153 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import unittest
+
+import pytest
+from mock import patch
+
+from pygenie.conf import GenieConf
+from pygenie.exceptions import GenieHTTPError
+from pygenie.throttling import (RetryBudget,
+                                Throttler,
+                                TokenBucket,
+                                get_throttler,
+                                parse_retry_after)
+from pygenie.utils import call
+
+from .utils import fake_response
+
+
+def retry_after_response(status_code, retry_after):
+    response = fake_response({}, status_code)
+    response.headers['Retry-After'] = retry_after
+    return response
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestThrottling(unittest.TestCase):
+    """Test client-side throttling."""
+
+    def test_parse_retry_after(self):
+        """Test parsing Retry-After seconds and HTTP dates."""
+
+        assert 120 == parse_retry_after('120')
+        assert 0 == parse_retry_after('-5')
+        assert 30 == parse_retry_after('Thu, 01 Jan 1970 00:01:00 GMT', now=30)
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+
+    @patch('pygenie.throttling.time.sleep')
+    @patch('pygenie.throttling._now')
+    def test_token_bucket(self, now, sleep):
+        """Test the token bucket allowing bursts then limiting the rate."""
+
+        now.return_value = 100
+        bucket = TokenBucket(rate=2, burst=2)
+
+        assert 0 == bucket.acquire()
+        assert 0 == bucket.acquire()
+        assert 0.5 == bucket.acquire()
+        assert 1.0 == bucket.acquire()
+
+        now.return_value = 105
+        assert 0 == bucket.acquire()
+
+        assert 2 == sleep.call_count
+
+    @patch('pygenie.throttling._now')
+    def test_retry_budget(self, now):
+        """Test the retry budget limiting retries to a ratio of requests."""
+
+        now.return_value = 100
+        budget = RetryBudget(ratio=0.5, min_per_second=0, ttl=10)
+
+        for _ in range(4):
+            budget.record_request()
+
+        assert [True, True, False] == [budget.can_retry() for _ in range(3)]
+
+        now.return_value = 111
+        assert not budget.can_retry()
+        budget.record_request()
+        budget.record_request()
+        assert budget.can_retry()
+
+    @patch('pygenie.throttling.random.uniform')
+    def test_retry_delay_jitter(self, uniform):
+        """Test retry delays use full jitter up to max_backoff."""
+
+        uniform.side_effect = lambda low, high: high
+        throttler = Throttler(max_backoff=30)
+
+        delays = [throttler.retry_delay('http://genie', i, 5, fake_response({}, 500))
+                  for i in range(4)]
+
+        assert [5, 10, 20, 30] == delays
+
+    @patch('pygenie.throttling.time.sleep')
+    def test_retry_after_blocks_host(self, sleep):
+        """Test Retry-After delays the retry and other requests to the host."""
+
+        throttler = Throttler(max_retry_after=60)
+
+        delay = throttler.retry_delay('http://genie-busy/api/v3/jobs', 0, 5,
+                                      retry_after_response(429, '120'))
+
+        assert 60 == delay
+
+        throttler.before_request('http://genie-busy/api/v3/jobs/1')
+        throttler.before_request('http://genie-other/api/v3/jobs/1')
+
+        assert 1 == sleep.call_count
+        assert 55 < sleep.call_args[0][0] <= 60
+
+    def test_get_throttler(self):
+        """Test getting shared throttlers from conf."""
+
+        conf = GenieConf()
+
+        assert get_throttler(conf) is get_throttler(GenieConf())
+        assert get_throttler(conf).rate is None
+
+        conf.genie.set('rate_limit', '5')
+        conf.genie.set('retry_budget_ratio', 'none')
+        throttler = get_throttler(conf)
+
+        assert 5 == throttler.rate
+        assert throttler.retry_budget_ratio is None
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+@patch('requests.sessions.Session.request')
+class TestCallThrottling(unittest.TestCase):
+    """Test throttling HTTP request calls to Genie server."""
+
+    @patch('pygenie.utils.time.sleep')
+    def test_retry_after(self, sleep, request):
+        """Test call() honoring Retry-After on 503."""
+
+        request.side_effect = [
+            retry_after_response(503, '7'),
+            fake_response({}, 200)
+        ]
+
+        call('http://genie-retry-after', throttler=Throttler(), attempts=3)
+
+        assert 2 == request.call_count
+        assert 7 == sleep.call_args_list[0][0][0]
+
+    @patch('pygenie.utils.time.sleep')
+    def test_retry_budget_exhausted(self, sleep, request):
+        """Test call() stops retrying when the retry budget is exhausted."""
+
+        request.return_value = fake_response({}, 500)
+        throttler = Throttler(retry_budget_ratio=0.5,
+                              retry_budget_min_per_second=0)
+
+        with pytest.raises(GenieHTTPError):
+            call('http://genie-budget', throttler=throttler, attempts=5, backoff=0)
+
+        # 1 request allows 0.5 retries, so only the first retry is made
+        assert 2 == request.call_count
+        assert 1 == sleep.call_count
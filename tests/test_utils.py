@@ -309,8 +309,9 @@ class TestReattachJob(unittest.TestCase):
 
 
 @patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+@patch('pygenie.jobs.utils._search_attempts', new=lambda *args: None)
 class TestGeneratingJobId(unittest.TestCase):
-    """Test generating job ids."""
+    """Test generating job ids (probing each id)."""
 
     @patch('pygenie.jobs.utils.reattach_job')
     def test_gen_job_id_new(self, mock_reattach_job):
@@ -458,3 +459,100 @@ class TestGeneratingJobId(unittest.TestCase):
         # simulate https://github.com/python/cpython/pull/7695
         path = 's3://root/myfile\x00'
         assert is_file(path) == False
+
+
+@patch.dict('os.environ', {'GENIE_BYPASS_HOME_CONFIG': '1'})
+class TestGeneratingJobIdSearch(unittest.TestCase):
+    """Test generating job ids with one jobs search."""
+
+    @patch('pygenie.jobs.utils.reattach_job')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.search_statuses')
+    def test_search(self, search_statuses, reattach_job):
+        """Test the attempts are resolved from the search results."""
+
+        statuses = {'etl': 'FAILED',
+                    'etl-1': 'KILLED',
+                    'etl-2': 'SUCCEEDED',
+                    'etl-3': 'RUNNING',
+                    'etl-extra': 'RUNNING'}
+        search_statuses.side_effect = lambda pattern, **kwargs: \
+            {k: v for k, v in statuses.items() if k.startswith(pattern[:-1])}
+
+        assert 'etl-2' == generate_job_id('etl')
+        assert 'etl-3' == generate_job_id('etl', return_success=False)
+        assert 'etl-4' == generate_job_id('etl-3', return_success=False,
+                                          override_existing=True)
+        assert 'new' == generate_job_id('new')
+        search_statuses.assert_any_call('etl%', max_results=100)
+        search_statuses.assert_any_call('etl-%', max_results=100)
+        # only the running attempt being killed is reattached
+        reattach_job.assert_called_once_with('etl-3', conf=None)
+
+    @patch('pygenie.jobs.utils.reattach_job')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.search_statuses')
+    def test_search_kill_running(self, search_statuses, reattach_job):
+        """Test running attempts are killed when overriding."""
+
+        search_statuses.return_value = {'etl': 'RUNNING'}
+        reattach_job.return_value.kill.return_value = fake_response({}, 200)
+
+        assert 'etl-1' == generate_job_id('etl', return_success=False,
+                                          override_existing=True)
+        reattach_job.assert_called_once_with('etl', conf=None)
+        reattach_job.return_value.kill.assert_called_once_with()
+
+    @patch('pygenie.jobs.utils.reattach_job')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.search_statuses')
+    def test_search_not_filtered(self, search_statuses, reattach_job):
+        """Test falling back to probing if the server does not filter by id."""
+
+        search_statuses.return_value = {'other-job': 'RUNNING'}
+        reattach_job.side_effect = [FakeRunningJob(job_id='etl', status='RUNNING')]
+
+        assert 'etl' == generate_job_id('etl')
+        assert 1 == reattach_job.call_count
+
+    @patch('pygenie.jobs.utils.reattach_job')
+    @patch('pygenie.adapter.genie_3.Genie3Adapter.search_statuses')
+    def test_search_too_many(self, search_statuses, reattach_job):
+        """Test falling back to probing if too many jobs share the prefix."""
+
+        search_statuses.return_value = None
+        reattach_job.side_effect = GenieJobNotFoundError
+
+        assert 'etl-20170101' == generate_job_id('etl-20170101')
+        search_statuses.assert_called_once_with('etl-%', max_results=100)
+        reattach_job.assert_called_once_with('etl-20170101', conf=None)
+
+    @patch('requests.sessions.Session.request')
+    def test_search_statuses_max_results(self, request):
+        """Test Genie3Adapter.search_statuses() giving up after max_results."""
+
+        from pygenie.adapter.genie_3 import Genie3Adapter
+
+        response = fake_response({
+            '_embedded': {'jobSearchResultList': [{'id': 'etl-1', 'status': 'failed'},
+                                                  {'id': 'etl-2', 'status': 'failed'}]},
+            'page': {'totalPages': 50}})
+        response._content = response._content.encode('utf-8')
+        request.return_value = response
+
+        assert Genie3Adapter().search_statuses('etl-%', max_results=1) is None
+        assert 1 == request.call_count
+        assert 2 == request.call_args[1]['params']['size']
+
+    @patch('requests.sessions.Session.request')
+    def test_search_statuses_request(self, request):
+        """Test the jobs search request of Genie3Adapter.search_statuses()."""
+
+        from pygenie.adapter.genie_3 import Genie3Adapter
+
+        response = fake_response({
+            '_embedded': {'jobSearchResultList': [{'id': 'etl', 'status': 'failed'}]},
+            'page': {'totalPages': 1}})
+        response._content = response._content.encode('utf-8')
+        request.return_value = response
+
+        assert {'etl': 'FAILED'} == Genie3Adapter().search_statuses('etl%')
+        assert {'id': 'etl%', 'size': 1000, 'page': 0} == \
+            request.call_args[1]['params']
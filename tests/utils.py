@@ -18,6 +18,20 @@ def fake_response(content, status_code=200, method='GET'):
     return response
 
 
+def fake_log_response(content, status_code=200, content_range=None):
+    response = requests.Response()
+    response.request = requests.Request()
+
+    response.status_code = status_code
+    response._content = content.encode('utf-8')
+    response._content_consumed = True
+    response.request.method = 'GET'
+    if content_range is not None:
+        response.headers['Content-Range'] = content_range
+
+    return response
+
+
 class FakeRunningJob(object):
     def __init__(self, job_id=None, status='RUNNING', **kwargs):
         self.job_id = job_id or str(uuid.uuid1())